@@ -11,37 +11,13 @@ within each category folder.
 
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 import numpy as np
 
-
-def _parse_coordinates(value):
-    """
-    Parse a 'lat, lon' or 'lat, \\nlon' string into (lat, lon) floats.
-    
-    Args:
-        value: String containing coordinates in format "lat, lon" or similar
-        
-    Returns:
-        Tuple of (lat, lon) as floats, or (pd.NA, pd.NA) if invalid
-    """
-    if pd.isna(value):
-        return pd.NA, pd.NA
-    try:
-        # Handle various formats: "lat, lon", "lat,lon", "lat\nlon", etc.
-        value_str = str(value).replace("\\n", " ").replace("\n", " ").strip()
-        parts = value_str.split(",")
-        if len(parts) >= 2:
-            lat = float(str(parts[0]).strip())
-            lon = float(str(parts[1]).strip())
-            # Validate coordinates are reasonable (Malaysia is roughly 0-10°N, 95-125°E)
-            if 0 <= lat <= 10 and 95 <= lon <= 125:
-                return lat, lon
-            else:
-                print(f"  Warning: Coordinates out of range: {lat}, {lon}")
-    except Exception as e:
-        print(f"  Warning: Could not parse coordinate '{value}': {e}")
-    return pd.NA, pd.NA
+# Coordinate parsing is shared with the Flask app (Template/coordinates.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Template"))
+from coordinates import format_rejections, parse_coordinates
 
 
 def find_coordinate_column(df):
@@ -106,9 +82,9 @@ def excel_to_geojson(excel_path, output_path):
             return False, 0, error_msg
         
         # Parse coordinates
-        coords = df[coord_column].apply(_parse_coordinates)
-        df["latitude"] = coords.apply(lambda x: x[0])
-        df["longitude"] = coords.apply(lambda x: x[1])
+        df["latitude"], df["longitude"], counts = parse_coordinates(df[coord_column])
+        if counts["unparseable"] or counts["out_of_bounds"]:
+            print(f"  Warning: Rejected '{coord_column}' values ({format_rejections(counts)})")
         
         # Filter rows with valid coordinates
         valid_mask = df["latitude"].notna() & df["longitude"].notna()
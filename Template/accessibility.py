@@ -0,0 +1,253 @@
+"""
+Population-weighted accessibility of store networks.
+
+Each district's population is spread evenly over sample points inside its
+polygon: the centers of a small grid laid over the district's bounding box,
+kept where they fall inside the district itself. Districts too small to catch
+a grid point get one representative point. The distance from every sample to
+the nearest store of every brand is computed in one pass
+(spatial.nearest_by_group); per-brand, per-state and per-district summaries are
+then weighted sums over that (samples x brands) matrix. Coverage within given
+radii counts the stores around each sample from one radius query of a grid
+index over the selected brands' stores (spatial.GridIndex.query_radius_many).
+"""
+
+import numpy as np
+
+from district_resolver import canonical_state
+from spatial import GridIndex, PolygonIndex, nearest_by_group
+
+# Grid points per side laid over each district's bounding box
+SAMPLE_GRID = 5
+
+
+def _exterior_rings(geometry):
+    if geometry.get('type') == 'Polygon':
+        return [np.asarray(geometry['coordinates'][0], dtype=float)[:, :2]]
+    if geometry.get('type') == 'MultiPolygon':
+        return [np.asarray(polygon[0], dtype=float)[:, :2] for polygon in geometry['coordinates']]
+    return []
+
+
+def district_sample_points(features, grid=SAMPLE_GRID):
+    """
+    Sample points inside each district polygon.
+
+    Returns (lat, lon, district) arrays, where district is the feature position
+    of each sample. Features without polygon geometry get no samples.
+    """
+    rings = [_exterior_rings(f.get('geometry') or {}) for f in features]
+    fractions = (np.arange(grid) + 0.5) / grid
+    cand_lat, cand_lon, cand_district = [], [], []
+    for position, exteriors in enumerate(rings):
+        if not exteriors:
+            continue
+        coords = np.vstack(exteriors)
+        (min_lon, min_lat), (max_lon, max_lat) = coords.min(axis=0), coords.max(axis=0)
+        gx, gy = np.meshgrid(min_lon + fractions * (max_lon - min_lon), min_lat + fractions * (max_lat - min_lat))
+        cand_lon.append(gx.ravel())
+        cand_lat.append(gy.ravel())
+        cand_district.append(np.full(gx.size, position, dtype=np.int64))
+
+    if not cand_lat:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    lat, lon, district = np.concatenate(cand_lat), np.concatenate(cand_lon), np.concatenate(cand_district)
+    keep = PolygonIndex(features).locate(lat, lon) == district
+    lat, lon, district = lat[keep], lon[keep], district[keep]
+
+    # Representative point (vertex mean of the largest part) for districts the grid missed
+    missed = [p for p, exteriors in enumerate(rings) if exteriors and p not in set(district.tolist())]
+    if missed:
+        extra = np.array([
+            max(rings[p], key=lambda ring: np.ptp(ring, axis=0).prod()).mean(axis=0) for p in missed
+        ])
+        lat = np.concatenate([lat, extra[:, 1]])
+        lon = np.concatenate([lon, extra[:, 0]])
+        district = np.concatenate([district, np.asarray(missed, dtype=np.int64)])
+    return lat, lon, district
+
+
+class AccessibilityIndex:
+    """
+    Distance from the population of every district to the nearest store of each brand.
+
+    Args:
+        features: District GeoJSON features (their 'state' property, in
+            canonical form, groups them)
+        population_k: Population (thousands) per feature; NaN where unknown
+        store_lat, store_lon: Store coordinates
+        brand_keys: Brand key per store
+    """
+
+    def __init__(self, features, population_k, store_lat, store_lon, brand_keys, grid=SAMPLE_GRID):
+        self.features = features
+        population = np.nan_to_num(np.asarray(population_k, dtype=float), nan=0.0)
+        self.population = population
+        self.lat, self.lon, self.district = district_sample_points(features, grid)
+
+        samples_per_district = np.bincount(self.district, minlength=len(features))
+        self.weights = population[self.district] / samples_per_district[self.district]
+
+        # States are grouped by their canonical key, so aliases of one state
+        # ('KUL' / 'WPK', 'Selangor' / 'SGR') are summed together under the
+        # first spelling seen
+        states = [str((f.get('properties') or {}).get('state') or 'Unknown') for f in features]
+        keys = [canonical_state(state) or state for state in states]
+        first = {}
+        for key, state in zip(keys, states):
+            first.setdefault(key, state)
+        order = sorted(first, key=lambda key: first[key])
+        position = {key: i for i, key in enumerate(order)}
+        self.state_names = np.asarray([first[key] for key in order], dtype=object)
+        self.district_state = np.asarray([position[key] for key in keys], dtype=np.int64)
+
+        store_lat = np.asarray(store_lat, dtype=float)
+        store_lon = np.asarray(store_lon, dtype=float)
+        valid = ~(np.isnan(store_lat) | np.isnan(store_lon))
+        self.store_lat, self.store_lon = store_lat[valid], store_lon[valid]
+        self.brands, codes = np.unique(np.asarray(brand_keys, dtype=object)[valid].astype(str), return_inverse=True)
+        self.store_brand = codes.astype(np.int64)
+        self.distances = nearest_by_group(
+            self.lat, self.lon, self.store_lat, self.store_lon, self.store_brand, len(self.brands)
+        )
+
+    def summary(self, beyond_km, brand_keys=None, deserts=10):
+        """
+        Population-weighted accessibility per brand, overall and per state.
+
+        For each brand: the population-weighted mean distance to its nearest
+        store, the population (thousands) farther than each `beyond_km`
+        distance, the same per state, and up to `deserts` districts where most
+        residents live beyond the largest distance ('store deserts'), largest
+        population beyond first.
+        """
+        columns = [i for i, b in enumerate(self.brands) if brand_keys is None or b in brand_keys]
+        distances = self.distances[:, columns]
+        w = self.weights
+        thresholds = sorted(beyond_km)
+
+        n_districts, n_states = len(self.features), len(self.state_names)
+        sample_state = self.district_state[self.district]
+
+        def by_group(index, n, values):
+            out = np.zeros((n, values.shape[1]))
+            np.add.at(out, index, values)
+            return out
+
+        weighted = w[:, None] * distances
+        state_population = np.bincount(self.district_state, weights=self.population, minlength=n_states)
+        state_mean = by_group(sample_state, n_states, weighted) / np.where(state_population > 0, state_population, 1)[:, None]
+        beyond = {x: w[:, None] * (distances > x) for x in thresholds}
+        state_beyond = {x: by_group(sample_state, n_states, values) for x, values in beyond.items()}
+        district_beyond = by_group(self.district, n_districts, beyond[thresholds[-1]])
+        district_mean = by_group(self.district, n_districts, weighted)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            district_share = district_beyond / self.population[:, None]
+            district_mean = district_mean / self.population[:, None]
+
+        total_population = float(self.population.sum())
+        results = {}
+        for j, column in enumerate(columns):
+            is_desert = (self.population > 0) & (district_share[:, j] > 0.5)
+            desert_ids = np.flatnonzero(is_desert)
+            desert_ids = desert_ids[np.argsort(-district_beyond[desert_ids, j], kind='stable')][:deserts]
+            results[str(self.brands[column])] = {
+                "weighted_mean_km": round(float(weighted[:, j].sum() / total_population), 3) if total_population else None,
+                "population_beyond_k": {f'{x:g}': round(float(beyond[x][:, j].sum()), 1) for x in thresholds},
+                "desert_districts": int(is_desert.sum()),
+                "states": {
+                    str(state): {
+                        "population_k": round(float(state_population[s]), 1),
+                        "weighted_mean_km": round(float(state_mean[s, j]), 3),
+                        "population_beyond_k": {f'{x:g}': round(float(state_beyond[x][s, j]), 1) for x in thresholds},
+                    }
+                    for s, state in enumerate(self.state_names) if state_population[s] > 0
+                },
+                "deserts": [
+                    {
+                        "district_id": int(d),
+                        "district": (self.features[d].get('properties') or {}).get('name'),
+                        "state": str(self.state_names[self.district_state[d]]),
+                        "population_k": round(float(self.population[d]), 1),
+                        "share_beyond": round(float(district_share[d, j]), 3),
+                        "weighted_mean_km": round(float(district_mean[d, j]), 3),
+                    }
+                    for d in desert_ids
+                ],
+            }
+        return results
+
+    def coverage(self, radii_km, brand_keys=None):
+        """
+        Population and districts within each radius of a brand's stores, overall and per state.
+
+        A resident (sample point) is covered at radius r when a store of the
+        brand is within r km; a district counts as covered when most of its
+        population is. 'mean_stores_reachable' is the population-weighted
+        number of the brand's stores within r. All radii are evaluated in one
+        pass over the selected brands' stores.
+        """
+        columns = [i for i, b in enumerate(self.brands) if brand_keys is None or b in brand_keys]
+        selected = np.isin(self.store_brand, columns)
+        remap = np.full(len(self.brands), -1, dtype=np.int64)
+        remap[columns] = np.arange(len(columns))
+        # Stores of the selected brands within the largest radius of each sample,
+        # then counted per (sample, brand) for every radius
+        index = GridIndex(self.store_lat[selected], self.store_lon[selected], ids=remap[self.store_brand[selected]])
+        sample, brand, distance = index.query_radius_many(self.lat, self.lon, max(radii_km))
+        keys = sample * len(columns) + brand
+        counts = np.stack([
+            np.bincount(keys[distance <= r], minlength=len(self.lat) * len(columns)) for r in radii_km
+        ], axis=-1).reshape(len(self.lat), len(columns), len(radii_km))  # samples x brands x radii
+
+        n_districts, n_states = len(self.features), len(self.state_names)
+        w = self.weights[:, None, None]
+        covered = np.zeros((n_districts,) + counts.shape[1:])
+        np.add.at(covered, self.district, w * (counts > 0))
+        reachable = (w * counts).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            district_covered = (self.population > 0)[:, None, None] & (covered / self.population[:, None, None] > 0.5)
+
+        state_population = np.bincount(self.district_state, weights=self.population, minlength=n_states)
+        state_covered = np.zeros((n_states,) + counts.shape[1:])
+        np.add.at(state_covered, self.district_state, covered)
+        state_districts = np.zeros((n_states,) + counts.shape[1:], dtype=np.int64)
+        np.add.at(state_districts, self.district_state, district_covered)
+        districts_per_state = np.bincount(self.district_state, weights=self.population > 0, minlength=n_states)
+
+        total_population = float(self.population.sum())
+
+        def share(part, whole):
+            return round(float(part / whole), 4) if whole > 0 else None
+
+        results = {}
+        for j, column in enumerate(columns):
+            results[str(self.brands[column])] = {
+                "radii": {
+                    f'{r:g}': {
+                        "covered_population_k": round(float(covered[:, j, k].sum()), 1),
+                        "covered_share": share(covered[:, j, k].sum(), total_population),
+                        "covered_districts": int(district_covered[:, j, k].sum()),
+                        "mean_stores_reachable": round(float(reachable[j, k] / total_population), 3)
+                        if total_population else None,
+                    }
+                    for k, r in enumerate(radii_km)
+                },
+                "states": {
+                    str(state): {
+                        "population_k": round(float(state_population[s]), 1),
+                        "districts": int(districts_per_state[s]),
+                        "radii": {
+                            f'{r:g}': {
+                                "covered_population_k": round(float(state_covered[s, j, k]), 1),
+                                "covered_share": share(state_covered[s, j, k], state_population[s]),
+                                "covered_districts": int(state_districts[s, j, k]),
+                            }
+                            for k, r in enumerate(radii_km)
+                        },
+                    }
+                    for s, state in enumerate(self.state_names) if state_population[s] > 0
+                },
+            }
+        return results
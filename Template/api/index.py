@@ -14,8 +14,8 @@ from app import (
     _load_brand_file,
     _load_district_stats,
     _normalize_key,
-    _extract_brand_name_from_filename,
-    _filename_to_brand_key,
+    extract_brand_name_from_filename,
+    filename_to_brand_key,
     BRAND_COLORS,
     _scan_finalized_data_folder,
     load_data
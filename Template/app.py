@@ -1,30 +1,91 @@
-from flask import Flask, render_template, jsonify, send_from_directory
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory, stream_with_context
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
+import gzip
+import hashlib
 import json
+import math
 import os
+import shutil
+import threading
+import time
+
+from accessibility import AccessibilityIndex
+from brand_names import extract_brand_name_from_filename, filename_to_brand_key
+from clustering import ClusterIndex
+from concentration import concentration_metrics
+from cube import CUBE_DIMENSIONS, MISSING_LABEL, RollupCube, cube_payload, parse_group_by
+from coordinates import format_rejections, parse_coordinates
+from hexgrid import MAX_RESOLUTION as HEX_MAX_RESOLUTION, MIN_RESOLUTION as HEX_MIN_RESOLUTION, HexBins, cell_boundaries
+from district_resolver import STATE_CODES, DistrictResolver, canonical_district, canonical_state
+from spatial import GridIndex, PolygonIndex, nearest_targets, radius_pairs
+from store_index import FILTER_COLUMNS, StoreIndex, parse_bbox
+from topology import TopologySimplifier, quantization_decimals
+from vector_tiles import PointLayerSource, PolygonLayerSource, encode_tile, tile_range
+from whitespace import whitespace_payload
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; the compiled snapshot falls back to pickle
+    feather = None
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; responses are then offered as gzip/identity only
+    brotli = None
 
 app = Flask(__name__)
 
+# Where the compiled (columnar) store snapshot and its manifest are written
+SNAPSHOT_DIR = os.environ.get(
+    'STORE_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'),
+)
+SNAPSHOT_MANIFEST_FILE = 'stores.manifest.json'
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Number of worker processes used to parse brand workbooks (1 = serial)
+STORE_LOAD_WORKERS = int(os.environ.get('STORE_LOAD_WORKERS', '1'))
+
+# Pre-serialized API responses: clients must revalidate, but get a 304 when unchanged
+API_CACHE_CONTROL = 'public, no-cache'
+RESPONSE_CACHE_MAX_ENTRIES = 64
+
+# Number of features serialized per chunk when streaming GeoJSON responses
+GEOJSON_STREAM_CHUNK_SIZE = 500
+
+# Derived per-snapshot structures (indexes, feature lists, ...) kept in memory
+SNAPSHOT_ARTIFACT_MAX_ENTRIES = 128
+
+# Rendered vector tiles are cached on disk per layer and source version
+TILE_CACHE_DIR = os.environ.get('TILE_CACHE_DIR', os.path.join(SNAPSHOT_DIR, 'tiles'))
+
 
 def _parse_coordinates(value):
     """Parse a 'lat, lon' or 'lat, \\nlon' string into (lat, lon) floats."""
-    if pd.isna(value):
+    lat, lon, _ = parse_coordinates([value])
+    if pd.isna(lat[0]):
         return pd.NA, pd.NA
-    try:
-        # Handle various formats: "lat, lon", "lat,lon", "lat\nlon", etc.
-        value_str = str(value).replace("\\n", " ").replace("\n", " ").strip()
-        parts = value_str.split(",")
-        if len(parts) >= 2:
-            lat = float(str(parts[0]).strip())
-            lon = float(str(parts[1]).strip())
-            # Validate coordinates are reasonable (Malaysia is roughly 0-7°N, 100-120°E)
-            if 0 <= lat <= 10 and 95 <= lon <= 125:
-                return lat, lon
-            else:
-                print(f"  Warning: Coordinates out of range: {lat}, {lon}")
-    except Exception as e:
-        print(f"  Warning: Could not parse coordinate '{value}': {e}")
-    return pd.NA, pd.NA
+    return float(lat[0]), float(lon[0])
+
+
+def _assign_coordinates(df, column):
+    """
+    Parse df[column] into 'latitude'/'longitude' columns in one vectorized pass.
+
+    Prints a single aggregated warning for rejected cells and returns the number
+    of valid coordinates.
+    """
+    lat, lon, counts = parse_coordinates(df[column])
+    df["latitude"] = lat
+    df["longitude"] = lon
+    if counts['unparseable'] or counts['out_of_bounds']:
+        print(f"  Warning: Rejected '{column}' values ({format_rejections(counts)})")
+    return counts['valid']
 
 
 def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
@@ -80,18 +141,12 @@ def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
         coord_column = "position " if "position " in df.columns else "position"
     
     if coord_column:
-        coords = df[coord_column].apply(_parse_coordinates)
-        df["latitude"] = coords.apply(lambda x: x[0])
-        df["longitude"] = coords.apply(lambda x: x[1])
-        
+        valid_coords_count = _assign_coordinates(df, coord_column)
+
         # Check if we got valid coordinates - if not, try Address column as fallback
-        valid_coords_count = df["latitude"].notna().sum()
         if valid_coords_count == 0 and "Address" in df.columns:
             print(f"  Warning: '{coord_column}' column did not yield valid coordinates, trying 'Address' column as fallback")
-            coords = df["Address"].apply(_parse_coordinates)
-            df["latitude"] = coords.apply(lambda x: x[0])
-            df["longitude"] = coords.apply(lambda x: x[1])
-            valid_coords_count = df["latitude"].notna().sum()
+            valid_coords_count = _assign_coordinates(df, "Address")
             if valid_coords_count > 0:
                 print(f"  Using 'Address' column for coordinates (found {valid_coords_count} valid coordinates)")
             else:
@@ -102,15 +157,10 @@ def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
         # Try Address as last resort
         if "Address" in df.columns:
             print(f"  No standard coordinate column found, trying 'Address' column")
-            coords = df["Address"].apply(_parse_coordinates)
-            df["latitude"] = coords.apply(lambda x: x[0])
-            df["longitude"] = coords.apply(lambda x: x[1])
-            valid_coords_count = df["latitude"].notna().sum()
+            valid_coords_count = _assign_coordinates(df, "Address")
             if valid_coords_count > 0:
                 print(f"  Using 'Address' column for coordinates (found {valid_coords_count} valid coordinates)")
             else:
-                df["latitude"] = pd.NA
-                df["longitude"] = pd.NA
                 print(f"  Warning: 'Address' column did not yield valid coordinates. Available columns: {list(df.columns)}")
         else:
             df["latitude"] = pd.NA
@@ -157,6 +207,19 @@ def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
     return df
 
 
+def _district_stats_candidates():
+    """Locations searched (in order) for the District Statistics workbook."""
+    base_dir = os.path.dirname(__file__)
+    return [
+        os.path.join(base_dir, '..', 'District Data', 'District Statistics .xlsx'),
+        os.path.join(base_dir, '..', 'District Data', 'District Statistics.xlsx'),
+        os.path.join(os.path.dirname(base_dir), 'District Data', 'District Statistics .xlsx'),
+        os.path.join(os.path.dirname(base_dir), 'District Data', 'District Statistics.xlsx'),
+        os.path.join('/var/task', 'District Data', 'District Statistics .xlsx'),  # Vercel path
+        os.path.join('/var/task', 'District Data', 'District Statistics.xlsx'),  # Vercel path
+    ]
+
+
 def _load_district_stats():
     """
     Load district-level statistics for choropleth overlay.
@@ -168,15 +231,7 @@ def _load_district_stats():
     - 'Income per capita'
     - 'Income'
     """
-    base_dir = os.path.dirname(__file__)
-    candidates = [
-        os.path.join(base_dir, '..', 'District Data', 'District Statistics .xlsx'),
-        os.path.join(base_dir, '..', 'District Data', 'District Statistics.xlsx'),
-        os.path.join(os.path.dirname(base_dir), 'District Data', 'District Statistics .xlsx'),
-        os.path.join(os.path.dirname(base_dir), 'District Data', 'District Statistics.xlsx'),
-        os.path.join('/var/task', 'District Data', 'District Statistics .xlsx'),  # Vercel path
-        os.path.join('/var/task', 'District Data', 'District Statistics.xlsx'),  # Vercel path
-    ]
+    candidates = _district_stats_candidates()
 
     df = None
     for path in candidates:
@@ -229,118 +284,6 @@ def _normalize_key(state: str, district: str) -> str:
     return f"{norm(state)}|{norm(district)}"
 
 
-def _extract_brand_name_from_filename(filename: str) -> str:
-    """Extract brand name from Excel filename, cleaning it up."""
-    # Remove .xlsx extension
-    name = filename.replace('.xlsx', '').strip()
-    
-    # Handle common patterns
-    name = name.replace('_CLEANED', '').replace('_DONE', '').replace(' done', '').replace(' DONE', '')
-    name = name.replace('Locations', '').replace('Data', '').replace(' done', '').strip()
-    
-    # Handle special cases first
-    if 'Parkson' in name and ('Aeon' in name or 'aeon' in name):
-        return 'Parkson Aeon'
-    # Handle Parkson.xlsx - recognize as Parkson
-    if name == 'Parkson' or name.lower() == 'parkson':
-        return 'Parkson'
-    # Handle 711.xlsx - recognize as 7-Eleven
-    if name == '711' or name.startswith('711'):
-        return '7-Eleven'
-    if '7-Eleven' in name or '7Eleven' in name or '7-Eleven' in name:
-        return '7-Eleven'
-    # Handle Aeon_updated.xlsx - recognize as Aeon
-    if 'Aeon_updated' in name or (name.startswith('Aeon') and 'updated' in name.lower()):
-        return 'Aeon'
-    if name == 'Aeon' or name.lower() == 'aeon':
-        return 'Aeon'
-    if 'MRDiy' in name or 'MR DIY' in name or 'MRDiy' in name:
-        return 'MR DIY'
-    if 'MRToy' in name or 'MR Toy' in name or 'MRToy' in name:
-        return 'MR Toy'
-    if 'Eco-Shop' in name or 'EcoShop' in name:
-        return 'Eco-Shop'
-    if '99 SpeedMart' in name or '99SpeedMart' in name:
-        return '99 SpeedMart'
-    if 'OldTown' in name or 'Old Town' in name:
-        return 'OldTown White Coffee'
-    if 'Oriental Kopi' in name or 'OrientalKopi' in name:
-        return 'Oriental Kopi'
-    if 'Tea Garden' in name or 'TeaGarden' in name:
-        return 'Tea Garden'
-    if 'Family Mart' in name or 'FamilyMart' in name:
-        return 'Family Mart'
-    if 'KK Mart' in name or 'KKMart' in name or 'KK Supermart' in name:
-        return 'KK Mart'
-    if 'MyNews' in name or 'My News' in name or 'MyNews Mart' in name:
-        return 'MyNews Mart'
-    if 'Poh Kong' in name or 'PohKong' in name:
-        return 'Poh Kong'
-    if 'Wah Chan' in name or 'WahChan' in name:
-        return 'Wah Chan'
-    if 'Habib' in name and 'Jewels' in name:
-        return 'Habib Jewels'
-    if 'H&M' in name or 'HNM' in name:
-        return 'H&M'
-    
-    # Clean up remaining name
-    name = name.strip()
-    # Capitalize properly
-    if name:
-        # Split by spaces and capitalize each word
-        words = name.split()
-        name = ' '.join(word.capitalize() for word in words)
-    
-    return name
-
-
-def _filename_to_brand_key(filename: str) -> str:
-    """Convert filename to normalized brand_key."""
-    name = _extract_brand_name_from_filename(filename).lower()
-    
-    # Remove special characters, keep only alphanumeric
-    key = ''.join(ch for ch in name if ch.isalnum() or ch == ' ')
-    key = key.replace(' ', '').strip()
-    
-    # Handle special cases
-    if '7-eleven' in key or '7eleven' in key or key == '711':
-        return '7eleven'
-    if 'parkson' in key and 'aeon' in key:
-        return 'parksonaeon'
-    if key == 'parkson':
-        return 'parkson'
-    if key == 'aeon' or key == 'aeonupdated':
-        return 'aeon'
-    if 'mrdiy' in key or 'mr diy' in key:
-        return 'mrdiy'
-    if 'mrtoy' in key or 'mr toy' in key:
-        return 'mrtoy'
-    if 'orientalkopi' in key or 'oriental kopi' in key:
-        return 'orientalkopi'
-    if 'oldtown' in key or 'old town' in key:
-        return 'oldtown'
-    if 'teagarden' in key or 'tea garden' in key:
-        return 'teagarden'
-    if 'familymart' in key or 'family mart' in key:
-        return 'familymart'
-    if 'kkmart' in key or 'kk mart' in key or 'kksupermart' in key:
-        return 'kkmart'
-    if 'mynews' in key or 'my news' in key:
-        return 'mynews'
-    if 'speedmart' in key or '99 speedmart' in key:
-        return 'speedmart'
-    if 'ecoshop' in key or 'eco-shop' in key:
-        return 'ecoshop'
-    if 'pohkong' in key or 'poh kong' in key:
-        return 'pohkong'
-    if 'wahchan' in key or 'wah chan' in key:
-        return 'wahchan'
-    if 'habib' in key:
-        return 'habib'
-    
-    return key
-
-
 # Brand color mapping based on user specifications
 BRAND_COLORS = {
     'mrdiy': '#FFC82E',
@@ -370,11 +313,8 @@ BRAND_COLORS = {
 }
 
 
-def _scan_finalized_data_folder():
-    """
-    Dynamically scan the Finalized Data folder structure.
-    Returns a list of tuples: (filepath, category, brand_name, brand_key, has_type_column)
-    """
+def _finalized_data_path():
+    """Locate the Finalized Data folder; raises FileNotFoundError if it is missing."""
     base_dir = os.path.dirname(__file__)
     
     # Try multiple path candidates for robustness in different environments
@@ -385,17 +325,22 @@ def _scan_finalized_data_folder():
         os.path.join("/var/task", "Finalized Data"),  # Vercel serverless path
     ]
     
-    finalized_data_path = None
     for candidate in finalized_data_candidates:
         if os.path.exists(candidate):
-            finalized_data_path = candidate
-            break
+            return candidate
     
-    if finalized_data_path is None:
-        raise FileNotFoundError(
-            f"Finalized Data folder not found. Tried: {finalized_data_candidates}. "
-            f"Current working directory: {os.getcwd()}, Base dir: {base_dir}"
-        )
+    raise FileNotFoundError(
+        f"Finalized Data folder not found. Tried: {finalized_data_candidates}. "
+        f"Current working directory: {os.getcwd()}, Base dir: {base_dir}"
+    )
+
+
+def _scan_finalized_data_folder():
+    """
+    Dynamically scan the Finalized Data folder structure.
+    Returns a list of tuples: (filepath, category, brand_name, brand_key, has_type_column)
+    """
+    finalized_data_path = _finalized_data_path()
     
     discovered_files = []
     
@@ -407,8 +352,8 @@ def _scan_finalized_data_folder():
                 item_path = os.path.join(finalized_data_path, item)
                 if os.path.isfile(item_path) and item.lower().endswith('.xlsx'):
                     filename = os.path.basename(item)
-                    brand_name = _extract_brand_name_from_filename(filename)
-                    brand_key = _filename_to_brand_key(filename)
+                    brand_name = extract_brand_name_from_filename(filename)
+                    brand_key = filename_to_brand_key(filename)
                     
                     # Group MR DIY and MR TOY into the same category
                     if brand_key.lower() in ['mrdiy', 'mrtoy']:
@@ -441,8 +386,8 @@ def _scan_finalized_data_folder():
                             if os.path.isfile(subitem_path) and subitem.lower().endswith('.xlsx'):
                                 filename = os.path.basename(subitem)
                                 
-                                brand_name = _extract_brand_name_from_filename(filename)
-                                brand_key = _filename_to_brand_key(filename)
+                                brand_name = extract_brand_name_from_filename(filename)
+                                brand_key = filename_to_brand_key(filename)
                                 
                                 # Check if it's Padini (has Type column)
                                 has_type = 'padini' in brand_key.lower()
@@ -460,478 +405,2172 @@ def _scan_finalized_data_folder():
     return discovered_files
 
 
-def load_data():
+def _source_signature(discovered_files):
     """
-    Load and combine all brand datasets into a single dataframe.
-    Dynamically scans the Finalized Data folder structure.
+    Build a cheap fingerprint of the discovered brand files.
+
+    Uses (path, category, brand_key, has_type_column, mtime, size) for each file so
+    the store snapshot is rebuilt only when a workbook is added, removed or edited.
     """
-    dataframes = []
-    discovered_files = _scan_finalized_data_folder()
-    
-    # Load each discovered file
+    signature = []
     for filepath, category, brand_name, brand_key, has_type_column in discovered_files:
         try:
-            # Use absolute path directly since _load_brand_file now handles it
-            df = _load_brand_file(filepath, brand_key, brand_name, has_type_column=has_type_column)
-            df["category"] = category  # Store the category
-            dataframes.append(df)
-        except Exception as e:
-            print(f"Warning: Failed to load {filepath}: {e}")
+            st = os.stat(filepath)
+            mtime_ns, size = st.st_mtime_ns, st.st_size
+        except OSError:
+            mtime_ns, size = None, None
+        signature.append((os.path.abspath(filepath), category, brand_key, has_type_column, mtime_ns, size))
+    return tuple(sorted(signature, key=lambda s: s[0]))
+
+
+@dataclass(frozen=True)
+class StoreSnapshot:
+    """
+    Immutable, process-wide view of all stores.
+
+    `df` is shared by every request - callers must .copy() before mutating it.
+    `version` is a short hash of the source signature and changes whenever any
+    workbook in Finalized Data changes.
+    """
+    df: pd.DataFrame
+    version: str
+    signature: tuple
+    built_at: float
+    build_seconds: float
+
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+_snapshot_stats = {
+    'hits': 0,
+    'misses': 0,
+    'last_build_seconds': None,
+    'last_build_source': None,
+    'last_ingest': None,
+}
+
+
+def _load_brand_file_timed(filepath, category, brand_name, brand_key, has_type_column):
+    """
+    Load one discovered workbook, tagging it with its category.
+
+    Runs in a worker process when parallel ingestion is enabled, so it never
+    raises: failures are returned in the timing record instead.
+    """
+    start = time.perf_counter()
+    df, error = None, None
+    try:
+        # Use absolute path directly since _load_brand_file now handles it
+        df = _load_brand_file(filepath, brand_key, brand_name, has_type_column=has_type_column)
+        df["category"] = category  # Store the category
+    except Exception as e:
+        error = str(e)
+    return df, {
+        'file': _source_key(filepath),
+        'brand_key': brand_key,
+        'rows': int(len(df)) if df is not None else 0,
+        'seconds': round(time.perf_counter() - start, 3),
+        'error': error,
+    }
+
+
+def _build_store_dataframe(discovered_files, workers=None):
+    """
+    Load every discovered brand file and combine them into a single dataframe.
+
+    With workers > 1 (default: STORE_LOAD_WORKERS) each workbook is parsed in its
+    own task on a process pool. Results are concatenated in discovery order, so
+    the output is identical to a serial load. Per-file timings and failures are
+    recorded in _snapshot_stats['last_ingest'].
+    """
+    workers = STORE_LOAD_WORKERS if workers is None else workers
+    start = time.perf_counter()
+
+    results = None
+    if workers > 1 and len(discovered_files) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(discovered_files))) as pool:
+                results = list(pool.map(_load_brand_file_timed, *zip(*discovered_files)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # Some serverless runtimes cannot spawn processes
+            print(f"Warning: Parallel ingestion unavailable ({e}), loading serially")
+            results = None
+            workers = 1
+    if results is None:
+        workers = 1
+        results = [_load_brand_file_timed(*entry) for entry in discovered_files]
+
+    dataframes = []
+    for df, timing in results:
+        if timing['error'] is not None:
+            print(f"Warning: Failed to load {timing['file']}: {timing['error']}")
             continue
-    
+        dataframes.append(df)
+
+    _snapshot_stats['last_ingest'] = {
+        'workers': workers,
+        'seconds': round(time.perf_counter() - start, 3),
+        'files': [timing for _, timing in results],
+        'failures': [timing for _, timing in results if timing['error'] is not None],
+    }
+
     if not dataframes:
         raise ValueError("No data files found in Finalized Data folder")
-    
+
     combined = pd.concat(dataframes, ignore_index=True)
-    
+
     # Use category as sector (for backward compatibility with existing frontend)
     combined["sector"] = combined.get("category", "").fillna("")
-    
+
     return combined
 
-@app.route('/')
-def index():
-    return render_template('index.html')
 
-@app.route('/favicon.ico')
-def favicon():
-    return '', 204  # Return empty response with 204 status
+def _normalize_snapshot_columns(df):
+    """
+    Coerce mixed-type object columns to strings so the frame can be stored columnar.
 
-@app.route('/api/data')
-def get_data():
-    try:
-        df = load_data()
-        # Clean the data for API output
-        df_clean = df.copy()
-        df_clean['City'] = df_clean.get('City', '').fillna('Unknown').astype(str)
-        df_clean['State'] = df_clean.get('State', '').fillna('Unknown').astype(str)
-        df_clean['Store Name'] = df_clean.get('Store Name', '').fillna('Unknown Store').astype(str)
-        df_clean['brand'] = df_clean.get('brand', '').fillna('Unknown').astype(str)
-        df_clean['brand_key'] = df_clean.get('brand_key', '').fillna('').astype(str)
-        df_clean['Type'] = df_clean.get('Type', '').fillna('').astype(str)
-        df_clean['sector'] = df_clean.get('sector', '').fillna('').astype(str)
-        df_clean['category'] = df_clean.get('category', '').fillna('').astype(str)
-
-        # Build per-store GeoJSON features (one point per store)
-        features = []
-        for idx, row in df_clean.iterrows():
-            brand_key = str(row.get('brand_key', '')).lower()
-            category = str(row.get('category', ''))
-            # Get brand color
-            brand_color = BRAND_COLORS.get(brand_key, '#666666')
-            
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [float(row['longitude']), float(row['latitude'])]
-                },
-                "properties": {
-                    "id": int(idx),
-                    "store_code": str(row.get('Type', '')),
-                    "store_name": str(row['Store Name']),
-                    "address": str(row.get('Address', '')).replace('\\n', ', '),
-                    "city": str(row.get('City', '')),
-                    "state": str(row.get('State', '')),
-                    "brand": str(row.get('brand', '')),
-                    "brand_key": brand_key,
-                    "sector": str(row.get('sector', '')),
-                    "category": category,
-                    "color": brand_color,
-                }
-            }
-            features.append(feature)
+    Raw Excel columns (e.g. 'Postcode', 'Coordinates') mix ints, floats and strings;
+    missing values become None and everything else is stringified.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = df[col]
+        if values.map(lambda v: isinstance(v, str)).all():
+            continue
+        df[col] = values.map(lambda v: None if pd.isna(v) else str(v)).astype(object)
+    return df
 
-        return jsonify({
-            "type": "FeatureCollection",
-            "features": features
-        })
-    except Exception as e:
-        import traceback
-        return jsonify({
-            "error": "Failed to load data",
-            "message": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
 
-@app.route('/api/categories')
-def get_categories():
-    """
-    Return all available categories with their companies.
-    """
-    try:
-        discovered_files = _scan_finalized_data_folder()
-        
-        # Group by category
-        categories = {}
-        for filepath, category, brand_name, brand_key, has_type_column in discovered_files:
-            if category not in categories:
-                categories[category] = []
-            
-            color = BRAND_COLORS.get(brand_key.lower(), '#666666')
-            categories[category].append({
-                'brand_name': brand_name,
-                'brand_key': brand_key,
-                'color': color
-            })
-        
-        # Convert to list format for frontend
-        result = []
-        for category, companies in sorted(categories.items()):
-            result.append({
-                'category': category,
-                'companies': sorted(companies, key=lambda x: x['brand_name'])
-            })
-        
-        return jsonify(result)
-    except Exception as e:
-        import traceback
-        return jsonify({
-            "error": "Failed to load categories",
-            "message": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
+def _source_key(filepath):
+    """Portable manifest key for a workbook: '<parent folder>/<filename>'."""
+    return f"{os.path.basename(os.path.dirname(filepath))}/{os.path.basename(filepath)}"
 
 
-@app.route('/api/brand-colors')
-def get_brand_colors():
-    """Return the complete brand color mapping."""
-    return jsonify(BRAND_COLORS)
+def _file_sha256(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-@app.route('/api/stats')
-def get_stats():
+def _snapshot_data_filename():
+    return 'stores.arrow' if feather is not None else 'stores.pkl'
+
+
+def _read_snapshot_manifest(snapshot_dir=None):
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    manifest_path = os.path.join(snapshot_dir, SNAPSHOT_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
     try:
-        df = load_data()
-        
-        # Calculate basic statistics
-        # Clean the data first
-        df_clean = df.copy()
-        df_clean['City'] = df_clean.get('City', '').fillna('Unknown').astype(str)
-        df_clean['State'] = df_clean.get('State', '').fillna('Unknown').astype(str)
-        df_clean['brand'] = df_clean.get('brand', '').fillna('Unknown').astype(str)
-        
-        # Remove rows with 'nan' or empty values
-        df_clean = df_clean[df_clean['City'] != 'nan']
-        df_clean = df_clean[df_clean['State'] != 'nan']
-        df_clean = df_clean[df_clean['City'] != '']
-        df_clean = df_clean[df_clean['State'] != '']
-        
-        stats = {
-            "total_locations": len(df),
-            "cities": df_clean['City'].value_counts().head(10).to_dict() if 'City' in df_clean.columns else {},
-            "states": df_clean['State'].value_counts().to_dict() if 'State' in df_clean.columns else {},
-            "brands": df_clean['brand'].value_counts().to_dict(),
-            "data_columns": list(df.columns)
-        }
-        
-        return jsonify(stats)
-    except Exception as e:
-        import traceback
-        return jsonify({
-            "error": "Failed to load stats",
-            "message": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read snapshot manifest {manifest_path}: {e}")
+        return None
 
 
-@app.route('/api/district_stats')
-def get_district_stats():
+def _manifest_is_fresh(manifest, discovered_files):
     """
-    Return district statistics for choropleth overlay.
+    Check a compiled snapshot manifest against the workbooks currently on disk.
 
-    The frontend will geocode these districts client-side using Mapbox
-    and build approximate polygons to color by the chosen metric.
+    Files whose mtime/size still match are trusted without hashing; anything else
+    is re-hashed so a touched-but-unchanged workbook does not force an Excel reload.
     """
-    try:
-        df = _load_district_stats()
-        # Ensure numeric types where possible
-        for col in ['population_k', 'income_pc', 'income_total']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    if not manifest or manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return False
 
-        records = df.to_dict(orient='records')
-        return jsonify(records)
-    except Exception as e:
-        import traceback
-        return jsonify({
-            "error": "Failed to load district stats",
-            "message": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
+    sources = {s['key']: s for s in manifest.get('sources', [])}
+    if len(sources) != len(discovered_files):
+        return False
+
+    for filepath, category, brand_name, brand_key, has_type_column in discovered_files:
+        source = sources.get(_source_key(filepath))
+        if source is None:
+            return False
+        if (source['category'], source['brand_key'], source['has_type_column']) != (category, brand_key, has_type_column):
+            return False
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return False
+        if st.st_mtime_ns == source['mtime_ns'] and st.st_size == source['size']:
+            continue
+        if st.st_size != source['size'] or _file_sha256(filepath) != source['sha256']:
+            return False
+    return True
 
 
-@app.route('/api/districts')
-def get_districts():
+def build_compiled_snapshot(discovered_files=None, snapshot_dir=None, combined=None, workers=None):
     """
-    Return district polygons with attached statistics for choropleth overlay.
+    Compile every brand workbook into one columnar snapshot file plus a manifest.
 
-    Expects a GeoJSON file at static/malaysia.district.geojson with district polygons.
-    Joins Excel stats to GeoJSON features by normalized (state, district) name.
+    The snapshot holds the combined dataframe after column detection, coordinate
+    parsing and brand/category tagging. It is written as an uncompressed Arrow IPC
+    (Feather v2) file so it can be memory-mapped, or as a pickle when pyarrow is
+    not installed. Returns the manifest dict.
     """
-    try:
-        base_dir = os.path.dirname(__file__)
-        geojson_path = os.path.join(base_dir, 'static', 'malaysia.district.geojson')
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    if discovered_files is None:
+        discovered_files = _scan_finalized_data_folder()
+    if combined is None:
+        combined = _normalize_snapshot_columns(_build_store_dataframe(discovered_files, workers=workers))
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    data_file = _snapshot_data_filename()
+    data_path = os.path.join(snapshot_dir, data_file)
+    tmp_path = data_path + '.tmp'
+    if feather is not None:
+        feather.write_feather(combined, tmp_path, compression='uncompressed')
+    else:
+        combined.to_pickle(tmp_path)
+    os.replace(tmp_path, data_path)
 
-        # Load district stats
-        stats_df = _load_district_stats()
-        for col in ['population_k', 'income_pc', 'income_total']:
-            stats_df[col] = pd.to_numeric(stats_df[col], errors='coerce')
-
-        # Helper function to normalize district names (handle W.P. vs Wp variations)
-        def normalize_district_name(name):
-            if not name:
-                return name
-            name_str = str(name).strip()
-            # Remove periods and normalize spacing
-            normalized = name_str.replace('.', '').strip()
-            # Handle W.P. variations - convert to consistent "Wp" format
-            if normalized.upper().startswith('WP '):
-                normalized = 'Wp ' + normalized[3:].strip()
-            elif normalized.upper().startswith('W P '):
-                normalized = 'Wp ' + normalized[4:].strip()
-            elif normalized.upper().startswith('WP'):
-                normalized = 'Wp ' + normalized[2:].strip()
-            return normalized
-
-        stats_df['join_key'] = stats_df.apply(
-            lambda r: _normalize_key(r['state'], r['district']),
-            axis=1
-        )
-        stats_map = {
-            key: {
-                'population_k': row['population_k'],
-                'income_pc': row['income_pc'],
-                'income_total': row['income_total'],
-            }
-            for key, row in stats_df.set_index('join_key').iterrows()
-        }
-        
-        # Create a secondary map for federal territories by district name only
-        # This handles the Excel data issue where State/District columns are swapped
-        ft_district_map = {}
-        for _, row in stats_df.iterrows():
-            state_val = str(row['state']).strip() if pd.notna(row['state']) else ''
-            district_val = str(row['district']).strip() if pd.notna(row['district']) else ''
-            # For federal territories, create a map by normalized district name
-            if 'Wp' in state_val or 'W.P.' in state_val or 'Wp' in district_val or 'W.P.' in district_val:
-                normalized_dist = normalize_district_name(district_val) if district_val else ''
-                if normalized_dist:
-                    # Use district name as key (handles swapped columns)
-                    ft_key = _normalize_key('', normalized_dist)  # Empty state, just district
-                    if ft_key not in ft_district_map:
-                        ft_district_map[ft_key] = {
-                            'population_k': row['population_k'],
-                            'income_pc': row['income_pc'],
-                            'income_total': row['income_total'],
-                        }
-        
-        # Create a secondary map for federal territories by district name only
-        # This handles the Excel data issue where State/District columns are swapped
-        ft_district_map = {}
-        for _, row in stats_df.iterrows():
-            state_val = str(row['state']).strip() if pd.notna(row['state']) else ''
-            district_val = str(row['district']).strip() if pd.notna(row['district']) else ''
-            # For federal territories, create a map by normalized district name
-            if 'Wp' in state_val or 'W.P.' in state_val or 'Wp' in district_val or 'W.P.' in district_val:
-                normalized_dist = normalize_district_name(district_val) if district_val else ''
-                if normalized_dist:
-                    # Use district name as key (handles swapped columns)
-                    ft_key = _normalize_key('', normalized_dist)  # Empty state, just district
-                    if ft_key not in ft_district_map:
-                        ft_district_map[ft_key] = {
-                            'population_k': row['population_k'],
-                            'income_pc': row['income_pc'],
-                            'income_total': row['income_total'],
-                        }
+    sources = []
+    for filepath, category, brand_name, brand_key, has_type_column in discovered_files:
+        st = os.stat(filepath)
+        sources.append({
+            'key': _source_key(filepath),
+            'category': category,
+            'brand_name': brand_name,
+            'brand_key': brand_key,
+            'has_type_column': has_type_column,
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha256': _file_sha256(filepath),
+        })
 
-        # Load district GeoJSON
-        try:
-            with open(geojson_path, 'r', encoding='utf-8') as f:
-                geo = json.load(f)
-        except FileNotFoundError:
-            return jsonify({'error': 'District GeoJSON not found', 'path': geojson_path}), 404
-
-        # Map of state codes (from GeoJSON) to full state names (from Excel)
-        # Note: GeoJSON uses KUL, LBN, PJY for federal territories, but Excel uses Wp prefix
-        state_code_map = {
-            'JHR': 'Johor',
-            'KDH': 'Kedah',
-            'KTN': 'Kelantan',
-            'MLK': 'Melaka',
-            'NSN': 'Negeri Sembilan',
-            'PHG': 'Pahang',
-            'PRK': 'Perak',
-            'PLS': 'Perlis',
-            'PNG': 'Pulau Pinang',
-            'SBH': 'Sabah',
-            'SWK': 'Sarawak',
-            'SGR': 'Selangor',
-            'TRG': 'Terengganu',
-            'WPK': 'Wp Kuala Lumpur',
-            'WPL': 'Wp Labuan',
-            'WPP': 'Wp Putrajaya',
-            # Add actual GeoJSON state codes
-            'KUL': 'Wp Kuala Lumpur',
-            'LBN': 'Wp Labuan',
-            'PJY': 'Wp Putrajaya',
-        }
+    manifest = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'format': 'arrow' if feather is not None else 'pickle',
+        'data_file': data_file,
+        'rows': int(len(combined)),
+        'built_at': time.time(),
+        'sources': sorted(sources, key=lambda s: s['key']),
+    }
+    manifest_path = os.path.join(snapshot_dir, SNAPSHOT_MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
 
-        # Attach stats to each feature where possible
-        unmatched_districts = []
-        for feature in geo.get('features', []):
-            props = feature.setdefault('properties', {})
 
-            # Try a few common property names
-            raw_state = (
-                props.get('state')
-                or props.get('State')
-                or props.get('STATE')
-            )
-            # Many district files use 'name' for district name
-            raw_district = (
-                props.get('district')
-                or props.get('District')
-                or props.get('DISTRICT')
-                or props.get('name')
-            )
+def _load_compiled_snapshot(discovered_files, snapshot_dir=None):
+    """
+    Fast path for load_data: read the compiled snapshot if its manifest is fresh.
 
-            # Normalize state: convert 3-letter codes (e.g. 'JHR') to full names (e.g. 'Johor')
-            if isinstance(raw_state, str) and len(raw_state) == 3 and raw_state.isupper():
-                state = state_code_map.get(raw_state, raw_state)
-            else:
-                state = raw_state
-
-            district = normalize_district_name(raw_district)
-
-            # Try multiple matching strategies
-            key = _normalize_key(state, district)
-            stats = stats_map.get(key)
-
-            # Fallback 1: For federal territories, try matching district name as state name
-            if not stats and state and 'Wp' in state:
-                # Try matching with just the district name (federal territories often have same name for state and district)
-                alt_key = _normalize_key(state, state.replace('Wp ', '').strip())
-                stats = stats_map.get(alt_key)
-                if not stats:
-                    # Try with "W.P." prefix variations
-                    for alt_state in [state, state.replace('Wp ', 'W.P. '), state.replace('Wp ', 'Wp ')]:
-                        alt_key = _normalize_key(alt_state, district)
-                        stats = stats_map.get(alt_key)
-                        if stats:
-                            break
-
-            # Fallback 2: For federal territories, match by district name only (handles swapped Excel columns)
-            if not stats and district and (state and ('Wp' in state or 'W.P.' in state) or district and ('Wp' in district or 'W.P.' in district)):
-                normalized_dist = normalize_district_name(district)
-                # Try matching by district name only (ignoring state column in Excel)
-                ft_key = _normalize_key('', normalized_dist)
-                ft_stats = ft_district_map.get(ft_key)
-                if ft_stats:
-                    stats = ft_stats
-                else:
-                    # Try with the district name as both state and district (for cases where Excel has same in both columns)
-                    alt_key = _normalize_key(normalized_dist, normalized_dist)
-                    alt_stats = stats_map.get(alt_key)
-                    if alt_stats:
-                        stats = alt_stats
-
-            # Fallback 3: Handle Excel data issue where Kuala Lumpur/Putrajaya rows have swapped columns
-            if not stats:
-                # Check if this is a federal territory district that might have swapped data
-                if state and ('Wp' in state or 'W.P.' in state) and district:
-                    # Try swapping: look for rows where State column matches this district name
-                    # and District column matches this state name
-                    swapped_key = _normalize_key(district, state)
-                    swapped_stats = stats_map.get(swapped_key)
-                    if swapped_stats:
-                        stats = swapped_stats
-                    # Also try with normalized variations
-                    if not stats:
-                        normalized_district = normalize_district_name(district)
-                        normalized_state = normalize_district_name(state)
-                        swapped_key = _normalize_key(normalized_district, normalized_state)
-                        swapped_stats = stats_map.get(swapped_key)
-                        if swapped_stats:
-                            stats = swapped_stats
-
-            # Fallback 4: Try alternative district name variations
-            if not stats and district:
-                # Try without "Wp" prefix
-                alt_district = district.replace('Wp ', '').replace('W.P. ', '').replace('WP ', '').strip()
-                if alt_district != district:
-                    alt_key = _normalize_key(state, alt_district)
-                    stats = stats_map.get(alt_key)
-            
-            # Fallback 5: Handle cases where Excel has "District State" format (e.g., "Petaling Selangor")
-            if not stats and district and state:
-                # Try matching where Excel district column contains both district and state name
-                # e.g., Excel has "Petaling Selangor" but GeoJSON has district="Petaling", state="Selangor"
-                combined_name = f"{district} {state}".strip()
-                alt_key = _normalize_key(state, combined_name)
-                stats = stats_map.get(alt_key)
-                if not stats:
-                    # Also try with just the combined name as district (in case state column is empty in Excel)
-                    alt_key = _normalize_key('', combined_name)
-                    stats = stats_map.get(alt_key)
-                if not stats:
-                    # Try reverse: "State District" format
-                    reverse_combined = f"{state} {district}".strip()
-                    alt_key = _normalize_key(state, reverse_combined)
-                    stats = stats_map.get(alt_key)
-            
-            # Fallback 6: Try fuzzy matching - check if any Excel row has district name that contains our district
-            # This handles cases like Excel has "Petaling Selangor" and we're looking for "Petaling"
-            if not stats and district and state:
-                normalized_district = ''.join(ch.lower() for ch in str(district) if ch.isalnum())
-                normalized_state = ''.join(ch.lower() for ch in str(state) if ch.isalnum())
-                for excel_key, excel_stats in stats_map.items():
-                    # excel_key format is "state|district"
-                    if '|' in excel_key:
-                        excel_state_part = excel_key.split('|')[0]
-                        excel_district_part = excel_key.split('|')[1]
-                        # Check if Excel district contains our district name (e.g., "petalingselangor" contains "petaling")
-                        # and state matches (e.g., "selangor" matches)
-                        if normalized_district and excel_district_part:
-                            district_match = normalized_district in excel_district_part or excel_district_part in normalized_district
-                            state_match = normalized_state in excel_state_part or excel_state_part in normalized_state or not excel_state_part
-                            # Only match if district is a clear substring match and state matches
-                            if district_match and state_match and len(normalized_district) >= 4:  # Require at least 4 chars to avoid false matches
-                                stats = excel_stats
-                                break
-
-            if stats:
-                props['population_k'] = float(stats['population_k']) if pd.notna(stats['population_k']) else None
-                props['income_pc'] = float(stats['income_pc']) if pd.notna(stats['income_pc']) else None
-                props['income_total'] = float(stats['income_total']) if pd.notna(stats['income_total']) else None
-            else:
-                # Log unmatched districts for debugging
-                unmatched_districts.append(f"{state}|{district}")
-                # Ensure properties exist even if no stats match
-                props.setdefault('population_k', None)
-                props.setdefault('income_pc', None)
-                props.setdefault('income_total', None)
-
-        # Log unmatched districts (for debugging - can be removed in production)
-        if unmatched_districts:
-            print(f"Warning: {len(unmatched_districts)} districts could not be matched: {unmatched_districts[:10]}")
-
-        return jsonify(geo)
-    except Exception as e:
-        import traceback
-        return jsonify({
-            "error": "Failed to load districts",
-            "message": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
+    Returns None when there is no snapshot, it is stale, or it cannot be read.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    manifest = _read_snapshot_manifest(snapshot_dir)
+    if not _manifest_is_fresh(manifest, discovered_files):
+        return None
 
-@app.route('/api/states')
-def get_states():
+    data_path = os.path.join(snapshot_dir, manifest['data_file'])
     try:
-        base_dir = os.path.dirname(__file__)
-        geojson_path = os.path.join(base_dir, 'static', 'malaysia.state.geojson')
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
-        return jsonify(geojson_data)
+        if manifest['format'] == 'arrow':
+            if feather is None:
+                return None
+            return feather.read_table(data_path, memory_map=True).to_pandas()
+        return pd.read_pickle(data_path)
+    except Exception as e:
+        print(f"Warning: Could not read compiled snapshot {data_path}: {e}")
+        return None
+
+
+def get_store_snapshot():
+    """
+    Return the cached StoreSnapshot, rebuilding it only when the source files change.
+
+    The Finalized Data folder is rescanned on every call (a few stat() calls), but
+    the Excel workbooks are only re-read when their mtime/size signature differs
+    from the one the current snapshot was built from. On a miss the compiled
+    columnar snapshot (see build_compiled_snapshot) is tried before Excel.
+    """
+    global _snapshot
+    discovered_files = _scan_finalized_data_folder()
+    signature = _source_signature(discovered_files)
+
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.signature == signature:
+            _snapshot_stats['hits'] += 1
+            return _snapshot
+
+        _snapshot_stats['misses'] += 1
+        start = time.perf_counter()
+        combined = _load_compiled_snapshot(discovered_files)
+        source = 'compiled'
+        if combined is None:
+            source = 'excel'
+            combined = _normalize_snapshot_columns(_build_store_dataframe(discovered_files))
+            try:
+                build_compiled_snapshot(discovered_files, combined=combined)
+            except OSError as e:
+                # Read-only deployments (e.g. Vercel) ship a prebuilt snapshot instead
+                print(f"Warning: Could not write compiled snapshot to {SNAPSHOT_DIR}: {e}")
+        build_seconds = time.perf_counter() - start
+
+        version = hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+        _snapshot = StoreSnapshot(
+            df=combined,
+            version=version,
+            signature=signature,
+            built_at=time.time(),
+            build_seconds=build_seconds,
+        )
+        _snapshot_stats['last_build_seconds'] = round(build_seconds, 3)
+        _snapshot_stats['last_build_source'] = source
+        print(f"Built store snapshot {version} from {source} with {len(combined)} rows in {build_seconds:.2f}s")
+        return _snapshot
+
+
+def load_data():
+    """
+    Load and combine all brand datasets into a single dataframe.
+    Dynamically scans the Finalized Data folder structure.
+
+    Returns the shared dataframe from the cached store snapshot; do not mutate it
+    in place.
+    """
+    return get_store_snapshot().df
+
+_response_cache_lock = threading.Lock()
+_response_cache = OrderedDict()
+_response_cache_stats = {
+    'hits': 0,
+    'misses': 0,
+    'not_modified': 0,
+}
+
+
+_artifact_lock = threading.Lock()
+_snapshot_artifacts = OrderedDict()
+_artifact_stats = {
+    'hits': 0,
+    'misses': 0,
+}
+
+
+def _versioned_artifact(version, name, build):
+    """
+    Return the value cached under `name` for `version`, calling `build()` on a miss.
+
+    Entries are kept in a small LRU keyed by `name`, so parameterized artifacts
+    (e.g. per filter) stay bounded.
+    """
+    with _artifact_lock:
+        entry = _snapshot_artifacts.get(name)
+        if entry is not None and entry[0] == version:
+            _snapshot_artifacts.move_to_end(name)
+            _artifact_stats['hits'] += 1
+            return entry[1]
+
+    value = build()
+
+    with _artifact_lock:
+        _artifact_stats['misses'] += 1
+        _snapshot_artifacts[name] = (version, value)
+        _snapshot_artifacts.move_to_end(name)
+        while len(_snapshot_artifacts) > SNAPSHOT_ARTIFACT_MAX_ENTRIES:
+            _snapshot_artifacts.popitem(last=False)
+    return value
+
+
+def _snapshot_artifact(snapshot, name, build):
+    """
+    Return a structure derived from `snapshot`, built once per snapshot version.
+
+    `build(snapshot)` is only called on a miss.
+    """
+    return _versioned_artifact(snapshot.version, name, lambda: build(snapshot))
+
+
+def _serialize_json_variants(payload):
+    """
+    Serialize a payload once into identity, gzip and (if available) brotli bytes.
+
+    Each variant gets its own strong ETag derived from the uncompressed body.
+    """
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    digest = hashlib.sha1(body).hexdigest()[:20]
+    variants = {
+        'identity': (body, f'"{digest}"'),
+        'gzip': (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"'),
+    }
+    if brotli is not None:
+        variants['br'] = (brotli.compress(body, quality=9), f'"{digest}-br"')
+    return variants
+
+
+def _get_serialized_response(key, version, build_payload):
+    """
+    Return cached serialized variants for `key`, rebuilding when `version` changes.
+
+    `build_payload` is only called on a miss. The cache is a small LRU so keyed
+    variants (e.g. per query string) cannot grow without bound.
+    """
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is not None and entry[0] == version:
+            _response_cache.move_to_end(key)
+            _response_cache_stats['hits'] += 1
+            return entry[1]
+
+    variants = _serialize_json_variants(build_payload())
+
+    with _response_cache_lock:
+        _response_cache_stats['misses'] += 1
+        _response_cache[key] = (version, variants)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+    return variants
+
+
+def _precompressed_response(variants):
+    """
+    Serve pre-serialized variants with content negotiation, ETag and 304 support.
+    """
+    accepted = request.accept_encodings
+    encoding = 'identity'
+    if 'br' in variants and accepted['br']:
+        encoding = 'br'
+    elif accepted['gzip']:
+        encoding = 'gzip'
+    body, etag = variants[encoding]
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': API_CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
+    # Each encoding has its own strong ETag; only the served variant's tag matches
+    if request.if_none_match.contains(etag.strip('"')):
+        _response_cache_stats['not_modified'] += 1
+        return Response(status=304, headers=headers)
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype='application/json', headers=headers)
+
+
+def _cached_json_response(key, version, build_payload):
+    """Serve `build_payload()` as pre-serialized, precompressed JSON cached per version."""
+    return _precompressed_response(_get_serialized_response(key, version, build_payload))
+
+
+def _iter_feature_collection(features, members=None, chunk_size=None):
+    """
+    Incrementally encode a GeoJSON FeatureCollection.
+
+    Yields the header, then the features serialized `chunk_size` at a time, then
+    the footer, so only one chunk of encoded text is held in memory at once.
+    `members` adds extra top-level keys (e.g. 'crs') to the header.
+    """
+    chunk_size = chunk_size or GEOJSON_STREAM_CHUNK_SIZE
+    header = {"type": "FeatureCollection", **(members or {})}
+    yield (json.dumps(header, separators=(',', ':'), ensure_ascii=False)[:-1] + ',"features":[').encode('utf-8')
+
+    chunk = []
+    first = True
+    for feature in features:
+        chunk.append(json.dumps(feature, separators=(',', ':'), ensure_ascii=False))
+        if len(chunk) >= chunk_size:
+            yield (('' if first else ',') + ','.join(chunk)).encode('utf-8')
+            first = False
+            chunk = []
+    if chunk:
+        yield (('' if first else ',') + ','.join(chunk)).encode('utf-8')
+    yield b']}'
+
+
+def _geojson_stream_response(features, members=None):
+    """
+    Stream a FeatureCollection from an iterable of features.
+
+    Time-to-first-byte is one header chunk and peak memory stays flat regardless
+    of how many features the iterable produces.
+    """
+    return Response(
+        stream_with_context(_iter_feature_collection(features, members)),
+        mimetype='application/json',
+    )
+
+
+def _wants_stream():
+    """True when the client asked for a streamed response (?stream=1)."""
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _iter_store_features(df, districts=None):
+    """
+    Yield one GeoJSON Point feature per store from the combined store dataframe.
+
+    `districts` is the optional (district_ids, district_names, district_states)
+    assignment of each row (see _store_districts).
+    """
+    # Clean the data for API output
+    df_clean = df.copy()
+    df_clean['City'] = df_clean.get('City', '').fillna('Unknown').astype(str)
+    df_clean['State'] = df_clean.get('State', '').fillna('Unknown').astype(str)
+    df_clean['Store Name'] = df_clean.get('Store Name', '').fillna('Unknown Store').astype(str)
+    df_clean['brand'] = df_clean.get('brand', '').fillna('Unknown').astype(str)
+    df_clean['brand_key'] = df_clean.get('brand_key', '').fillna('').astype(str)
+    df_clean['Type'] = df_clean.get('Type', '').fillna('').astype(str)
+    df_clean['sector'] = df_clean.get('sector', '').fillna('').astype(str)
+    df_clean['category'] = df_clean.get('category', '').fillna('').astype(str)
+    df_clean['Address'] = df_clean.get('Address', '').fillna('').astype(str)
+
+    # Build per-store GeoJSON features (one point per store); zip over columns
+    # instead of iterrows() since this runs over every store
+    rows = zip(
+        df_clean.index, df_clean['longitude'], df_clean['latitude'], df_clean['Type'],
+        df_clean['Store Name'], df_clean['Address'], df_clean['City'], df_clean['State'],
+        df_clean['brand'], df_clean['brand_key'], df_clean['sector'], df_clean['category'],
+    )
+    if districts is None:
+        districts = ([None] * len(df_clean),) * 3
+    rows = zip(rows, *districts)
+    for (idx, lon, lat, store_type, store_name, address, city, state, brand, brand_key, sector, category), \
+            district_id, district_name, district_state in rows:
+        brand_key = brand_key.lower()
+        yield {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [float(lon), float(lat)]
+            },
+            "properties": {
+                "id": int(idx),
+                "store_code": store_type,
+                "store_name": store_name,
+                "address": address.replace('\\n', ', '),
+                "city": city,
+                "state": state,
+                "brand": brand,
+                "brand_key": brand_key,
+                "sector": sector,
+                "category": category,
+                # Get brand color
+                "color": BRAND_COLORS.get(brand_key, '#666666'),
+                # Containing district polygon (None when outside every district)
+                "district_id": district_id,
+                "district_name": district_name,
+                "district_state": district_state,
+            }
+        }
+
+
+def _store_features(df, districts=None):
+    """Build the full list of per-store GeoJSON features."""
+    return list(_iter_store_features(df, districts))
+
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/favicon.ico')
+def favicon():
+    return '', 204  # Return empty response with 204 status
+
+# Query parameters accepted by /api/data for server-side filtering and paging
+STORE_QUERY_PARAMS = tuple(FILTER_COLUMNS) + ('bbox', 'fields', 'limit', 'cursor')
+STORE_PROPERTY_FIELDS = (
+    'id', 'store_code', 'store_name', 'address', 'city', 'state',
+    'brand', 'brand_key', 'sector', 'category', 'color',
+    'district_id', 'district_name', 'district_state',
+)
+
+
+def _store_districts(snapshot):
+    """
+    Assign every store of the snapshot to the district polygon containing it.
+
+    Returns (district_version, (district_ids, district_names, district_states))
+    with one entry per snapshot row; the ids are positions in the district
+    GeoJSON. Computed once per (snapshot, district file) version with a
+    bbox-prefiltered, vectorized point-in-polygon pass. The assignment is None
+    if the district GeoJSON cannot be read.
+    """
+    version = _district_source_version()
+
+    def build(s):
+        try:
+            with open(DISTRICT_GEOJSON_PATH, 'r', encoding='utf-8') as f:
+                features = json.load(f).get('features', [])
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not assign stores to districts: {e}")
+            return None
+        positions = PolygonIndex(features).locate(
+            s.df['latitude'].to_numpy(dtype=float),
+            s.df['longitude'].to_numpy(dtype=float),
+        )
+        props = [f.get('properties') or {} for f in features]
+        ids = [int(p) if p >= 0 else None for p in positions]
+        names = [props[p].get('name') if p >= 0 else None for p in positions]
+        states = [props[p].get('state') if p >= 0 else None for p in positions]
+        print(f"Assigned {sum(i is not None for i in ids)} of {len(ids)} stores to districts")
+        return ids, names, states
+
+    return version, _snapshot_artifact(snapshot, 'store_districts:' + version, build)
+
+
+def _store_data_version(snapshot):
+    """Version of the per-store features: the snapshot plus the district assignment."""
+    return f'{snapshot.version}:{_district_source_version()}'
+
+
+def _store_feature_list(snapshot):
+    """Per-store features for the snapshot, built once and shared by all queries."""
+    version, districts = _store_districts(snapshot)
+    return _snapshot_artifact(
+        snapshot,
+        'store_features:' + version,
+        lambda s: _store_features(s.df, districts),
+    )
+
+
+def _store_index(snapshot):
+    """Posting-list index over the snapshot used for server-side filtering."""
+    return _snapshot_artifact(snapshot, 'store_index', lambda s: StoreIndex(s.df))
+
+
+def _multi_arg(name):
+    """Collect a query parameter given repeated and/or comma-separated."""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def _parse_store_query():
+    """
+    Parse and validate /api/data filter, projection and paging parameters.
+
+    Raises ValueError with a user-facing message on invalid input.
+    """
+    filters = {}
+    for param in FILTER_COLUMNS:
+        values = _multi_arg(param)
+        if values:
+            filters[param] = sorted(set(v.lower() for v in values))
+
+    bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+
+    fields = _multi_arg('fields') or None
+    if fields:
+        unknown = [f for f in fields if f not in STORE_PROPERTY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; expected any of {list(STORE_PROPERTY_FIELDS)}")
+
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor', default=0, type=int)
+    if (limit is not None and limit <= 0) or cursor < 0:
+        raise ValueError("limit must be positive and cursor must not be negative")
+
+    return filters, bbox, fields, limit, cursor
+
+
+def _query_store_features(snapshot, filters, bbox, fields, limit, cursor):
+    """
+    Evaluate a store query against the snapshot indexes.
+
+    Returns (features, total, next_cursor). Only rows matching the posting-list
+    intersection and bbox are touched; properties are projected to `fields`.
+    """
+    rows = _store_index(snapshot).select(filters, bbox)
+    total = int(len(rows))
+    page = rows[cursor:cursor + limit] if limit else rows[cursor:]
+    end = cursor + len(page)
+    next_cursor = str(end) if limit and end < total else None
+
+    all_features = _store_feature_list(snapshot)
+    if fields:
+        features = [
+            {
+                "type": "Feature",
+                "geometry": all_features[i]["geometry"],
+                "properties": {f: all_features[i]["properties"][f] for f in fields},
+            }
+            for i in page
+        ]
+    else:
+        features = [all_features[i] for i in page]
+    return features, total, next_cursor
+
+
+@app.route('/api/data')
+def get_data():
+    """
+    Return stores as a GeoJSON FeatureCollection.
+
+    The body is serialized and compressed once per store snapshot version and
+    served with a strong ETag; If-None-Match requests get a 304. With ?stream=1
+    the features are instead encoded incrementally from the snapshot.
+
+    Optional server-side query parameters (values are case-insensitive; give
+    several as repeats or comma-separated):
+    - brand_key, category, sector, state, district: keep matching stores
+    - bbox=min_lon,min_lat,max_lon,max_lat: keep stores inside the box
+    - fields=store_name,brand_key,...: only return these properties
+    - limit / cursor: page through results; the response includes 'total' and
+      'next_cursor' (null on the last page)
+
+    Each store carries district_id / district_name / district_state of the
+    district polygon containing it (assigned server-side once per snapshot).
+    """
+    try:
+        snapshot = get_store_snapshot()
+
+        if any(param in request.args for param in STORE_QUERY_PARAMS):
+            try:
+                filters, bbox, fields, limit, cursor = _parse_store_query()
+            except ValueError as e:
+                return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+            if _wants_stream():
+                features, total, next_cursor = _query_store_features(snapshot, filters, bbox, fields, limit, cursor)
+                return _geojson_stream_response(features, {"total": total, "next_cursor": next_cursor})
+
+            def build_payload():
+                features, total, next_cursor = _query_store_features(snapshot, filters, bbox, fields, limit, cursor)
+                return {
+                    "type": "FeatureCollection",
+                    "total": total,
+                    "next_cursor": next_cursor,
+                    "features": features,
+                }
+
+            cache_key = 'data?' + json.dumps([filters, bbox, fields, limit, cursor], separators=(',', ':'))
+            return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+
+        if _wants_stream():
+            return _geojson_stream_response(_iter_store_features(snapshot.df, _store_districts(snapshot)[1]))
+        return _cached_json_response(
+            'data',
+            _store_data_version(snapshot),
+            lambda: {
+                "type": "FeatureCollection",
+                "features": _store_feature_list(snapshot)
+            },
+        )
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load data",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+# Limits for /api/stores/nearby
+NEARBY_MAX_K = 500
+NEARBY_MAX_RADIUS_KM = 500.0
+NEARBY_MAX_RESULTS = 2000
+NEARBY_MAX_BATCH = 1000
+
+
+def _store_grid(snapshot, brand_keys=None):
+    """
+    Grid-hash spatial index over the snapshot's stores, optionally for a brand subset.
+
+    Built once per snapshot version and brand selection; ids are snapshot rows.
+    """
+    brand_keys = sorted(set(brand_keys or []))
+
+    def build(s):
+        if brand_keys:
+            rows = _store_index(s).select({'brand_key': brand_keys})
+        else:
+            rows = np.arange(len(s.df))
+        return GridIndex(
+            s.df['latitude'].to_numpy(dtype=float)[rows],
+            s.df['longitude'].to_numpy(dtype=float)[rows],
+            ids=rows,
+        )
+
+    return _snapshot_artifact(snapshot, 'store_grid:' + ','.join(brand_keys), build)
+
+
+def _parse_nearby_options(source):
+    """
+    Validate radius_km / k / brand_key from query args or a JSON body.
+
+    Returns (radius_km, k, brand_keys); raises ValueError on invalid input.
+    """
+    radius_km = source.get('radius_km')
+    k = source.get('k')
+    radius_km = float(radius_km) if radius_km not in (None, '') else None
+    k = int(k) if k not in (None, '') else None
+    if radius_km is None and k is None:
+        raise ValueError("Provide radius_km and/or k")
+    if radius_km is not None and not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be in (0, {NEARBY_MAX_RADIUS_KM}]")
+    if k is not None and not 0 < k <= NEARBY_MAX_K:
+        raise ValueError(f"k must be in [1, {NEARBY_MAX_K}]")
+
+    brand_keys = source.get('brand_key') or []
+    if isinstance(brand_keys, str):
+        brand_keys = brand_keys.split(',')
+    brand_keys = [str(b).strip().lower() for b in brand_keys if str(b).strip()]
+    return radius_km, k, brand_keys
+
+
+def _parse_lat_lon(lat, lon):
+    if lat in (None, '') or lon in (None, ''):
+        raise ValueError("lat and lon are required")
+    lat, lon = float(lat), float(lon)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Invalid coordinates: {lat}, {lon}")
+    return lat, lon
+
+
+def _nearby_stores(grid, lat, lon, radius_km, k):
+    """Run a radius and/or k-nearest query; returns (rows, distances_km)."""
+    if k is not None:
+        return grid.query_knn(lat, lon, k, max_radius_km=radius_km)
+    return grid.query_radius(lat, lon, radius_km, limit=NEARBY_MAX_RESULTS)
+
+
+@app.route('/api/stores/nearby', methods=['GET', 'POST'])
+def get_nearby_stores():
+    """
+    Find stores near a point using the in-memory grid spatial index.
+
+    GET  /api/stores/nearby?lat=&lon=&radius_km=&k=&brand_key=
+         Returns a FeatureCollection of matching stores, nearest first, each
+         with a 'distance_km' property.
+    POST /api/stores/nearby with JSON
+         {"points": [[lat, lon], ...], "radius_km": .., "k": .., "brand_key": ..}
+         Returns {"results": [{"lat", "lon", "stores": [{"id", "brand_key",
+         "store_name", "distance_km"}, ...]}, ...]} in the order of the points.
+
+    With only radius_km every store in the radius is returned (up to
+    NEARBY_MAX_RESULTS); with k the k nearest (optionally within radius_km).
+    """
+    try:
+        try:
+            if request.method == 'POST':
+                body = request.get_json(silent=True) or {}
+                radius_km, k, brand_keys = _parse_nearby_options(body)
+                points = body.get('points') or []
+                if not isinstance(points, list) or len(points) > NEARBY_MAX_BATCH:
+                    raise ValueError(f"points must be a list of at most {NEARBY_MAX_BATCH} [lat, lon] pairs")
+                points = [
+                    _parse_lat_lon(p['lat'], p['lon']) if isinstance(p, dict) else _parse_lat_lon(p[0], p[1])
+                    for p in points
+                ]
+            else:
+                radius_km, k, brand_keys = _parse_nearby_options(request.args)
+                points = [_parse_lat_lon(request.args.get('lat'), request.args.get('lon'))]
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+        snapshot = get_store_snapshot()
+        grid = _store_grid(snapshot, brand_keys)
+        features = _store_feature_list(snapshot)
+
+        if request.method == 'POST':
+            results = []
+            for lat, lon in points:
+                rows, distances = _nearby_stores(grid, lat, lon, radius_km, k)
+                results.append({
+                    "lat": lat,
+                    "lon": lon,
+                    "stores": [
+                        {
+                            "id": int(row),
+                            "brand_key": features[row]["properties"]["brand_key"],
+                            "store_name": features[row]["properties"]["store_name"],
+                            "distance_km": round(float(d), 4),
+                        }
+                        for row, d in zip(rows, distances)
+                    ],
+                })
+            return jsonify({"results": results})
+
+        lat, lon = points[0]
+        rows, distances = _nearby_stores(grid, lat, lon, radius_km, k)
+        return jsonify({
+            "type": "FeatureCollection",
+            "query": {"lat": lat, "lon": lon, "radius_km": radius_km, "k": k, "brand_key": brand_keys},
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": features[row]["geometry"],
+                    "properties": {**features[row]["properties"], "distance_km": round(float(d), 4)},
+                }
+                for row, d in zip(rows, distances)
+            ],
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to find nearby stores",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# Default and upper bound for /api/competition radii (km)
+COMPETITION_RADII_KM = (0.5, 1.0, 3.0)
+COMPETITION_MAX_RADIUS_KM = 10.0
+
+
+def _competitor_counts(snapshot, category, radii):
+    """
+    Competitor stores around every store of a category.
+
+    Competitors are stores of other brands in the same category. Returns
+    (rows, counts): the category's snapshot rows and a (len(rows), len(radii))
+    array of competitors within each radius. All pairs within the largest
+    radius come from one grid-hash pass; cached per (snapshot, category, radii).
+    """
+    def build(s):
+        rows = _store_index(s).select({'category': [category]})
+        brands = s.df['brand_key'].to_numpy()[rows]
+        i, j, distances = radius_pairs(
+            s.df['latitude'].to_numpy(dtype=float)[rows],
+            s.df['longitude'].to_numpy(dtype=float)[rows],
+            max(radii),
+        )
+        rival = brands[i] != brands[j]
+        i, distances = i[rival], distances[rival]
+        counts = np.column_stack([np.bincount(i[distances <= r], minlength=len(rows)) for r in radii])
+        return rows, counts
+
+    key = f'competitors:{category}:' + ','.join(f'{r:g}' for r in radii)
+    return _snapshot_artifact(snapshot, key, build)
+
+
+def _parse_competition_query(snapshot):
+    """
+    (categories, radii) for the /api/competition routes.
+
+    Raises ValueError with a user-facing message on invalid input and
+    LookupError for an unknown category.
+    """
+    raw = request.args.get('radii')
+    radii = _parse_distance_bands(raw, 'radii') if raw else COMPETITION_RADII_KM
+    if radii[-1] > COMPETITION_MAX_RADIUS_KM:
+        raise ValueError(f"radii must not exceed {COMPETITION_MAX_RADIUS_KM:g} km")
+    available = _store_index(snapshot).values('category')
+    categories = sorted(set(c.lower() for c in _multi_arg('category'))) or available
+    unknown = [c for c in categories if c not in available]
+    if unknown:
+        raise LookupError(unknown)
+    return categories, radii
+
+
+def _competition_error(e, snapshot):
+    if isinstance(e, LookupError):
+        return jsonify({
+            "error": "Unknown category",
+            "message": f"No stores in category {e.args[0]}",
+            "available": _store_index(snapshot).values('category'),
+        }), 404
+    return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+
+@app.route('/api/competition')
+def get_competition():
+    """
+    Return per-brand summaries of competitor stores nearby.
+
+    GET /api/competition?category=&radii=0.5,1,3
+
+    Competitors are stores of other brands in the same category. For each
+    brand and radius: the mean, median and maximum number of competitors
+    within that distance of its stores, and the share of its stores with at
+    least one. Counts come from a grid-hash radius search over each category;
+    cached per (category, radii).
+    """
+    try:
+        snapshot = get_store_snapshot()
+        try:
+            categories, radii = _parse_competition_query(snapshot)
+        except (ValueError, LookupError) as e:
+            return _competition_error(e, snapshot)
+
+        def build_payload():
+            brand_keys = snapshot.df['brand_key'].to_numpy()
+            category_names = snapshot.df['category'].to_numpy()
+            brands = {}
+            for category in categories:
+                rows, counts = _competitor_counts(snapshot, category, radii)
+                for brand_key in sorted(set(brand_keys[rows])):
+                    own = counts[brand_keys[rows] == brand_key]
+                    brands[str(brand_key)] = {
+                        "category": str(category_names[rows[0]]),
+                        "store_count": int(len(own)),
+                        "radii": {
+                            f'{r:g}': {
+                                "mean": round(float(own[:, k].mean()), 3),
+                                "median": float(np.median(own[:, k])),
+                                "max": int(own[:, k].max()),
+                                "share_with_competitors": round(float((own[:, k] > 0).mean()), 4),
+                            }
+                            for k, r in enumerate(radii)
+                        },
+                    }
+            return {"radii_km": list(radii), "brands": brands}
+
+        cache_key = 'competition?' + json.dumps([categories, radii], separators=(',', ':'))
+        return _cached_json_response(cache_key, snapshot.version, build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute competition",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/competition/stores')
+def get_competition_stores():
+    """
+    Return stores as GeoJSON with competitor counts as properties.
+
+    GET /api/competition/stores?category=&radii=0.5,1,3
+
+    Each store feature gains 'competitors_<r>km' per radius (e.g.
+    competitors_0.5km): stores of other brands in its category within r km.
+    Cached per (category, radii).
+    """
+    try:
+        snapshot = get_store_snapshot()
+        try:
+            categories, radii = _parse_competition_query(snapshot)
+        except (ValueError, LookupError) as e:
+            return _competition_error(e, snapshot)
+
+        def build_payload():
+            store_features = _store_feature_list(snapshot)
+            features = []
+            for category in categories:
+                rows, counts = _competitor_counts(snapshot, category, radii)
+                for row, row_counts in zip(rows, counts):
+                    store = store_features[row]
+                    properties = dict(store["properties"])
+                    properties.update({f'competitors_{r:g}km': int(c) for r, c in zip(radii, row_counts)})
+                    features.append({"type": "Feature", "geometry": store["geometry"], "properties": properties})
+            return {"type": "FeatureCollection", "radii_km": list(radii), "features": features}
+
+        cache_key = 'competition/stores?' + json.dumps([categories, radii], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute competition",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# /api/proximity defaults
+PROXIMITY_THRESHOLDS_KM = (0.5, 1.0, 5.0)
+PROXIMITY_PERCENTILES = (25, 50, 75, 90)
+
+# Every store queries each brand's grid, so queries far outnumber indexed
+# points; cells this many times finer than the default check fewer candidates
+PROXIMITY_CELL_DIVISOR = 4
+
+
+def _brand_nearest(snapshot):
+    """
+    Distance from every store to the nearest other store of each brand.
+
+    Returns (brand names, brand code per row, (rows x brands) distances in km),
+    from one k-nearest grid query per brand (k=1 for stores of other brands,
+    k=2 dropping the store itself for its own brand), cached per snapshot.
+    """
+    def build(s):
+        start = time.perf_counter()
+        codes, names = pd.factorize(s.df['brand_key'].fillna('').astype(str), sort=True)
+        lat = s.df['latitude'].to_numpy(dtype=float)
+        lon = s.df['longitude'].to_numpy(dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        distances = np.full((len(lat), len(names)), np.inf)
+        for b in range(len(names)):
+            own = codes == b
+            rows = np.flatnonzero(own & valid)
+            if len(rows) == 0:
+                continue
+            index = GridIndex(lat[rows], lon[rows], ids=rows, cell_divisor=PROXIMITY_CELL_DIVISOR)
+
+            others = np.flatnonzero(~own)
+            _, nearest = index.query_knn_many(lat[others], lon[others], k=1)
+            distances[others, b] = nearest[:, 0]
+
+            ids, nearest = index.query_knn_many(lat[rows], lon[rows], k=2)
+            distances[rows, b] = np.where(ids[:, 0] == rows, nearest[:, 1], nearest[:, 0])
+        print(f"Computed nearest stores of {len(names)} brands for {len(lat)} stores "
+              f"in {time.perf_counter() - start:.2f}s")
+        return list(names), codes, distances
+
+    return _snapshot_artifact(snapshot, 'brand_nearest', build)
+
+
+@app.route('/api/proximity')
+def get_proximity():
+    """
+    Return the brand x brand nearest-neighbour distance matrix.
+
+    GET /api/proximity?brand_key=&category=&thresholds=0.5,1,5
+
+    For every pair (A, B) of the selected brands (all by default; brand_key and
+    category narrow it down): the median distance from a store of A to the
+    nearest store of B (another store for A = B), as 'median_km' rows A /
+    columns B, and per pair the 25/50/75/90th percentiles, the mean, and how
+    many of A's stores have a B store within each threshold. Cached per
+    selection and thresholds.
+    """
+    try:
+        try:
+            raw = request.args.get('thresholds')
+            thresholds = _parse_distance_bands(raw, 'thresholds') if raw else PROXIMITY_THRESHOLDS_KM
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+        filters = {
+            param: sorted(set(v.lower() for v in _multi_arg(param)))
+            for param in ('brand_key', 'category') if _multi_arg(param)
+        }
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            names, codes, distances = _brand_nearest(snapshot)
+            rows = _store_index(snapshot).select(filters)
+            selected = sorted(set(codes[rows].tolist()))
+            brands = [names[b] for b in selected]
+            limits = np.asarray(thresholds)
+
+            median = []
+            pairs = {}
+            for a in selected:
+                own = distances[rows[codes[rows] == a]][:, selected]  # A's stores x selected brands
+                finite = np.where(np.isfinite(own), own, np.nan)
+                with np.errstate(all='ignore'):
+                    quantiles = np.nanpercentile(finite, PROXIMITY_PERCENTILES, axis=0)
+                    means = np.nanmean(finite, axis=0)
+                within = (own[:, :, None] <= limits[None, None, :]).sum(axis=0)
+                km = lambda v: round(float(v), 4) if np.isfinite(v) else None
+                median.append([km(v) for v in quantiles[PROXIMITY_PERCENTILES.index(50)]])
+                pairs[names[a]] = {
+                    names[b]: {
+                        "stores": int(len(own)),
+                        "mean_km": km(means[j]),
+                        **{f"p{p}_km": km(quantiles[k, j]) for k, p in enumerate(PROXIMITY_PERCENTILES)},
+                        "within": {f'{t:g}': int(within[j, k]) for k, t in enumerate(thresholds)},
+                    }
+                    for j, b in enumerate(selected)
+                }
+            return {
+                "brands": brands,
+                "thresholds_km": list(thresholds),
+                "median_km": median,
+                "pairs": pairs,
+            }
+
+        cache_key = 'proximity?' + json.dumps([filters, thresholds], separators=(',', ':'))
+        return _cached_json_response(cache_key, snapshot.version, build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute proximity",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# Zoom range precomputed by /api/clusters; above CLUSTER_MAX_ZOOM stores are
+# returned individually
+CLUSTER_MIN_ZOOM = 0
+CLUSTER_MAX_ZOOM = 16
+CLUSTER_RADIUS_PX = 50
+
+
+def _store_clusters(snapshot, brand_keys=None):
+    """Hierarchical cluster index over the snapshot's stores, optionally for a brand subset."""
+    brand_keys = sorted(set(brand_keys or []))
+
+    def build(s):
+        if brand_keys:
+            rows = _store_index(s).select({'brand_key': brand_keys})
+        else:
+            rows = np.arange(len(s.df))
+        return ClusterIndex(
+            s.df['latitude'].to_numpy(dtype=float)[rows],
+            s.df['longitude'].to_numpy(dtype=float)[rows],
+            s.df['brand_key'].to_numpy()[rows],
+            ids=rows,
+            radius=CLUSTER_RADIUS_PX,
+            min_zoom=CLUSTER_MIN_ZOOM,
+            max_zoom=CLUSTER_MAX_ZOOM,
+        )
+
+    return _snapshot_artifact(snapshot, 'store_clusters:' + ','.join(brand_keys), build)
+
+
+@app.route('/api/clusters')
+def get_clusters():
+    """
+    Return pre-aggregated store clusters for a map zoom level.
+
+    GET /api/clusters?z=&bbox=min_lon,min_lat,max_lon,max_lat&brand_key=
+
+    Clusters are features with 'cluster': true, 'point_count' and a 'brands'
+    breakdown ({brand_key: count}) at the cluster centroid; single stores are
+    regular store features with 'cluster': false. The cluster index is built
+    once per snapshot version and brand selection.
+    """
+    try:
+        try:
+            zoom = request.args.get('z')
+            if zoom in (None, ''):
+                raise ValueError("z is required")
+            zoom = float(zoom)
+            if not 0 <= zoom <= 24:
+                raise ValueError("z must be in [0, 24]")
+            bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+        brand_keys = [b.lower() for b in _multi_arg('brand_key')]
+        snapshot = get_store_snapshot()
+        clusters = _store_clusters(snapshot, brand_keys).query(zoom, bbox)
+        store_features = _store_feature_list(snapshot)
+
+        features = []
+        for c in clusters:
+            if not c['cluster']:
+                store = store_features[c['id']]
+                features.append({
+                    "type": "Feature",
+                    "geometry": store["geometry"],
+                    "properties": {**store["properties"], "cluster": False},
+                })
+                continue
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [c['lon'], c['lat']]},
+                "properties": {
+                    "cluster": True,
+                    "cluster_id": c['cluster_id'],
+                    "point_count": c['point_count'],
+                    "brands": c['brands'],
+                },
+            })
+        return jsonify({"type": "FeatureCollection", "zoom": zoom, "features": features})
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to build clusters",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+def _store_hexbins(snapshot):
+    """Hexagon cell IDs of every store at every resolution, built once per snapshot."""
+    def build(s):
+        codes, names = pd.factorize(s.df['brand_key'].fillna('').astype(str))
+        bins = HexBins(s.df['latitude'].to_numpy(dtype=float), s.df['longitude'].to_numpy(dtype=float))
+        return bins, codes, list(names)
+
+    return _snapshot_artifact(snapshot, 'store_hexbins', build)
+
+
+@app.route('/api/hexbins')
+def get_hexbins():
+    """
+    Return store counts and brand mix per hexagon cell.
+
+    GET /api/hexbins?res=8&brand_key=&category=&bbox=min_lon,min_lat,max_lon,max_lat
+
+    Cells are pointy-top hexagons whose edge halves with each resolution
+    (res 0 ~1250 km ... res 14 ~75 m); each feature is the cell polygon with
+    'cell_id' (integer, sortable; see hexgrid), 'count' and 'brands'
+    ({brand_key: count}). Stores are binned at every resolution once per
+    snapshot; responses are cached per resolution, filters and bbox.
+    """
+    try:
+        try:
+            res = request.args.get('res', type=int)
+            if res is None or not HEX_MIN_RESOLUTION <= res <= HEX_MAX_RESOLUTION:
+                raise ValueError(f"res must be an integer in [{HEX_MIN_RESOLUTION}, {HEX_MAX_RESOLUTION}]")
+            bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+        filters = {
+            param: sorted(set(v.lower() for v in _multi_arg(param)))
+            for param in ('brand_key', 'category') if _multi_arg(param)
+        }
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            bins, codes, brand_names = _store_hexbins(snapshot)
+            rows = _store_index(snapshot).select(filters, bbox)
+            cells, counts, brands, brand_counts, offsets = bins.aggregate(res, rows, codes, len(brand_names))
+            rings = cell_boundaries(cells)
+            features = []
+            for i, cell in enumerate(cells):
+                start, end = offsets[i], offsets[i + 1]
+                features.append({
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": [np.round(rings[i], 6).tolist()]},
+                    "properties": {
+                        "cell_id": int(cell),
+                        "count": int(counts[i]),
+                        "brands": {brand_names[b]: int(n) for b, n in zip(brands[start:end], brand_counts[start:end])},
+                    },
+                })
+            return {
+                "type": "FeatureCollection",
+                "res": res,
+                "total": int(counts.sum()),
+                "features": features,
+            }
+
+        cache_key = 'hexbins?' + json.dumps([res, filters, bbox], separators=(',', ':'))
+        return _cached_json_response(cache_key, snapshot.version, build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to build hexbins",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/categories')
+def get_categories():
+    """
+    Return all available categories with their companies.
+    """
+    try:
+        discovered_files = _scan_finalized_data_folder()
+        
+        # Group by category
+        categories = {}
+        for filepath, category, brand_name, brand_key, has_type_column in discovered_files:
+            if category not in categories:
+                categories[category] = []
+            
+            color = BRAND_COLORS.get(brand_key.lower(), '#666666')
+            categories[category].append({
+                'brand_name': brand_name,
+                'brand_key': brand_key,
+                'color': color
+            })
+        
+        # Convert to list format for frontend
+        result = []
+        for category, companies in sorted(categories.items()):
+            result.append({
+                'category': category,
+                'companies': sorted(companies, key=lambda x: x['brand_name'])
+            })
+        
+        return jsonify(result)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load categories",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/brand-colors')
+def get_brand_colors():
+    """Return the complete brand color mapping."""
+    return jsonify(BRAND_COLORS)
+
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Return hit/miss counters for the in-memory store snapshot cache."""
+    snapshot = _snapshot
+    return jsonify({
+        "store_snapshot": {
+            **_snapshot_stats,
+            "version": snapshot.version if snapshot else None,
+            "rows": int(len(snapshot.df)) if snapshot else 0,
+            "files": len(snapshot.signature) if snapshot else 0,
+        },
+        "responses": {
+            **_response_cache_stats,
+            "entries": len(_response_cache),
+            "brotli": brotli is not None,
+        },
+        "snapshot_artifacts": {
+            **_artifact_stats,
+            "entries": len(_snapshot_artifacts),
+        },
+    })
+
+
+@app.route('/api/stats')
+def get_stats():
+    """
+    Store totals per city (top 10), state and brand, read from the store cube.
+    """
+    try:
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            cube = _store_cube(snapshot)
+            brand_names = _brand_names(snapshot)
+            brands = {}
+            for (brand_key,), count in cube.query(('brand_key',)):
+                name = brand_names.get(brand_key, MISSING_LABEL)
+                brands[name] = brands.get(name, 0) + count
+            return {
+                "total_locations": cube.size,
+                "cities": {city: count for (city,), count in cube.query(('city',))[:10]},
+                "states": {state: count for (state,), count in cube.query(('state',))},
+                "brands": brands,
+                "data_columns": list(snapshot.df.columns),
+            }
+
+        return _cached_json_response('stats', _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load stats",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+def _brand_names(snapshot):
+    """{brand_key: brand display name} for the snapshot's stores."""
+    df = snapshot.df
+    names = df.drop_duplicates('brand_key').set_index('brand_key')['brand'].to_dict()
+    return {str(k): str(v) for k, v in names.items()}
+
+
+def _store_cube(snapshot):
+    """
+    Store-count cube over (category, brand_key, state, district, city) for the snapshot.
+
+    State and city are the store's State / City columns; district is the
+    district polygon the store falls in (see _store_districts), as used by the
+    district analytics. Built once per store data version.
+    """
+    version, (_, district_names, _) = _store_districts(snapshot)
+    df = snapshot.df
+
+    def build(s):
+        return RollupCube({
+            'category': df['category'].to_numpy(),
+            'brand_key': df['brand_key'].to_numpy(),
+            'state': df['State'].to_numpy() if 'State' in df.columns else [None] * len(df),
+            'district': district_names,
+            'city': df['City'].to_numpy() if 'City' in df.columns else [None] * len(df),
+        })
+
+    return _snapshot_artifact(snapshot, 'store_cube:' + version, build)
+
+
+@app.route('/api/cube')
+def get_cube():
+    """
+    Answer store-count slices and roll-ups from the precomputed cube.
+
+    GET /api/cube?group_by=brand_key&group_by=state,district&category=&brand_key=&state=&district=&city=
+
+    Each group_by (repeatable; dimensions comma-separated) is one roll-up over
+    the stores matching the filters; with no group_by only the total is
+    returned. Filter values are case-insensitive and may be repeated or
+    comma-separated. Cells are sorted by descending count.
+    """
+    try:
+        try:
+            rollups = parse_group_by(request.args.getlist('group_by'))
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+        filters = {dim: sorted(set(_multi_arg(dim))) for dim in CUBE_DIMENSIONS if _multi_arg(dim)}
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            return cube_payload(_store_cube(snapshot), rollups, filters, _brand_names(snapshot))
+
+        cache_key = 'cube?' + json.dumps([rollups, filters], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to query store cube",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# Upper bound for /api/concentration?top_k=
+CONCENTRATION_MAX_TOP_K = 50
+
+
+def _district_count():
+    """Number of district polygons, or None if the district layer is unavailable."""
+    try:
+        return len(_district_geojson(_district_source_version()).get('features', []))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not count districts: {e}")
+        return None
+
+
+def _concentration_rows(cube, group, level, filters, n_units, top_k):
+    """Concentration metrics of every `group` value across the `level` units."""
+    labels, units, counts = cube.matrix(group, level, filters)
+    # Stores outside every state / district are not a unit of their own
+    known = [i for i, unit in enumerate(units) if unit != MISSING_LABEL]
+    units, counts = [units[i] for i in known], counts[:, known]
+    metrics = concentration_metrics(counts, n_units=n_units, top_k=top_k)
+    top_units = np.argsort(-counts, axis=1, kind='stable')[:, :top_k]
+
+    rows = []
+    for i, label in enumerate(labels):
+        rows.append({
+            group: label,
+            "stores": int(metrics['total'][i]),
+            "units_present": int(metrics['units_present'][i]),
+            "gini": round(float(metrics['gini'][i]), 4),
+            "hhi": round(float(metrics['hhi'][i]), 1),
+            "top_k_share": round(float(metrics['top_k_share'][i]), 4),
+            "top_units": [units[j] for j in top_units[i] if counts[i, j] > 0],
+        })
+    rows.sort(key=lambda row: -row["stores"])
+    return rows
+
+
+@app.route('/api/concentration')
+def get_concentration():
+    """
+    Return market concentration per brand and per category across states and districts.
+
+    GET /api/concentration?top_k=3&category=&brand_key=&state=&district=
+
+    For every brand_key and category (restricted by the optional cube filters)
+    and at both state and district granularity: the Gini coefficient of its
+    store counts over all units (units without stores count as zero), the
+    Herfindahl-Hirschman index (0-10000) and the share of its stores in its
+    top_k units. Computed from the store cube with one vectorized pass per
+    (group, level) and cached per store data version.
+    """
+    try:
+        try:
+            top_k = int(request.args.get('top_k', 3))
+            if not 1 <= top_k <= CONCENTRATION_MAX_TOP_K:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                "error": "Invalid query",
+                "message": f"top_k must be an integer in [1, {CONCENTRATION_MAX_TOP_K}]"
+            }), 400
+        filters = {dim: sorted(set(_multi_arg(dim))) for dim in CUBE_DIMENSIONS if _multi_arg(dim)}
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            cube = _store_cube(snapshot)
+            state_units = sum(label != MISSING_LABEL for label in cube.labels['state'])
+            units = {"state": state_units, "district": _district_count()}
+            return {
+                "top_k": top_k,
+                "filters": filters,
+                "units": units,
+                **{
+                    group: {
+                        level: _concentration_rows(cube, group, level, filters, units[level], top_k)
+                        for level in ('state', 'district')
+                    }
+                    for group in ('brand_key', 'category')
+                },
+            }
+
+        cache_key = 'concentration?' + json.dumps([top_k, filters], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute concentration",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# /api/whitespace default population threshold (thousands)
+WHITESPACE_DEFAULT_THRESHOLD_K = 50.0
+
+
+def _district_population(version):
+    """Population (thousands) per district position of the joined layer; NaN where unknown."""
+    def build(geo):
+        return np.array([
+            pd.to_numeric((f.get('properties') or {}).get('population_k'), errors='coerce')
+            for f in geo.get('features', [])
+        ], dtype=float)
+
+    return _district_artifact(version, 'population', build)
+
+
+def _district_store_counts(snapshot, filters):
+    """Stores per district position for the snapshot rows matching `filters`."""
+    version, districts = _store_districts(snapshot)
+    district_ids = _snapshot_artifact(
+        snapshot,
+        'store_district_ids:' + version,
+        lambda s: np.array([-1 if d is None else d for d in districts[0]], dtype=np.int64),
+    )
+    ids = district_ids[_store_index(snapshot).select(filters)]
+    n_districts = len(_district_population(version))
+    return np.bincount(ids[ids >= 0], minlength=n_districts)[:n_districts]
+
+
+@app.route('/api/whitespace')
+def get_whitespace():
+    """
+    Return store density and white-space opportunities for every district.
+
+    GET /api/whitespace?category=&brand_key=&threshold=50
+
+    For the stores matching the optional category / brand_key filters: stores
+    per 100k population for each district with population data (highest
+    first), and the underserved districts - population of at least `threshold`
+    thousand and fewer than 3 stores - ranked by opportunity score
+    (population in thousands per store). Uses the joined district statistics
+    and the server-side store-to-district assignment; cached per filter and
+    threshold.
+    """
+    try:
+        try:
+            threshold = float(request.args.get('threshold', WHITESPACE_DEFAULT_THRESHOLD_K))
+            if not math.isfinite(threshold) or threshold < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                "error": "Invalid query",
+                "message": "threshold must be a non-negative number (population in thousands)"
+            }), 400
+        filters = {
+            param: sorted(set(v.lower() for v in _multi_arg(param)))
+            for param in ('category', 'brand_key') if _multi_arg(param)
+        }
+
+        if not os.path.exists(DISTRICT_GEOJSON_PATH):
+            return jsonify({
+                "error": "District GeoJSON not found",
+                "message": f"Expected file at {DISTRICT_GEOJSON_PATH}"
+            }), 404
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            version = _district_source_version()
+            props = [f.get('properties') or {} for f in _district_geojson(version).get('features', [])]
+            return whitespace_payload(
+                [p.get('name') for p in props],
+                [p.get('state') for p in props],
+                _district_population(version),
+                _district_store_counts(snapshot, filters),
+                threshold,
+                filters,
+            )
+
+        cache_key = 'whitespace?' + json.dumps([filters, threshold], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute white space",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# /api/accessibility defaults and limits
+ACCESSIBILITY_BEYOND_KM = (10.0, 25.0)
+ACCESSIBILITY_MAX_DESERTS = 200
+
+
+def _store_accessibility(snapshot):
+    """
+    Distance from every district's population to each brand's nearest store.
+
+    Built once per (snapshot, district source) version.
+    """
+    version = _district_source_version()
+
+    def build(s):
+        start = time.perf_counter()
+        index = AccessibilityIndex(
+            _district_geojson(version).get('features', []),
+            _district_population(version),
+            s.df['latitude'].to_numpy(dtype=float),
+            s.df['longitude'].to_numpy(dtype=float),
+            s.df['brand_key'].to_numpy(),
+        )
+        print(f"Built accessibility for {len(index.brands)} brands x {len(index.lat)} district samples "
+              f"in {time.perf_counter() - start:.2f}s")
+        return index
+
+    return _snapshot_artifact(snapshot, 'accessibility:' + version, build)
+
+
+def _label_states(states):
+    """
+    Add 'name' (display name) and 'key' (the DistrictResolver canonical form)
+    to per-state entries keyed by the district layer's state code, so
+    /api/accessibility and /api/coverage join with each other and with
+    /api/districts / /api/states.
+    """
+    for code, state in states.items():
+        state["name"] = STATE_CODES.get(code, code)
+        state["key"] = canonical_state(code)
+
+
+@app.route('/api/accessibility')
+def get_accessibility():
+    """
+    Return population-weighted distance to the nearest store, per brand and state.
+
+    GET /api/accessibility?brand_key=&beyond_km=10,25&deserts=10
+
+    Each district's population is spread over sample points inside it; for
+    every brand (or the requested ones) the response gives the
+    population-weighted mean distance to the brand's nearest store, the
+    population (thousands) beyond each beyond_km distance, the same per state,
+    and the largest 'store deserts' - districts where most residents are beyond
+    the largest distance. States are keyed by code with 'name' and 'key' as in
+    /api/coverage; deserts carry the district name as /api/districts has it,
+    its canonical 'district_key' and 'state_name'. The distance matrix is
+    computed once per snapshot.
+    """
+    try:
+        try:
+            raw = request.args.get('beyond_km')
+            beyond_km = _parse_distance_bands(raw, 'beyond_km') if raw else ACCESSIBILITY_BEYOND_KM
+            deserts = int(request.args.get('deserts', 10))
+            if not 0 <= deserts <= ACCESSIBILITY_MAX_DESERTS:
+                raise ValueError(f"deserts must be in [0, {ACCESSIBILITY_MAX_DESERTS}]")
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+        brand_keys = sorted(set(b.lower() for b in _multi_arg('brand_key'))) or None
+
+        if not os.path.exists(DISTRICT_GEOJSON_PATH):
+            return jsonify({
+                "error": "District GeoJSON not found",
+                "message": f"Expected file at {DISTRICT_GEOJSON_PATH}"
+            }), 404
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            index = _store_accessibility(snapshot)
+            brands = index.summary(beyond_km, brand_keys, deserts)
+            for brand in brands.values():
+                _label_states(brand["states"])
+                for desert in brand["deserts"]:
+                    desert["state_name"] = STATE_CODES.get(desert["state"], desert["state"])
+                    desert["district_key"] = canonical_district(desert["district"])
+            return {
+                "beyond_km": list(beyond_km),
+                "population_k": round(float(index.population.sum()), 1),
+                "samples": int(len(index.lat)),
+                "brands": brands,
+            }
+
+        cache_key = 'accessibility?' + json.dumps([brand_keys, beyond_km, deserts], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute accessibility",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+# /api/coverage default radii and upper limit (km); the work grows with the
+# number of (sample, store) pairs inside the largest radius
+COVERAGE_RADII_KM = (5.0, 10.0, 25.0)
+COVERAGE_MAX_RADIUS_KM = 100.0
+
+
+@app.route('/api/coverage')
+def get_coverage():
+    """
+    Return the population and districts within N km of a brand's stores.
+
+    GET /api/coverage?brand_key=mrdiy&radii=5,10,25
+
+    Per brand (all brands without brand_key) and radius: covered population
+    (thousands) and share, districts where most residents are covered, and the
+    population-weighted number of stores reachable; the same per state (keyed
+    by state code, with 'name' and canonical 'key'). District populations are
+    allocated to sample points inside each district polygon; all radii (up to
+    100 km) are counted from one grid-index radius query and the response is
+    cached per brand set and radii.
+    """
+    try:
+        try:
+            raw = request.args.get('radii')
+            radii = _parse_distance_bands(raw, 'radii') if raw else COVERAGE_RADII_KM
+            if radii[-1] > COVERAGE_MAX_RADIUS_KM:
+                raise ValueError(f"radii must not exceed {COVERAGE_MAX_RADIUS_KM:g} km")
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+        brand_keys = sorted(set(b.lower() for b in _multi_arg('brand_key'))) or None
+
+        if not os.path.exists(DISTRICT_GEOJSON_PATH):
+            return jsonify({
+                "error": "District GeoJSON not found",
+                "message": f"Expected file at {DISTRICT_GEOJSON_PATH}"
+            }), 404
+
+        snapshot = get_store_snapshot()
+
+        def build_payload():
+            index = _store_accessibility(snapshot)
+            brands = index.coverage(radii, brand_keys)
+            for brand in brands.values():
+                _label_states(brand["states"])
+            return {
+                "radii_km": list(radii),
+                "population_k": round(float(index.population.sum()), 1),
+                "brands": brands,
+            }
+
+        cache_key = 'coverage?' + json.dumps([brand_keys, radii], separators=(',', ':'))
+        return _cached_json_response(cache_key, _store_data_version(snapshot), build_payload)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to compute coverage",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/district_stats')
+def get_district_stats():
+    """
+    Return district statistics for choropleth overlay.
+
+    The frontend will geocode these districts client-side using Mapbox
+    and build approximate polygons to color by the chosen metric.
+    """
+    try:
+        df = _load_district_stats()
+        # Ensure numeric types where possible
+        for col in ['population_k', 'income_pc', 'income_total']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+        records = df.to_dict(orient='records')
+        return jsonify(records)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load district stats",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+DISTRICT_GEOJSON_PATH = os.path.join(os.path.dirname(__file__), 'static', 'malaysia.district.geojson')
+
+# Bump when the district join changes so cached joined layers are rebuilt
+DISTRICT_JOIN_FORMAT_VERSION = 2
+
+
+def _build_district_join(geojson_path=DISTRICT_GEOJSON_PATH):
+    """
+    Load the district polygons and attach the District Statistics to each feature.
+
+    Each feature's (state, district) is resolved to a statistics row with a
+    DistrictResolver built once from the sheet. Returns (geo, mapping) where geo
+    is the joined FeatureCollection and mapping is the resolution table with an
+    unmatched report. Raises FileNotFoundError if either input is missing.
+    """
+    # Load district stats
+    stats_df = _load_district_stats()
+    for col in ['population_k', 'income_pc', 'income_total']:
+        stats_df[col] = pd.to_numeric(stats_df[col], errors='coerce')
+    resolver = DistrictResolver(stats_df['state'].tolist(), stats_df['district'].tolist())
+    stats_rows = stats_df.to_dict(orient='records')
+
+    # Load district GeoJSON
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        geo = json.load(f)
+
+    # Attach stats to each feature where possible
+    matches = []
+    unmatched = []
+    for feature in geo.get('features', []):
+        props = feature.setdefault('properties', {})
+
+        # Try a few common property names
+        raw_state = (
+            props.get('state')
+            or props.get('State')
+            or props.get('STATE')
+        )
+        # Many district files use 'name' for district name
+        raw_district = (
+            props.get('district')
+            or props.get('District')
+            or props.get('DISTRICT')
+            or props.get('name')
+        )
+
+        match = resolver.resolve(raw_state, raw_district)
+        if match is not None:
+            stats = stats_rows[match.row]
+            props['population_k'] = float(stats['population_k']) if pd.notna(stats['population_k']) else None
+            props['income_pc'] = float(stats['income_pc']) if pd.notna(stats['income_pc']) else None
+            props['income_total'] = float(stats['income_total']) if pd.notna(stats['income_total']) else None
+            matches.append({
+                'state': raw_state,
+                'district': raw_district,
+                'stats_state': stats['state'],
+                'stats_district': stats['district'],
+                'confidence': match.confidence,
+                'method': match.method,
+            })
+        else:
+            unmatched.append({'state': raw_state, 'district': raw_district})
+            # Ensure properties exist even if no stats match
+            props.setdefault('population_k', None)
+            props.setdefault('income_pc', None)
+            props.setdefault('income_total', None)
+
+    matched_rows = {(m['stats_state'], m['stats_district']) for m in matches}
+    mapping = {
+        'matched': matches,
+        'unmatched': unmatched,
+        'unused_stats_rows': [
+            {'state': r['state'], 'district': r['district']}
+            for r in stats_rows if (r['state'], r['district']) not in matched_rows
+        ],
+    }
+
+    # Log unmatched and low-confidence districts
+    if unmatched:
+        names = [f"{u['state']}|{u['district']}" for u in unmatched]
+        print(f"Warning: {len(unmatched)} districts could not be matched: {names[:10]}")
+    uncertain = [m for m in matches if m['confidence'] < 0.9]
+    if uncertain:
+        print(f"Warning: {len(uncertain)} districts matched with low confidence: "
+              f"{[(m['district'], m['stats_district'], m['confidence']) for m in uncertain[:10]]}")
+
+    return geo, mapping
+
+
+def _build_district_geojson(geojson_path=DISTRICT_GEOJSON_PATH):
+    """Joined district FeatureCollection (see _build_district_join)."""
+    return _build_district_join(geojson_path)[0]
+
+
+def _district_source_version():
+    """Version of the joined district layer, derived from both of its input files."""
+    stats_path = next((p for p in _district_stats_candidates() if os.path.exists(p)), None)
+    signature = [DISTRICT_JOIN_FORMAT_VERSION]
+    for path in (stats_path, DISTRICT_GEOJSON_PATH):
+        try:
+            st = os.stat(path)
+            signature.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+        except (OSError, TypeError):
+            signature.append((path, None, None))
+    return hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+
+
+def _district_cache_path(version):
+    return os.path.join(SNAPSHOT_DIR, f'districts.{version}.json')
+
+
+def _load_or_build_district_join(version):
+    """
+    Read the joined district layer and its name mapping from the disk cache, or
+    build and store them.
+
+    Older cache files are removed when a new version is written.
+    """
+    path = _district_cache_path(version)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            join = json.load(f)
+        print(f"Loaded joined districts {version} from {path}")
+        return join
+    except (OSError, ValueError):
+        pass
+
+    start = time.perf_counter()
+    geo, mapping = _build_district_join()
+    join = {'geojson': geo, 'mapping': mapping}
+    print(f"Joined district stats {version} in {time.perf_counter() - start:.2f}s")
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(join, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        for name in os.listdir(SNAPSHOT_DIR):
+            if name.startswith('districts.') and name.endswith('.json') and name != os.path.basename(path):
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+    except OSError as e:
+        # Read-only deployments (e.g. Vercel) keep the in-memory copy only
+        print(f"Warning: Could not write district cache {path}: {e}")
+    return join
+
+
+def _district_join(version):
+    """{'geojson': ..., 'mapping': ...} for `version`; shared, do not mutate."""
+    return _versioned_artifact(version, 'districts:join', lambda: _load_or_build_district_join(version))
+
+
+def _district_geojson(version):
+    """The joined district FeatureCollection for `version`; shared, do not mutate."""
+    return _district_join(version)['geojson']
+
+
+def _district_artifact(version, name, build):
+    """
+    Return a structure derived from the joined district layer, built once per version.
+
+    `build(geo)` receives the joined district FeatureCollection.
+    """
+    return _versioned_artifact(version, 'districts:' + name, lambda: build(_district_geojson(version)))
+
+
+# Zoom levels with precomputed simplified district geometry; the tolerance of a
+# level is one pixel at that zoom (512px tiles)
+DISTRICT_SIMPLIFY_ZOOMS = (4, 5, 6, 7, 8)
+
+
+def _zoom_tolerance(zoom):
+    """Degrees per pixel at `zoom` near the equator (512px tiles)."""
+    return 360.0 / (512 * 2 ** zoom)
+
+
+def _district_simplify_tolerance(zoom=None, tolerance=None):
+    """
+    Pick the precomputed simplification for a requested zoom or tolerance.
+
+    Returns the largest precomputed tolerance that is not coarser than the one
+    requested, or None when full resolution is needed.
+    """
+    requested = tolerance if tolerance is not None else _zoom_tolerance(math.floor(zoom))
+    levels = [_zoom_tolerance(z) for z in DISTRICT_SIMPLIFY_ZOOMS]
+    candidates = [t for t in levels if t <= requested]
+    return max(candidates) if candidates else None
+
+
+def _simplified_districts(version, tolerance):
+    """Simplified, quantized district features for a precomputed tolerance."""
+    def build(geo):
+        topology = _district_artifact(version, 'topology', lambda g: TopologySimplifier(g.get('features', [])))
+        return topology.simplify(tolerance)
+
+    return _district_artifact(version, f'simplified:{tolerance!r}', build)
+
+
+@app.route('/api/districts')
+def get_districts():
+    """
+    Return district polygons with attached statistics for choropleth overlay.
+
+    Expects a GeoJSON file at static/malaysia.district.geojson with district polygons.
+    Joins Excel stats to GeoJSON features by normalized (state, district) name.
+
+    The joined layer is built once per version of the two input files, kept in
+    memory and in SNAPSHOT_DIR across restarts, and served precompressed with an
+    ETag (or streamed with ?stream=1).
+
+    Optional ?zoom= (map zoom) or ?tolerance= (degrees) return topology-preserving
+    simplified, quantized geometry from precomputed levels (cached, with ETag);
+    zooms finer than every level get full resolution.
+    """
+    try:
+        try:
+            zoom = request.args.get('zoom', type=float)
+            tolerance = request.args.get('tolerance', type=float)
+            if (zoom is not None and not 0 <= zoom <= 24) or (tolerance is not None and tolerance <= 0):
+                raise ValueError("zoom must be in [0, 24] and tolerance must be positive")
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+        if not os.path.exists(DISTRICT_GEOJSON_PATH):
+            return jsonify({'error': 'District GeoJSON not found', 'path': DISTRICT_GEOJSON_PATH}), 404
+        version = _district_source_version()
+
+        if zoom is not None or tolerance is not None:
+            level = _district_simplify_tolerance(zoom, tolerance)
+            if level is not None:
+                def build_payload():
+                    members = _district_artifact(
+                        version, 'members', lambda g: {k: v for k, v in g.items() if k not in ('type', 'features')}
+                    )
+                    return {
+                        "type": "FeatureCollection",
+                        **members,
+                        "simplification": {"tolerance": level, "decimals": quantization_decimals(level)},
+                        "features": _simplified_districts(version, level),
+                    }
+
+                return _cached_json_response(f'districts?tolerance={level!r}', version, build_payload)
+
+        if _wants_stream():
+            geo = _district_geojson(version)
+            members = {k: v for k, v in geo.items() if k not in ('type', 'features')}
+            return _geojson_stream_response(geo.get('features', []), members)
+        return _cached_json_response('districts', version, lambda: _district_geojson(version))
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load districts",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+@app.route('/api/district-mapping')
+def get_district_mapping():
+    """
+    Return how each district polygon was matched to the District Statistics sheet.
+
+    'matched' lists (state, district) -> (stats_state, stats_district) with a
+    confidence and the matching method; 'unmatched' lists polygons with no
+    statistics and 'unused_stats_rows' the sheet rows no polygon resolved to.
+    """
+    try:
+        if not os.path.exists(DISTRICT_GEOJSON_PATH):
+            return jsonify({'error': 'District GeoJSON not found', 'path': DISTRICT_GEOJSON_PATH}), 404
+        version = _district_source_version()
+        return _cached_json_response('district-mapping', version, lambda: _district_join(version)['mapping'])
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load district mapping",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/states')
+def get_states():
+    try:
+        base_dir = os.path.dirname(__file__)
+        geojson_path = os.path.join(base_dir, 'static', 'malaysia.state.geojson')
+        with open(geojson_path, 'r', encoding='utf-8') as f:
+            geojson_data = json.load(f)
+        members = {k: v for k, v in geojson_data.items() if k not in ('type', 'features')}
+        return _geojson_stream_response(geojson_data.get('features', []), members)
     except Exception as e:
         import traceback
         return jsonify({
@@ -941,251 +2580,666 @@ def get_states():
         }), 500
 
 
-@app.route('/api/distribution-centers')
-def get_distribution_centers():
+# Vector tile layers served by /tiles/<layer>/<z>/<x>/<y>.pbf
+TILE_LAYERS = ('stores', 'districts')
+TILE_MAX_ZOOM = 20
+TILE_MIMETYPE = 'application/vnd.mapbox-vector-tile'
+DISTRICT_TILE_PROPERTIES = ('name', 'state', 'population_k', 'income_pc')
+# Rendered tiles (raw and gzip bytes) kept in memory in front of the disk cache
+TILE_MEMORY_CACHE_MAX_ENTRIES = 4096
+
+_tile_cache_lock = threading.Lock()
+_tile_cache = OrderedDict()  # (layer, version, z, x, y) -> {'identity': bytes, 'gzip': bytes}
+
+def _tile_source(layer):
+    """Return (version, layer source) for a tile layer, rebuilt when its inputs change."""
+    if layer == 'stores':
+        snapshot = get_store_snapshot()
+
+        def build(s):
+            features = _store_feature_list(s)
+            coords = np.array([f['geometry']['coordinates'] for f in features], dtype=float).reshape(-1, 2)
+            return PointLayerSource(
+                coords[:, 1],
+                coords[:, 0],
+                ids=np.arange(len(features)),
+                attributes={
+                    'brand_key': [f['properties']['brand_key'] for f in features],
+                    'color': [f['properties']['color'] for f in features],
+                },
+            )
+
+        return snapshot.version, _snapshot_artifact(snapshot, 'store_tiles', build)
+
+    version = _district_source_version()
+    return version, _district_artifact(
+        version,
+        'tiles',
+        lambda geo: PolygonLayerSource(geo.get('features', []), DISTRICT_TILE_PROPERTIES),
+    )
+
+
+def _tile_cache_path(layer, version, z, x, y):
+    return os.path.join(TILE_CACHE_DIR, layer, version, str(z), str(x), f'{y}.pbf')
+
+
+def _prune_tile_versions(layer, version):
+    """Remove cached tiles of older versions of a layer."""
+    layer_dir = os.path.join(TILE_CACHE_DIR, layer)
+    if not os.path.isdir(layer_dir):
+        return
+    for name in os.listdir(layer_dir):
+        if name != version:
+            shutil.rmtree(os.path.join(layer_dir, name), ignore_errors=True)
+
+
+def _write_tile_file(path, data):
+    """Write one cached tile file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _render_tile(layer, z, x, y):
     """
-    Return 99 SpeedMart distribution centers from JSON file.
-    Converts the JSON structure to GeoJSON format for the map.
+    Return (version, {'identity': bytes, 'gzip': bytes}) for a tile.
+
+    The gzip variant is compressed once when the tile is rendered and kept
+    next to the raw tile, in memory (small LRU) and on disk ('<y>.pbf.gz').
+    Tiles are written atomically; an empty tile is cached as zero-byte files.
     """
+    version, source = _tile_source(layer)
+    key = (layer, version, z, x, y)
+    with _tile_cache_lock:
+        variants = _tile_cache.get(key)
+        if variants is not None:
+            _tile_cache.move_to_end(key)
+            return version, variants
+
+    path = _tile_cache_path(layer, version, z, x, y)
+    variants = None
     try:
-        base_dir = os.path.dirname(__file__)
-        json_path = os.path.join(base_dir, "..", "Finalized Data", "99speedmart-distribution-centers.json")
-        
-        # Try multiple path candidates
-        candidates = [
-            json_path,
-            os.path.join(os.path.dirname(base_dir), "Finalized Data", "99speedmart-distribution-centers.json"),
-            "Finalized Data/99speedmart-distribution-centers.json",
-            os.path.join("/var/task", "Finalized Data", "99speedmart-distribution-centers.json"),  # Vercel path
+        with open(path, 'rb') as f, open(path + '.gz', 'rb') as gz:
+            variants = {'identity': f.read(), 'gzip': gz.read()}
+    except FileNotFoundError:
+        pass
+
+    if variants is None:
+        data = encode_tile({layer: source.tile(z, x, y)})
+        variants = {'identity': data, 'gzip': gzip.compress(data, compresslevel=6, mtime=0) if data else b''}
+        try:
+            if not os.path.isdir(os.path.join(TILE_CACHE_DIR, layer, version)):
+                _prune_tile_versions(layer, version)
+            # The .gz file goes first so a raw tile on disk always has its pair
+            _write_tile_file(path + '.gz', variants['gzip'])
+            _write_tile_file(path, data)
+        except OSError as e:
+            # Read-only deployments (e.g. Vercel) still serve freshly rendered tiles
+            print(f"Warning: Could not cache tile {layer}/{z}/{x}/{y}: {e}")
+
+    with _tile_cache_lock:
+        _tile_cache[key] = variants
+        _tile_cache.move_to_end(key)
+        while len(_tile_cache) > TILE_MEMORY_CACHE_MAX_ENTRIES:
+            _tile_cache.popitem(last=False)
+    return version, variants
+
+
+def seed_tiles(layers=TILE_LAYERS, min_zoom=4, max_zoom=12):
+    """
+    Pre-render tiles covering each layer's data extent into the on-disk cache.
+
+    Returns {layer: number of non-empty tiles}.
+    """
+    seeded = {}
+    for layer in layers:
+        _, source = _tile_source(layer)
+        bounds = source.bounds
+        seeded[layer] = 0
+        if bounds is None:
+            continue
+        for z in range(min_zoom, max_zoom + 1):
+            x_min, x_max, y_min, y_max = tile_range(z, bounds)
+            for x in range(x_min, x_max + 1):
+                for y in range(y_min, y_max + 1):
+                    _, variants = _render_tile(layer, z, x, y)
+                    if variants['identity']:
+                        seeded[layer] += 1
+    return seeded
+
+
+@app.route('/tiles/<layer>/<int:z>/<int:x>/<int:y>.pbf')
+def get_tile(layer, z, x, y):
+    """
+    Serve a Mapbox Vector Tile for the 'stores' or 'districts' layer.
+
+    stores features carry brand_key and color; districts carry name, state,
+    population_k and income_pc. Tiles are rendered from the cached store
+    snapshot / joined district layer and cached on disk; empty tiles are 204.
+    """
+    if layer not in TILE_LAYERS or not 0 <= z <= TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "Tile not found", "message": f"No tile {layer}/{z}/{x}/{y}"}), 404
+    try:
+        version, variants = _render_tile(layer, z, x, y)
+        encoding = 'gzip' if request.accept_encodings['gzip'] else 'identity'
+        data = variants[encoding]
+        # Each encoding has its own ETag so caches never mix the two bodies
+        etag = f'{version}-{z}-{x}-{y}' + ('-gz' if encoding == 'gzip' else '')
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': API_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        if not data:
+            return Response(status=204, headers=headers)
+        if encoding == 'gzip':
+            headers['Content-Encoding'] = 'gzip'
+        return Response(data, mimetype=TILE_MIMETYPE, headers=headers)
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to render tile",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+def _scan_distribution_center_files():
+    """
+    Find distribution-center JSON files under Finalized Data.
+
+    Looks in every '<category>/DC/' folder (and for '*distribution*centers*.json'
+    at the root) and keys each file by the brand_key derived from its name.
+    Returns {brand_key: path}.
+    """
+    try:
+        root = _finalized_data_path()
+    except FileNotFoundError:
+        return {}
+
+    paths = [
+        os.path.join(root, name) for name in os.listdir(root)
+        if name.lower().endswith('.json') and 'distribution' in name.lower()
+    ]
+    for category in sorted(os.listdir(root)):
+        dc_dir = os.path.join(root, category, 'DC')
+        if os.path.isdir(dc_dir):
+            paths.extend(os.path.join(dc_dir, name) for name in sorted(os.listdir(dc_dir)) if name.lower().endswith('.json'))
+
+    files = {}
+    for path in paths:
+        files.setdefault(filename_to_brand_key(os.path.basename(path)), path)
+    return files
+
+
+_dc_files_lock = threading.Lock()
+_dc_files = None  # {brand_key: path}, scanned once per process
+
+
+def _discover_distribution_center_files():
+    """
+    Return {brand_key: path} of the distribution-center files.
+
+    The folders are scanned once per process (see
+    load_distribution_center_registry); requests only stat the files they
+    serve, so edits to a known file are still picked up.
+    """
+    global _dc_files
+    if _dc_files is None:
+        with _dc_files_lock:
+            if _dc_files is None:
+                _dc_files = _scan_distribution_center_files()
+    return dict(_dc_files)
+
+
+def _file_version(path):
+    """Cheap content version of one file from its (path, mtime, size)."""
+    st = os.stat(path)
+    return hashlib.sha1(repr((os.path.abspath(path), st.st_mtime_ns, st.st_size)).encode('utf-8')).hexdigest()[:16]
+
+
+# Location keys with a fixed place in DC feature properties; any other keys in
+# a DC file (e.g. 'postcode', 'district') are passed through after 'state'
+_DC_BASE_FIELDS = ('code', 'name', 'address', 'gps', 'google_maps_url')
+
+
+def _distribution_centers(brand_key):
+    """
+    Parsed distribution centers of a brand as column arrays.
+
+    Returns (version, centers) where centers has 'lat' / 'lon' float arrays, a
+    list per base field plus 'state', and 'extra' ({field: list}) for any other
+    location keys; or (None, None) when the brand has no DC file. Each file is
+    parsed once per version.
+    """
+    path = _discover_distribution_center_files().get(brand_key)
+    if path is None:
+        return None, None
+    version = _file_version(path)
+
+    def build():
+        with open(path, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+        locations = [
+            (state_group.get('state', ''), location)
+            for state_group in json_data
+            for location in state_group.get('locations', [])
         ]
-        
-        json_data = None
-        for path in candidates:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                    print(f"Loaded distribution centers from {path}")
-                    break
-            except Exception as e:
-                continue
-        
-        if json_data is None:
-            return jsonify({
-                "type": "FeatureCollection",
-                "features": []
-            })
-        
-        # Convert to GeoJSON format
-        features = []
-        for state_group in json_data:
-            for location in state_group.get('locations', []):
-                # Parse GPS coordinates (format: "lat, lon")
-                gps_str = location.get('gps', '')
-                if gps_str:
-                    try:
-                        parts = gps_str.split(',')
-                        if len(parts) >= 2:
-                            lat = float(parts[0].strip())
-                            lon = float(parts[1].strip())
-                            
-                            feature = {
-                                "type": "Feature",
-                                "geometry": {
-                                    "type": "Point",
-                                    "coordinates": [lon, lat]  # GeoJSON uses [lon, lat]
-                                },
-                                "properties": {
-                                    "code": location.get('code', ''),
-                                    "name": location.get('name', ''),
-                                    "address": location.get('address', ''),
-                                    "state": state_group.get('state', ''),
-                                    "gps": gps_str,
-                                    "google_maps_url": location.get('google_maps_url', ''),
-                                    "type": "distribution_center"
-                                }
-                            }
-                            features.append(feature)
-                    except (ValueError, IndexError) as e:
-                        print(f"Warning: Could not parse GPS coordinates '{gps_str}': {e}")
-                        continue
-        
+        lat, lon, counts = parse_coordinates([loc.get('gps') for _, loc in locations], bounds=(-90, 90, -180, 180))
+        if counts['valid'] < counts['total']:
+            print(f"Warning: {path}: {counts['total'] - counts['valid']} centers without usable GPS "
+                  f"({format_rejections(counts)})")
+        keep = ~np.isnan(lat)
+        kept = [item for item, ok in zip(locations, keep) if ok]
+
+        extra_fields = []
+        for _, location in kept:
+            extra_fields.extend(k for k in location if k not in _DC_BASE_FIELDS and k not in extra_fields)
+
+        centers = {
+            'lat': lat[keep],
+            'lon': lon[keep],
+            'state': [state for state, _ in kept],
+            'extra': {field: [loc.get(field, '') for _, loc in kept] for field in extra_fields},
+        }
+        for field in _DC_BASE_FIELDS:
+            centers[field] = [loc.get(field, '') for _, loc in kept]
+        print(f"Loaded {len(kept)} distribution centers for {brand_key} from {path}")
+        return centers
+
+    return version, _versioned_artifact(version, f'distribution_centers:{brand_key}', build)
+
+
+def _distribution_center_features(centers):
+    """GeoJSON Point features for parsed distribution centers."""
+    features = []
+    for i in range(len(centers['lat'])):
+        properties = {
+            "code": centers['code'][i],
+            "name": centers['name'][i],
+            "address": centers['address'][i],
+            "state": centers['state'][i],
+        }
+        for field, values in centers['extra'].items():
+            properties[field] = values[i]
+        properties.update({
+            "gps": centers['gps'][i],
+            "google_maps_url": centers['google_maps_url'][i],
+            "type": "distribution_center"
+        })
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [float(centers['lon'][i]), float(centers['lat'][i])]  # GeoJSON uses [lon, lat]
+            },
+            "properties": properties
+        })
+    return features
+
+
+def _distribution_centers_response(brand_key):
+    """
+    Serve a brand's distribution centers as a cached GeoJSON FeatureCollection.
+
+    Brands without a DC file get an empty FeatureCollection.
+    """
+    version, centers = _distribution_centers(brand_key)
+    if centers is None:
         return jsonify({
             "type": "FeatureCollection",
-            "features": features
+            "features": []
         })
+    return _cached_json_response(
+        f'dc:{brand_key}',
+        version,
+        lambda: {
+            "type": "FeatureCollection",
+            "features": _distribution_center_features(centers)
+        },
+    )
+
+
+def _dc_nearest(snapshot, brand_key):
+    """
+    Nearest and second-nearest distribution center of every store of a brand.
+
+    Returns (version, centers, rows, indices, distances_km) where rows are the
+    brand's snapshot rows and indices / distances_km are (len(rows), 2) arrays
+    (-1 / inf where a brand has fewer than two centers); or all None when the
+    brand has no DC file. Cached per (snapshot, DC file) version.
+    """
+    dc_version, centers = _distribution_centers(brand_key)
+    if centers is None:
+        return None, None, None, None, None
+    version = f'{snapshot.version}:{dc_version}'
+
+    def build():
+        rows = _store_index(snapshot).select({'brand_key': [brand_key]})
+        lat = snapshot.df['latitude'].to_numpy(dtype=float)[rows]
+        lon = snapshot.df['longitude'].to_numpy(dtype=float)[rows]
+        indices, distances = nearest_targets(lat, lon, centers['lat'], centers['lon'], k=2)
+        return rows, indices, distances
+
+    rows, indices, distances = _versioned_artifact(version, f'dc_nearest:{brand_key}', build)
+    return version, centers, rows, indices, distances
+
+
+def _dc_assignment(snapshot, brand_key):
+    """
+    Nearest and second-nearest distribution center for every store of a brand.
+
+    Returns (version, payload) or (None, None) when the brand has no DC file;
+    cached per (snapshot, brand, DC file) version.
+    """
+    version, centers, rows, indices, distances = _dc_nearest(snapshot, brand_key)
+    if centers is None:
+        return None, None
+
+    def build():
+        def dc_ref(i):
+            return int(i) if i >= 0 else None
+
+        def km(d):
+            return round(float(d), 4) if np.isfinite(d) else None
+
+        counts = np.bincount(indices[:, 0][indices[:, 0] >= 0], minlength=len(centers['lat']))
+        return {
+            "brand_key": brand_key,
+            "distribution_centers": [
+                {
+                    "index": i,
+                    "code": centers['code'][i],
+                    "name": centers['name'][i],
+                    "state": centers['state'][i],
+                    "lat": float(centers['lat'][i]),
+                    "lon": float(centers['lon'][i]),
+                    "store_count": int(counts[i]),
+                }
+                for i in range(len(centers['lat']))
+            ],
+            "assignments": [
+                {
+                    "id": int(row),
+                    "dc": dc_ref(first),
+                    "distance_km": km(first_d),
+                    "second_dc": dc_ref(second),
+                    "second_distance_km": km(second_d),
+                }
+                for row, (first, second), (first_d, second_d) in zip(rows, indices, distances)
+            ],
+        }
+
+    return version, _versioned_artifact(version, f'dc_assignment:{brand_key}', build)
+
+
+@app.route('/api/dc-assignment')
+def get_dc_assignment():
+    """
+    Assign each store of a brand to its nearest distribution center.
+
+    GET /api/dc-assignment?brand_key=speedmart
+
+    Returns the brand's DCs (with the number of stores each serves) and, per
+    store id, the nearest DC index, its haversine distance and the second-nearest
+    DC. Computed with vectorized distance blocks once per snapshot and DC file
+    version, then served precompressed with an ETag.
+    """
+    try:
+        brand_key = request.args.get('brand_key', '').strip().lower()
+        if not brand_key:
+            return jsonify({"error": "Invalid query", "message": "brand_key is required"}), 400
+
+        snapshot = get_store_snapshot()
+        version, payload = _dc_assignment(snapshot, brand_key)
+        if payload is None:
+            return jsonify({
+                "error": "No distribution centers",
+                "message": f"No distribution center file found for brand_key '{brand_key}'",
+                "available": sorted(_discover_distribution_center_files()),
+            }), 404
+        return _cached_json_response(f'dc-assignment?{brand_key}', version, lambda: payload)
     except Exception as e:
         import traceback
         return jsonify({
-            "error": "Failed to load distribution centers",
+            "error": "Failed to assign distribution centers",
             "message": str(e),
             "traceback": traceback.format_exc()
         }), 500
 
-@app.route('/api/mrdiy-distribution-centers')
-def get_mrdiy_distribution_centers():
+# Default and limits for /api/dc-analytics distance bands (km upper edges)
+DC_DISTANCE_BANDS_KM = (10.0, 25.0, 50.0, 100.0)
+DC_MAX_DISTANCE_BANDS = 20
+
+
+def _parse_distance_bands(raw, name='bands'):
+    """Parse 'a,b,c' into increasing positive band edges; raises ValueError."""
+    if not raw:
+        return DC_DISTANCE_BANDS_KM
+    try:
+        bands = tuple(float(v) for v in raw.split(',') if v.strip())
+    except ValueError:
+        raise ValueError(f"{name} must be comma-separated distances in km")
+    if not bands or len(bands) > DC_MAX_DISTANCE_BANDS:
+        raise ValueError(f"{name} must list 1 to {DC_MAX_DISTANCE_BANDS} distances")
+    if any(not math.isfinite(b) or b <= 0 for b in bands) or any(b >= c for b, c in zip(bands, bands[1:])):
+        raise ValueError(f"{name} must be positive and strictly increasing")
+    return bands
+
+
+def _band_labels(bands):
+    """'0-10km', '10-25km', ..., '100km+' for band edges (10, 25, ..., 100)."""
+    edges = (0.0,) + tuple(bands)
+    fmt = lambda v: f'{v:g}'
+    return [f'{fmt(a)}-{fmt(b)}km' for a, b in zip(edges, edges[1:])] + [f'{fmt(bands[-1])}km+']
+
+
+def _dc_network_analytics(centers, nearest, distances, bands):
+    """
+    Catchment, reach and distance-band statistics of one DC network.
+
+    nearest / distances are each store's nearest DC index and distance (km).
+    A store falls in band i when bands[i-1] < distance <= bands[i].
+    """
+    n_dcs = len(centers['lat'])
+    assigned = nearest >= 0
+    nearest, distances = nearest[assigned], distances[assigned]
+
+    served = np.bincount(nearest, minlength=n_dcs)
+    total = np.bincount(nearest, weights=distances, minlength=n_dcs)
+    longest = np.zeros(n_dcs)
+    shortest = np.full(n_dcs, np.inf)
+    np.maximum.at(longest, nearest, distances)
+    np.minimum.at(shortest, nearest, distances)
+    mean = np.divide(total, served, out=np.zeros(n_dcs), where=served > 0)
+    shortest[served == 0] = 0.0
+
+    band_index = np.searchsorted(np.asarray(bands), distances, side='left')
+    n_bands = len(bands) + 1
+    histogram = np.bincount(band_index, minlength=n_bands)
+    per_dc = np.bincount(nearest * n_bands + band_index, minlength=n_dcs * n_bands).reshape(n_dcs, n_bands)
+
+    km = lambda d: round(float(d), 4)
+    has_stores = served > 0
+    return {
+        "dc_count": n_dcs,
+        "store_count": int(len(distances)),
+        # Same definition as the map's DC reach: mean of the farthest store per DC
+        "reach_km": km(longest[has_stores].mean()) if has_stores.any() else 0.0,
+        "mean_distance_km": km(distances.mean()) if len(distances) else 0.0,
+        "median_distance_km": km(np.median(distances)) if len(distances) else 0.0,
+        "histogram": [int(c) for c in histogram],
+        "distribution_centers": sorted(
+            (
+                {
+                    "index": i,
+                    "code": centers['code'][i],
+                    "name": centers['name'][i],
+                    "state": centers['state'][i],
+                    "stores_served": int(served[i]),
+                    "mean_distance_km": km(mean[i]),
+                    "max_distance_km": km(longest[i]),
+                    "min_distance_km": km(shortest[i]),
+                    "histogram": [int(c) for c in per_dc[i]],
+                }
+                for i in range(n_dcs)
+            ),
+            key=lambda dc: -dc["stores_served"],
+        ),
+    }
+
+
+@app.route('/api/dc-analytics')
+def get_dc_analytics():
     """
-    Return MR DIY distribution centers from JSON file.
-    Converts the JSON structure to GeoJSON format for the map.
+    Return DC catchment, reach and distance-band histograms for one or more brands.
+
+    GET /api/dc-analytics?brand_key=speedmart,mrdiy&bands=10,25,50,100
+
+    Each brand's stores are assigned to the nearest of that brand's
+    distribution centers (the cached /api/dc-assignment result). Per brand:
+    per-DC stores served and mean / max / min distance, the network reach
+    (mean of each DC's farthest store), and store counts per distance band,
+    overall and per DC. Cached per brand set and bands.
     """
     try:
-        base_dir = os.path.dirname(__file__)
-        json_path = os.path.join(base_dir, "..", "Finalized Data", "mr_diy_distribution_centers.json")
-        
-        # Try multiple path candidates
-        candidates = [
-            json_path,
-            os.path.join(os.path.dirname(base_dir), "Finalized Data", "mr_diy_distribution_centers.json"),
-            "Finalized Data/mr_diy_distribution_centers.json",
-            os.path.join("/var/task", "Finalized Data", "mr_diy_distribution_centers.json"),  # Vercel path
-        ]
-        
-        json_data = None
-        for path in candidates:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                    print(f"Loaded MR DIY distribution centers from {path}")
-                    break
-            except Exception as e:
-                continue
-        
-        if json_data is None:
+        brand_keys = sorted(set(b.lower() for b in _multi_arg('brand_key')))
+        try:
+            if not brand_keys:
+                raise ValueError("brand_key is required")
+            bands = _parse_distance_bands(request.args.get('bands', ''))
+        except ValueError as e:
+            return jsonify({"error": "Invalid query", "message": str(e)}), 400
+
+        available = _discover_distribution_center_files()
+        missing = [b for b in brand_keys if b not in available]
+        if missing:
             return jsonify({
-                "type": "FeatureCollection",
-                "features": []
-            })
-        
-        # Convert to GeoJSON format
-        features = []
-        for state_group in json_data:
-            for location in state_group.get('locations', []):
-                # Parse GPS coordinates (format: "lat, lon")
-                gps_str = location.get('gps', '')
-                if gps_str:
-                    try:
-                        parts = gps_str.split(',')
-                        if len(parts) >= 2:
-                            lat = float(parts[0].strip())
-                            lon = float(parts[1].strip())
-                            
-                            feature = {
-                                "type": "Feature",
-                                "geometry": {
-                                    "type": "Point",
-                                    "coordinates": [lon, lat]  # GeoJSON uses [lon, lat]
-                                },
-                                "properties": {
-                                    "code": location.get('code', ''),
-                                    "name": location.get('name', ''),
-                                    "address": location.get('address', ''),
-                                    "state": state_group.get('state', ''),
-                                    "gps": gps_str,
-                                    "google_maps_url": location.get('google_maps_url', ''),
-                                    "type": "distribution_center"
-                                }
-                            }
-                            features.append(feature)
-                    except (ValueError, IndexError) as e:
-                        print(f"Warning: Could not parse GPS coordinates '{gps_str}': {e}")
-                        continue
-        
+                "error": "No distribution centers",
+                "message": f"No distribution center file found for brand_key {missing}",
+                "available": sorted(available),
+            }), 404
+
+        snapshot = get_store_snapshot()
+        networks = {b: _dc_nearest(snapshot, b) for b in brand_keys}
+        version = hashlib.sha1('|'.join(n[0] for n in networks.values()).encode('utf-8')).hexdigest()[:16]
+
+        def build_payload():
+            return {
+                "bands_km": list(bands),
+                "band_labels": _band_labels(bands),
+                "brands": {
+                    brand_key: _dc_network_analytics(centers, indices[:, 0], distances[:, 0], bands)
+                    for brand_key, (_, centers, _, indices, distances) in networks.items()
+                },
+            }
+
+        cache_key = 'dc-analytics?' + json.dumps([brand_keys, bands], separators=(',', ':'))
+        return _cached_json_response(cache_key, version, build_payload)
+    except Exception as e:
+        import traceback
         return jsonify({
-            "type": "FeatureCollection",
-            "features": features
-        })
+            "error": "Failed to compute DC analytics",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/dc')
+def get_dc_brands():
+    """List the brands with distribution-center files and how many centers each has."""
+    try:
+        brands = []
+        for brand_key, path in sorted(_discover_distribution_center_files().items()):
+            _, centers = _distribution_centers(brand_key)
+            brands.append({
+                "brand_key": brand_key,
+                "count": len(centers['lat']),
+                "file": os.path.relpath(path, _finalized_data_path()),
+            })
+        return jsonify(brands)
     except Exception as e:
         import traceback
         return jsonify({
-            "error": "Failed to load MR DIY distribution centers",
+            "error": "Failed to list distribution centers",
             "message": str(e),
             "traceback": traceback.format_exc()
         }), 500
 
-@app.route('/api/orientalkopi-distribution-centers')
-def get_orientalkopi_distribution_centers():
+
+@app.route('/api/dc/<brand_key>')
+def get_brand_distribution_centers(brand_key: str):
     """
-    Return Oriental Kopi distribution centers from JSON file.
-    Converts the JSON structure to GeoJSON format for the map.
+    Return a brand's distribution centers as GeoJSON.
+
+    Any '<category>/DC/*.json' file under Finalized Data is served here by the
+    brand_key derived from its file name; the response is cached per file
+    version with an ETag.
     """
     try:
-        base_dir = os.path.dirname(__file__)
-        json_path = os.path.join(base_dir, "..", "Finalized Data", "oriental_kopi_distribution_centers.json")
-        
-        # Try multiple path candidates
-        candidates = [
-            json_path,
-            os.path.join(os.path.dirname(base_dir), "Finalized Data", "oriental_kopi_distribution_centers.json"),
-            "Finalized Data/oriental_kopi_distribution_centers.json",
-            os.path.join("/var/task", "Finalized Data", "oriental_kopi_distribution_centers.json"),  # Vercel path
-        ]
-        
-        json_data = None
-        for path in candidates:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                    print(f"Loaded Oriental Kopi distribution centers from {path}")
-                    break
-            except Exception as e:
-                continue
-        
-        if json_data is None:
+        brand_key = brand_key.lower()
+        available = _discover_distribution_center_files()
+        if brand_key not in available:
             return jsonify({
-                "type": "FeatureCollection",
-                "features": []
-            })
-        
-        # Convert to GeoJSON format
-        features = []
-        for state_group in json_data:
-            for location in state_group.get('locations', []):
-                # Parse GPS coordinates (format: "lat, lon")
-                gps_str = location.get('gps', '')
-                if gps_str:
-                    try:
-                        parts = gps_str.split(',')
-                        if len(parts) >= 2:
-                            lat = float(parts[0].strip())
-                            lon = float(parts[1].strip())
-                            
-                            feature = {
-                                "type": "Feature",
-                                "geometry": {
-                                    "type": "Point",
-                                    "coordinates": [lon, lat]  # GeoJSON uses [lon, lat]
-                                },
-                                "properties": {
-                                    "code": location.get('code', ''),
-                                    "name": location.get('name', ''),
-                                    "address": location.get('address', ''),
-                                    "state": state_group.get('state', ''),
-                                    "postcode": location.get('postcode', ''),
-                                    "district": location.get('district', ''),
-                                    "gps": gps_str,
-                                    "google_maps_url": location.get('google_maps_url', ''),
-                                    "type": "distribution_center"
-                                }
-                            }
-                            features.append(feature)
-                    except (ValueError, IndexError) as e:
-                        print(f"Warning: Could not parse GPS coordinates '{gps_str}': {e}")
-                        continue
-        
+                "error": "Unknown brand",
+                "message": f"No distribution center file for brand_key '{brand_key}'",
+                "available": sorted(available)
+            }), 404
+        return _distribution_centers_response(brand_key)
+    except Exception as e:
+        import traceback
         return jsonify({
-            "type": "FeatureCollection",
-            "features": features
-        })
+            "error": "Failed to load distribution centers",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/distribution-centers')
+def get_distribution_centers():
+    """Return 99 SpeedMart distribution centers (same as /api/dc/speedmart)."""
+    try:
+        return _distribution_centers_response('speedmart')
     except Exception as e:
         import traceback
         return jsonify({
-            "error": "Failed to load Oriental Kopi distribution centers",
+            "error": "Failed to load distribution centers",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/mrdiy-distribution-centers')
+def get_mrdiy_distribution_centers():
+    """Return MR DIY distribution centers (same as /api/dc/mrdiy)."""
+    try:
+        return _distribution_centers_response('mrdiy')
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load distribution centers",
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }), 500
+
+
+@app.route('/api/orientalkopi-distribution-centers')
+def get_orientalkopi_distribution_centers():
+    """Return Oriental Kopi distribution centers (same as /api/dc/orientalkopi)."""
+    try:
+        return _distribution_centers_response('orientalkopi')
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": "Failed to load distribution centers",
             "message": str(e),
             "traceback": traceback.format_exc()
         }), 500
 
+
 @app.route('/logos/<path:filename>')
 def serve_logo(filename: str):
     """
@@ -1198,5 +3252,18 @@ def serve_logo(filename: str):
     logos_dir = os.path.join(base_dir, "..", "Logos")
     return send_from_directory(logos_dir, filename)
 
+def load_distribution_center_registry():
+    """Discover and parse every DC file so the first DC request does no file work."""
+    for brand_key in _discover_distribution_center_files():
+        try:
+            _distribution_centers(brand_key)
+        except Exception as e:
+            print(f"Warning: Could not load distribution centers for {brand_key}: {e}")
+
+
+# Built at import so WSGI servers and api/index.py get the registry too
+load_distribution_center_registry()
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,119 @@
+"""
+Brand names and keys derived from the store data file names.
+
+Shared by the Template app, which loads the Excel files, and the
+Visualization app, which loads the GeoJSON exported next to them, so both
+key a brand the same way.
+"""
+
+
+def extract_brand_name_from_filename(filename: str) -> str:
+    """Extract brand name from Excel filename, cleaning it up."""
+    # Remove .xlsx extension
+    name = filename.replace('.xlsx', '').strip()
+    
+    # Handle common patterns
+    name = name.replace('_CLEANED', '').replace('_DONE', '').replace(' done', '').replace(' DONE', '')
+    name = name.replace('Locations', '').replace('Data', '').replace(' done', '').strip()
+    
+    # Handle special cases first
+    if 'Parkson' in name and ('Aeon' in name or 'aeon' in name):
+        return 'Parkson Aeon'
+    # Handle Parkson.xlsx - recognize as Parkson
+    if name == 'Parkson' or name.lower() == 'parkson':
+        return 'Parkson'
+    # Handle 711.xlsx - recognize as 7-Eleven
+    if name == '711' or name.startswith('711'):
+        return '7-Eleven'
+    if '7-Eleven' in name or '7Eleven' in name or '7-Eleven' in name:
+        return '7-Eleven'
+    # Handle Aeon_updated.xlsx - recognize as Aeon
+    if 'Aeon_updated' in name or (name.startswith('Aeon') and 'updated' in name.lower()):
+        return 'Aeon'
+    if name == 'Aeon' or name.lower() == 'aeon':
+        return 'Aeon'
+    if 'MRDiy' in name or 'MR DIY' in name or 'MRDiy' in name:
+        return 'MR DIY'
+    if 'MRToy' in name or 'MR Toy' in name or 'MRToy' in name:
+        return 'MR Toy'
+    if 'Eco-Shop' in name or 'EcoShop' in name:
+        return 'Eco-Shop'
+    if '99 SpeedMart' in name or '99SpeedMart' in name:
+        return '99 SpeedMart'
+    if 'OldTown' in name or 'Old Town' in name:
+        return 'OldTown White Coffee'
+    if 'Oriental Kopi' in name or 'OrientalKopi' in name:
+        return 'Oriental Kopi'
+    if 'Tea Garden' in name or 'TeaGarden' in name:
+        return 'Tea Garden'
+    if 'Family Mart' in name or 'FamilyMart' in name:
+        return 'Family Mart'
+    if 'KK Mart' in name or 'KKMart' in name or 'KK Supermart' in name:
+        return 'KK Mart'
+    if 'MyNews' in name or 'My News' in name or 'MyNews Mart' in name:
+        return 'MyNews Mart'
+    if 'Poh Kong' in name or 'PohKong' in name:
+        return 'Poh Kong'
+    if 'Wah Chan' in name or 'WahChan' in name:
+        return 'Wah Chan'
+    if 'Habib' in name and 'Jewels' in name:
+        return 'Habib Jewels'
+    if 'H&M' in name or 'HNM' in name:
+        return 'H&M'
+    
+    # Clean up remaining name
+    name = name.strip()
+    # Capitalize properly
+    if name:
+        # Split by spaces and capitalize each word
+        words = name.split()
+        name = ' '.join(word.capitalize() for word in words)
+    
+    return name
+
+
+def filename_to_brand_key(filename: str) -> str:
+    """Convert filename to normalized brand_key."""
+    name = extract_brand_name_from_filename(filename).lower()
+    
+    # Remove special characters, keep only alphanumeric
+    key = ''.join(ch for ch in name if ch.isalnum() or ch == ' ')
+    key = key.replace(' ', '').strip()
+    
+    # Handle special cases
+    if '7-eleven' in key or '7eleven' in key or key == '711':
+        return '7eleven'
+    if 'parkson' in key and 'aeon' in key:
+        return 'parksonaeon'
+    if key == 'parkson':
+        return 'parkson'
+    if key == 'aeon' or key == 'aeonupdated':
+        return 'aeon'
+    if 'mrdiy' in key or 'mr diy' in key:
+        return 'mrdiy'
+    if 'mrtoy' in key or 'mr toy' in key:
+        return 'mrtoy'
+    if 'orientalkopi' in key or 'oriental kopi' in key:
+        return 'orientalkopi'
+    if 'oldtown' in key or 'old town' in key:
+        return 'oldtown'
+    if 'teagarden' in key or 'tea garden' in key:
+        return 'teagarden'
+    if 'familymart' in key or 'family mart' in key:
+        return 'familymart'
+    if 'kkmart' in key or 'kk mart' in key or 'kksupermart' in key:
+        return 'kkmart'
+    if 'mynews' in key or 'my news' in key:
+        return 'mynews'
+    if 'speedmart' in key or '99 speedmart' in key:
+        return 'speedmart'
+    if 'ecoshop' in key or 'eco-shop' in key:
+        return 'ecoshop'
+    if 'pohkong' in key or 'poh kong' in key:
+        return 'pohkong'
+    if 'wahchan' in key or 'wah chan' in key:
+        return 'wahchan'
+    if 'habib' in key:
+        return 'habib'
+    
+    return key
@@ -0,0 +1,40 @@
+"""
+Compile all Finalized Data brand workbooks into the columnar store snapshot.
+
+Run this after editing any brand Excel file, or as a deploy step, so the app can
+load every store from the compiled snapshot instead of parsing Excel:
+
+    python build_snapshot.py [--workers N]
+
+Workbooks are parsed on a process pool with one task per file (default: one
+worker per CPU core). The snapshot and its manifest are written to
+STORE_SNAPSHOT_DIR (default: ./cache).
+"""
+
+import argparse
+import os
+import time
+
+from app import SNAPSHOT_DIR, _snapshot_stats, build_compiled_snapshot
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile the columnar store snapshot.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes used to parse workbooks (1 = serial)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = build_compiled_snapshot(workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    ingest = _snapshot_stats['last_ingest']
+    print('=' * 60)
+    for timing in sorted(ingest['files'], key=lambda t: -t['seconds']):
+        status = f"FAILED: {timing['error']}" if timing['error'] else f"{timing['rows']} rows"
+        print(f"  {timing['seconds']:6.2f}s  {timing['file']}  ({status})")
+    print('=' * 60)
+    print(f"Compiled {manifest['rows']} stores from {len(manifest['sources'])} workbooks "
+          f"({manifest['format']}) in {elapsed:.2f}s")
+    print(f"Snapshot written to {SNAPSHOT_DIR}/{manifest['data_file']}")
+    print('=' * 60)
@@ -0,0 +1,150 @@
+"""
+Zoom-aware point clustering for the store map.
+
+ClusterIndex precomputes, for every zoom level, the clusters a client-side
+clusterer (e.g. Mapbox/supercluster) would show: points are binned on a Web
+Mercator grid whose cell is `radius` pixels wide at that zoom, and each
+non-empty cell becomes a cluster with its count, weighted centroid and brand
+breakdown. Cells halve in size from one zoom to the next, so clusters nest
+hierarchically. Everything is numpy arrays per zoom; a viewport query is a
+bounding-box mask over the clusters of one zoom.
+"""
+
+import math
+
+import numpy as np
+
+
+def mercator(lat, lon):
+    """Project lon/lat degrees to Web Mercator unit square coordinates [0, 1]."""
+    x = np.asarray(lon, dtype=float) / 360.0 + 0.5
+    sin = np.sin(np.radians(np.asarray(lat, dtype=float)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return x, np.clip(y, 0.0, 1.0)
+
+
+def unmercator(x, y):
+    """Inverse of mercator(): unit square coordinates back to (lat, lon) degrees."""
+    lon = (np.asarray(x) - 0.5) * 360.0
+    lat = np.degrees(2 * np.arctan(np.exp((180 - np.asarray(y) * 360) * math.pi / 180)) - math.pi / 2)
+    return lat, lon
+
+
+class _ZoomLevel:
+    """Clusters of one zoom level, stored as parallel arrays."""
+
+    def __init__(self, x, y, brand_codes, n_brands, cells_per_side):
+        ix = np.minimum((x * cells_per_side).astype(np.int64), cells_per_side - 1)
+        iy = np.minimum((y * cells_per_side).astype(np.int64), cells_per_side - 1)
+        keys = ix * cells_per_side + iy
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+
+        self.count = counts
+        # Representative point (first member) - used for single-point clusters
+        self.first = first
+        cx = np.bincount(inverse, weights=x) / counts
+        cy = np.bincount(inverse, weights=y) / counts
+        self.lat, self.lon = unmercator(cx, cy)
+
+        # Brand breakdown in CSR form: for cluster c, brands/brand_counts[offsets[c]:offsets[c+1]]
+        pair_keys, pair_counts = np.unique(inverse * n_brands + brand_codes, return_counts=True)
+        pair_cluster = pair_keys // n_brands
+        self.brands = pair_keys % n_brands
+        self.brand_counts = pair_counts
+        self.offsets = np.searchsorted(pair_cluster, np.arange(len(counts) + 1))
+
+
+class ClusterIndex:
+    """
+    Hierarchical grid clusters for zooms min_zoom..max_zoom.
+
+    Args:
+        lat, lon: Point coordinates
+        brand_keys: Brand key per point (used for per-cluster breakdowns)
+        ids: Optional ids returned for single points (default: positions)
+        radius: Cluster radius in pixels
+        extent: Tile size in pixels (512 for Mapbox GL)
+        min_zoom, max_zoom: Zoom range to precompute; above max_zoom points
+            are returned unclustered
+    """
+
+    def __init__(self, lat, lon, brand_keys, ids=None, radius=50, extent=512, min_zoom=0, max_zoom=16):
+        self.ids = np.arange(len(lat)) if ids is None else np.asarray(ids)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        codes, self.brand_names = _factorize(brand_keys)
+        self.brand_codes = codes
+
+        x, y = mercator(self.lat, self.lon)
+        n_brands = max(len(self.brand_names), 1)
+        self.levels = {}
+        for z in range(min_zoom, max_zoom + 1):
+            cells_per_side = max(int(math.ceil((2 ** z) * extent / radius)), 1)
+            self.levels[z] = _ZoomLevel(x, y, codes, n_brands, cells_per_side)
+
+    def query(self, zoom, bbox=None):
+        """
+        Clusters visible at `zoom` inside bbox=(min_lon, min_lat, max_lon, max_lat).
+
+        Returns a list of dicts. Multi-point clusters have 'cluster': True,
+        'cluster_id', 'point_count', 'lat', 'lon' and 'brands' ({brand_key:
+        count}); single points have 'cluster': False and 'id'.
+        """
+        zoom = int(math.floor(zoom))
+        if zoom > self.max_zoom:
+            return self._points(bbox)
+        level = self.levels[max(zoom, self.min_zoom)]
+
+        selected = np.arange(len(level.count))
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            selected = selected[
+                (level.lon >= min_lon) & (level.lon <= max_lon) & (level.lat >= min_lat) & (level.lat <= max_lat)
+            ]
+
+        results = []
+        for c in selected:
+            count = int(level.count[c])
+            if count == 1:
+                member = level.first[c]
+                results.append({
+                    'cluster': False,
+                    'id': int(self.ids[member]),
+                    'lat': float(self.lat[member]),
+                    'lon': float(self.lon[member]),
+                })
+                continue
+            start, end = level.offsets[c], level.offsets[c + 1]
+            results.append({
+                'cluster': True,
+                # Same encoding as supercluster: (index << 5) + zoom
+                'cluster_id': int(c) * 32 + max(zoom, self.min_zoom),
+                'point_count': count,
+                'lat': float(level.lat[c]),
+                'lon': float(level.lon[c]),
+                'brands': {
+                    self.brand_names[b]: int(n)
+                    for b, n in zip(level.brands[start:end], level.brand_counts[start:end])
+                },
+            })
+        return results
+
+    def _points(self, bbox):
+        selected = np.arange(len(self.lat))
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            selected = selected[
+                (self.lon >= min_lon) & (self.lon <= max_lon) & (self.lat >= min_lat) & (self.lat <= max_lat)
+            ]
+        return [
+            {'cluster': False, 'id': int(self.ids[i]), 'lat': float(self.lat[i]), 'lon': float(self.lon[i])}
+            for i in selected
+        ]
+
+
+def _factorize(values):
+    """Map values to integer codes; returns (codes, list of distinct values)."""
+    names, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int64), [str(n) for n in names]
@@ -0,0 +1,91 @@
+"""
+Vectorized coordinate parsing shared by app.py, validate_states.py and
+Finalized Data/Additional Scripts/excel_to_geojson.py.
+
+Brand workbooks store locations as a single 'lat, lon' text cell (sometimes with
+a literal '\\n' or a real newline after the comma). parse_coordinates turns a
+whole column into float arrays in one pass, applies the bounds and swap checks
+as numpy masks, and reports how many cells were rejected and why instead of
+printing a warning per bad cell.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (lat_min, lat_max, lon_min, lon_max) - Malaysia is roughly 0-7°N, 100-120°E
+MALAYSIA_BOUNDS = (0.0, 10.0, 95.0, 125.0)
+
+_NAN_PAIR = (np.nan, np.nan)
+
+
+def _split_pair(value):
+    """Return the (lat, lon) floats of one 'lat, lon' cell, or (nan, nan)."""
+    if not isinstance(value, str):
+        if value is None or value != value:  # None / NaN
+            return _NAN_PAIR
+        value = str(value)
+    # Handle various formats: "lat, lon", "lat,lon", "lat,\nlon", etc.
+    lat_text, sep, rest = value.replace('\\n', ' ').replace('\n', ' ').partition(',')
+    if not sep:
+        return _NAN_PAIR
+    try:
+        return float(lat_text), float(rest.partition(',')[0])
+    except ValueError:
+        return _NAN_PAIR
+
+
+def parse_coordinates(values, bounds=MALAYSIA_BOUNDS, detect_swapped=False):
+    """
+    Parse a column of 'lat, lon' strings into latitude/longitude float arrays.
+
+    Args:
+        values: Series (or any iterable) of raw coordinate cells
+        bounds: (lat_min, lat_max, lon_min, lon_max) box valid points must fall in
+        detect_swapped: If True, pairs that are out of bounds as (lat, lon) but
+            inside them as (lon, lat) are swapped instead of rejected
+
+    Returns:
+        Tuple of (lat, lon, counts). lat/lon are float64 numpy arrays with NaN for
+        rejected cells. counts is a dict with 'total', 'valid', 'missing',
+        'unparseable', 'out_of_bounds' and 'swapped' totals.
+    """
+    values = values.tolist() if isinstance(values, pd.Series) else list(values)
+    missing = pd.isna(np.array(values, dtype=object))
+
+    # A single pass of float() over the split text is both exact (pd.to_numeric can
+    # be off by 1 ulp) and faster than Series.str.extract + to_numeric here.
+    pairs = np.array([_split_pair(v) for v in values], dtype=float).reshape(-1, 2)
+    lat = pairs[:, 0].copy()
+    lon = pairs[:, 1].copy()
+
+    parsed = ~np.isnan(lat) & ~np.isnan(lon)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    in_bounds = parsed & (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+
+    swapped = np.zeros(len(lat), dtype=bool)
+    if detect_swapped:
+        swapped = (
+            parsed & ~in_bounds
+            & (lon >= lat_min) & (lon <= lat_max) & (lat >= lon_min) & (lat <= lon_max)
+        )
+        lat[swapped], lon[swapped] = lon[swapped], lat[swapped]
+        in_bounds |= swapped
+
+    lat[~in_bounds] = np.nan
+    lon[~in_bounds] = np.nan
+
+    counts = {
+        'total': int(len(lat)),
+        'valid': int(in_bounds.sum()),
+        'missing': int(missing.sum()),
+        'unparseable': int((~missing & ~parsed).sum()),
+        'out_of_bounds': int((parsed & ~in_bounds).sum()),
+        'swapped': int(swapped.sum()),
+    }
+    return lat, lon, counts
+
+
+def format_rejections(counts):
+    """One-line summary of rejected cells, e.g. 'unparseable=3, out_of_bounds=1'."""
+    parts = [f"{key}={counts[key]}" for key in ('missing', 'unparseable', 'out_of_bounds', 'swapped') if counts[key]]
+    return ', '.join(parts) if parts else 'none'
@@ -0,0 +1,152 @@
+"""
+Pre-aggregated store counts over a fixed set of categorical dimensions.
+
+RollupCube collapses the store rows once into the distinct combinations
+(cells) of its dimensions - e.g. (category, brand_key, state, district) - with
+a count per cell. A slice (filters on any dimensions) is a mask over the cells
+and a roll-up (group by a subset of dimensions) sums the masked cell counts,
+so every query touches a few thousand cells instead of every store.
+
+cube_payload is the /api/cube response shared by the Template and
+Visualization apps.
+"""
+
+import numpy as np
+import pandas as pd
+
+from store_index import normalize_value
+
+# Label used for rows without a value in a dimension
+MISSING_LABEL = 'Unknown'
+
+# Dimensions of the store cube behind /api/cube (also its filter parameter names)
+CUBE_DIMENSIONS = ('category', 'brand_key', 'state', 'district', 'city')
+
+
+class RollupCube:
+    """
+    Store counts per distinct combination of the dimension values.
+
+    Args:
+        columns: dict of dimension name -> values per row (all the same length);
+            values match filters case-insensitively, labels keep the spelling
+            of their first occurrence
+    """
+
+    def __init__(self, columns):
+        self.dimensions = list(columns)
+        self.labels = {}  # dimension -> [label per code]
+        self.codes = {}  # dimension -> {normalized value: code}
+        row_codes = []
+        for name, values in columns.items():
+            labels = pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+            labels = labels.mask(labels == '', MISSING_LABEL)
+            codes, uniques = pd.factorize(labels.map(normalize_value))
+            first = pd.Series(labels.to_numpy()).groupby(codes).first()
+            self.labels[name] = first.tolist()
+            self.codes[name] = {key: i for i, key in enumerate(uniques)}
+            row_codes.append(codes)
+
+        self.size = len(row_codes[0]) if row_codes else 0
+        if self.size:
+            self.cells, self.counts = np.unique(np.column_stack(row_codes), axis=0, return_counts=True)
+        else:
+            self.cells = np.empty((0, len(self.dimensions)), dtype=np.int64)
+            self.counts = np.empty(0, dtype=np.int64)
+
+    def _mask(self, filters):
+        """Boolean mask of the cells matching every filter."""
+        mask = np.ones(len(self.counts), dtype=bool)
+        for name, values in (filters or {}).items():
+            accepted = [self.codes[name].get(normalize_value(v), -1) for v in values]
+            mask &= np.isin(self.cells[:, self.dimensions.index(name)], accepted)
+        return mask
+
+    def query(self, group_by=(), filters=None):
+        """
+        Roll up the cells matching `filters` to the `group_by` dimensions.
+
+        Args:
+            group_by: Dimensions to keep (empty for the grand total)
+            filters: dict of dimension -> list of accepted values (OR within a
+                dimension, AND across dimensions)
+
+        Returns a list of (labels tuple, count) sorted by descending count.
+        """
+        mask = self._mask(filters)
+        counts = self.counts[mask]
+        if not group_by:
+            return [((), int(counts.sum()))]
+
+        columns = [self.dimensions.index(name) for name in group_by]
+        groups, inverse = np.unique(self.cells[mask][:, columns], axis=0, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(groups)).astype(np.int64)
+        order = np.argsort(-totals, kind='stable')
+        return [
+            (tuple(self.labels[name][code] for name, code in zip(group_by, groups[i])), int(totals[i]))
+            for i in order
+        ]
+
+    def matrix(self, rows, columns, filters=None):
+        """
+        Cross-tabulate two dimensions over the cells matching `filters`.
+
+        Returns (row labels, column labels, counts) where counts is a dense
+        (rows x columns) int64 array covering only the values that occur.
+        """
+        mask = self._mask(filters)
+        r = self.cells[mask][:, self.dimensions.index(rows)]
+        c = self.cells[mask][:, self.dimensions.index(columns)]
+        row_codes, r = np.unique(r, return_inverse=True)
+        col_codes, c = np.unique(c, return_inverse=True)
+        counts = np.zeros((len(row_codes), len(col_codes)), dtype=np.int64)
+        np.add.at(counts, (r, c), self.counts[mask])
+        return (
+            [self.labels[rows][code] for code in row_codes],
+            [self.labels[columns][code] for code in col_codes],
+            counts,
+        )
+
+
+def parse_group_by(values, dimensions=CUBE_DIMENSIONS):
+    """
+    Parse repeated group_by parameters (dimensions comma-separated) into lists.
+
+    Raises ValueError naming any dimension not in `dimensions`.
+    """
+    rollups = []
+    for raw in values:
+        dims = [d.strip() for d in raw.split(',') if d.strip()]
+        unknown = [d for d in dims if d not in dimensions]
+        if unknown:
+            raise ValueError(f"Unknown group_by dimensions {unknown}; expected any of {list(dimensions)}")
+        rollups.append(dims)
+    return rollups
+
+
+def cube_payload(cube, rollups, filters, brands):
+    """
+    /api/cube response: the total and each roll-up of the cells matching `filters`.
+
+    Args:
+        cube: RollupCube over CUBE_DIMENSIONS
+        rollups: List of group_by dimension lists
+        filters: dict of dimension -> accepted values
+        brands: {brand_key: brand display name}
+    """
+    return {
+        "dimensions": list(cube.dimensions),
+        "filters": filters,
+        "total": cube.query((), filters)[0][1],
+        "brands": brands,
+        "rollups": [
+            {
+                "group_by": dims,
+                "cells": [
+                    {**dict(zip(dims, labels)), "count": count}
+                    for labels, count in cube.query(dims, filters)
+                ],
+            }
+            for dims in rollups
+        ],
+    }
@@ -0,0 +1,176 @@
+"""
+Resolve district names from the district GeoJSON to rows of the District
+Statistics sheet.
+
+The two sources disagree in several ways: 3-letter state codes vs full names,
+'W.P.' / 'Wp' / 'Wilayah Persekutuan' prefixes on the federal territories, rows
+with the State and District columns swapped, districts written as
+'District State', and the odd misspelling. DistrictResolver is built once from
+the sheet: every known spelling of a row becomes a key in an alias table, and
+an index of character trigrams covers the remaining near-misses. resolve()
+is a couple of dict lookups, falling back to scoring only the rows that share
+trigrams with the query.
+"""
+
+from collections import namedtuple
+
+import pandas as pd
+
+# 3-letter state codes used by the GeoJSON -> state names used by the sheet
+STATE_CODES = {
+    'JHR': 'Johor',
+    'KDH': 'Kedah',
+    'KTN': 'Kelantan',
+    'MLK': 'Melaka',
+    'NSN': 'Negeri Sembilan',
+    'PHG': 'Pahang',
+    'PRK': 'Perak',
+    'PLS': 'Perlis',
+    'PNG': 'Pulau Pinang',
+    'SBH': 'Sabah',
+    'SWK': 'Sarawak',
+    'SGR': 'Selangor',
+    'TRG': 'Terengganu',
+    'WPK': 'Wp Kuala Lumpur',
+    'WPL': 'Wp Labuan',
+    'WPP': 'Wp Putrajaya',
+    'KUL': 'Wp Kuala Lumpur',
+    'LBN': 'Wp Labuan',
+    'PJY': 'Wp Putrajaya',
+}
+
+# Normalized prefixes marking a federal territory ('W.P. Labuan', 'Wp Labuan', ...)
+_FEDERAL_PREFIXES = ('wilayahpersekutuan', 'wp')
+
+# Minimum trigram similarity (Dice coefficient) for a fuzzy match
+FUZZY_MIN_SCORE = 0.75
+
+Match = namedtuple('Match', ['row', 'confidence', 'method'])
+
+
+def normalize_name(text):
+    """Lower-case alphanumeric form of a name ('W.P. Kuala Lumpur' -> 'wpkualalumpur')."""
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return ''
+    return ''.join(ch for ch in str(text).lower() if ch.isalnum())
+
+
+def _strip_federal(key):
+    """Remove a federal territory prefix; returns (key, was_federal)."""
+    for prefix in _FEDERAL_PREFIXES:
+        if key.startswith(prefix) and len(key) > len(prefix):
+            return key[len(prefix):], True
+    return key, False
+
+
+def canonical_state(state):
+    """Canonical state key; accepts 3-letter codes and federal territory prefixes."""
+    if isinstance(state, str) and state.strip().upper() in STATE_CODES and len(state.strip()) == 3:
+        state = STATE_CODES[state.strip().upper()]
+    return _strip_federal(normalize_name(state))[0]
+
+
+def canonical_district(district):
+    """Canonical district key with any federal territory prefix removed."""
+    return _strip_federal(normalize_name(district))[0]
+
+
+def _trigrams(key):
+    padded = f'^{key}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class DistrictResolver:
+    """
+    Alias table + trigram index over the rows of the district statistics sheet.
+
+    Args:
+        states, districts: The sheet's State and District columns (row order is
+            kept; resolve() returns positions into them)
+    """
+
+    def __init__(self, states, districts):
+        self.states = [canonical_state(s) for s in states]
+        self.districts = [canonical_district(d) for d in districts]
+        self.aliases = {}  # (state key, district key) -> (confidence, method, {rows})
+        self.trigrams = {}  # trigram -> {rows}
+
+        for row, (raw_state, raw_district) in enumerate(zip(states, districts)):
+            state, district = self.states[row], self.districts[row]
+            if not district:
+                continue
+            federal = _strip_federal(normalize_name(raw_state))[1] or _strip_federal(normalize_name(raw_district))[1]
+
+            self._add((state, district), row, 1.0, 'exact')
+            # Rows with the State and District columns swapped
+            self._add((district, state), row, 0.95, 'swapped')
+            if federal:
+                # Federal territories are their own (single) district
+                self._add(('', district), row, 0.95, 'federal_territory')
+                self._add(('', state), row, 0.95, 'federal_territory')
+                self._add((district, district), row, 0.95, 'federal_territory')
+            # 'Petaling Selangor' / 'Selangor Petaling' style district cells
+            if state and district != state:
+                if district.endswith(state):
+                    self._add((state, district[:-len(state)]), row, 0.9, 'combined')
+                if district.startswith(state):
+                    self._add((state, district[len(state):]), row, 0.9, 'combined')
+            self._add(('', district), row, 0.8, 'district_only')
+
+            for gram in _trigrams(district):
+                self.trigrams.setdefault(gram, set()).add(row)
+
+    def _add(self, key, row, confidence, method):
+        if not key[1]:
+            return
+        entry = self.aliases.get(key)
+        if entry is None or confidence > entry[0]:
+            self.aliases[key] = (confidence, method, {row})
+        elif confidence == entry[0]:
+            entry[2].add(row)  # ambiguous at this confidence
+
+    def _lookup(self, key):
+        entry = self.aliases.get(key)
+        if entry is not None and len(entry[2]) == 1:
+            return Match(next(iter(entry[2])), entry[0], entry[1])
+        return None
+
+    def resolve(self, state, district):
+        """
+        Resolve a (state, district) pair to a sheet row.
+
+        Returns Match(row, confidence, method) or None. Confidence is 1.0 for an
+        exact match and lower for alias, substring and fuzzy matches.
+        """
+        state, district = canonical_state(state), canonical_district(district)
+        if not district:
+            return None
+        for key in ((state, district), ('', district)):
+            match = self._lookup(key)
+            if match is not None:
+                return match
+        return self._fuzzy(state, district)
+
+    def _fuzzy(self, state, district):
+        grams = _trigrams(district)
+        shared = {}
+        for gram in grams:
+            for row in self.trigrams.get(gram, ()):
+                shared[row] = shared.get(row, 0) + 1
+
+        best = None
+        for row, count in shared.items():
+            same_state = not state or not self.states[row] or self.states[row] == state
+            if not same_state:
+                continue
+            candidate = self.districts[row]
+            score = 2 * count / (len(grams) + len(_trigrams(candidate)))
+            if score >= FUZZY_MIN_SCORE:
+                match = Match(row, round(0.9 * score, 3), 'fuzzy')
+            elif len(district) >= 4 and (district in candidate or candidate in district):
+                match = Match(row, 0.7, 'substring')
+            else:
+                continue
+            if best is None or match.confidence > best.confidence:
+                best = match
+        return best
@@ -0,0 +1,40 @@
+"""
+Pre-render vector tiles into the on-disk tile cache.
+
+Run this after rebuilding the store snapshot or editing the district inputs so
+the first map views are served straight from disk:
+
+    python seed_tiles.py [--layers stores,districts] [--min-zoom 4] [--max-zoom 12]
+
+Only tiles covering each layer's data extent are rendered. Tiles are written to
+TILE_CACHE_DIR (default: ./cache/tiles); tiles of older data versions are removed.
+"""
+
+import argparse
+import time
+
+from app import TILE_CACHE_DIR, TILE_LAYERS, seed_tiles
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-render vector tiles.')
+    parser.add_argument('--layers', default=','.join(TILE_LAYERS),
+                        help='comma-separated layers to seed')
+    parser.add_argument('--min-zoom', type=int, default=4)
+    parser.add_argument('--max-zoom', type=int, default=12)
+    args = parser.parse_args()
+
+    layers = [layer.strip() for layer in args.layers.split(',') if layer.strip()]
+    unknown = [layer for layer in layers if layer not in TILE_LAYERS]
+    if unknown:
+        parser.error(f"unknown layers {unknown}; expected any of {list(TILE_LAYERS)}")
+
+    start = time.perf_counter()
+    seeded = seed_tiles(layers, args.min_zoom, args.max_zoom)
+    elapsed = time.perf_counter() - start
+
+    print('=' * 60)
+    for layer, count in seeded.items():
+        print(f"  {layer}: {count} non-empty tiles")
+    print(f"Seeded zooms {args.min_zoom}-{args.max_zoom} in {elapsed:.2f}s into {TILE_CACHE_DIR}")
+    print('=' * 60)
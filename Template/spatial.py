@@ -0,0 +1,499 @@
+"""
+Spatial indexing helpers for store analytics.
+
+GridIndex is a uniform grid hash over points projected to a local
+equirectangular plane (km). Points are sorted by cell so each cell is a
+contiguous slice; radius and k-nearest queries only compute exact haversine
+distances for points in the handful of cells around the query.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Projected (planar) distances may over-estimate haversine distances by up to
+# ~1% across Malaysia's latitude span; search bounds are widened by this factor.
+_PROJECTION_SLACK = 0.98
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometers (same formula as the JS)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_targets(lat, lon, target_lat, target_lon, k=1, block_size=2048):
+    """
+    The `k` nearest targets (e.g. distribution centers) for every point.
+
+    Computes haversine distances in blocks of points x all targets, which is
+    exact and fast while targets number in the hundreds. Returns (indices,
+    distances_km), both shaped (n_points, k) and sorted nearest first; missing
+    neighbours (fewer than k targets) are -1 / inf.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    target_lat = np.asarray(target_lat, dtype=float)
+    target_lon = np.asarray(target_lon, dtype=float)
+    indices = np.full((len(lat), k), -1, dtype=np.int64)
+    distances = np.full((len(lat), k), np.inf)
+    m = min(k, len(target_lat))
+    if m == 0:
+        return indices, distances
+
+    for start in range(0, len(lat), block_size):
+        stop = min(start + block_size, len(lat))
+        block = haversine_km(lat[start:stop, None], lon[start:stop, None], target_lat[None, :], target_lon[None, :])
+        if m < len(target_lat):
+            nearest = np.argpartition(block, m - 1, axis=1)[:, :m]
+        else:
+            nearest = np.broadcast_to(np.arange(m), (stop - start, m))
+        nearest_d = np.take_along_axis(block, nearest, axis=1)
+        order = np.argsort(nearest_d, axis=1, kind='stable')
+        indices[start:stop, :m] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:stop, :m] = np.take_along_axis(nearest_d, order, axis=1)
+    return indices, distances
+
+
+def _unit_vectors(lat, lon):
+    """3-D unit vectors of (lat, lon) degrees on the sphere, shape (n, 3)."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def nearest_by_group(lat, lon, target_lat, target_lon, target_groups, n_groups, block_size=2048):
+    """
+    Distance from every point to the nearest target of each group (e.g. brand).
+
+    Points and targets become 3-D unit vectors, so a block of points x all
+    targets is a single matrix product of dot products (larger = nearer). With
+    the targets sorted by group, np.maximum.reduceat reduces each block to the
+    per-group nearest in the same pass; only those are converted to km.
+    Returns an (n_points, n_groups) array; inf where a group has no targets.
+    """
+    groups = np.asarray(target_groups, dtype=np.int64)
+    order = np.argsort(groups, kind='stable')
+    groups = groups[order]
+    targets = _unit_vectors(target_lat, target_lon)[order].T
+    points = _unit_vectors(lat, lon)
+
+    present = np.unique(groups)
+    starts = np.searchsorted(groups, present)
+    result = np.full((len(points), n_groups), np.inf)
+    if len(present) == 0:
+        return result
+
+    for start in range(0, len(points), block_size):
+        stop = min(start + block_size, len(points))
+        nearest = np.maximum.reduceat(points[start:stop] @ targets, starts, axis=1)
+        # Chord length -> great-circle distance
+        chord = np.sqrt(np.clip(2 - 2 * nearest, 0.0, 4.0))
+        result[start:stop, present] = 2 * EARTH_RADIUS_KM * np.arcsin(chord / 2)
+    return result
+
+
+def radius_pairs(lat, lon, radius_km, block_size=4096):
+    """
+    All ordered pairs of distinct points within `radius_km` of each other.
+
+    Points are hashed into a grid of radius-sized cells (on the same local
+    plane as GridIndex), so only pairs from the 3 x 3 cells around each point
+    are candidates; candidate pairs are expanded and measured with haversine
+    as whole arrays, a block of points at a time. Returns (i, j, distances_km)
+    with both (i, j) and (j, i) present.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    n = len(lat)
+    empty = np.empty(0, dtype=np.int64)
+    if n == 0 or radius_km <= 0:
+        return empty, empty, np.empty(0)
+
+    ref_cos = math.cos(math.radians(float(np.mean(lat))))
+    x = EARTH_RADIUS_KM * np.radians(lon) * ref_cos
+    y = EARTH_RADIUS_KM * np.radians(lat)
+    cell = radius_km / _PROJECTION_SLACK
+    # One empty cell of padding on every side keeps neighbour keys in range
+    cx = np.floor((x - x.min()) / cell).astype(np.int64) + 1
+    cy = np.floor((y - y.min()) / cell).astype(np.int64) + 1
+    ny = int(cy.max()) + 2
+    keys = cx * ny + cy
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    offsets = [dx * ny + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    pairs_i, pairs_j, pairs_d = [], [], []
+    for start in range(0, n, block_size):
+        points = np.arange(start, min(start + block_size, n))
+        for offset in offsets:
+            neighbour = keys[points] + offset
+            lo = np.searchsorted(sorted_keys, neighbour, side='left')
+            counts = np.searchsorted(sorted_keys, neighbour, side='right') - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            i = np.repeat(points, counts)
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(lo, counts) + np.arange(total) - first]
+            d = haversine_km(lat[i], lon[i], lat[j], lon[j])
+            keep = (d <= radius_km) & (i != j)
+            pairs_i.append(i[keep])
+            pairs_j.append(j[keep])
+            pairs_d.append(d[keep])
+
+    if not pairs_i:
+        return empty, empty, np.empty(0)
+    return np.concatenate(pairs_i), np.concatenate(pairs_j), np.concatenate(pairs_d)
+
+
+class GridIndex:
+    """
+    Uniform grid hash over (lat, lon) points for radius and k-nearest queries.
+
+    Args:
+        lat, lon: Arrays of point coordinates
+        ids: Optional array of ids returned instead of positions (e.g. snapshot
+            row numbers when indexing a subset of stores)
+        cell_km: Grid cell size; by default chosen from the point density so an
+            average cell holds a few points
+        cell_divisor: Divides the default cell size, for indexes queried by
+            many more points than they hold (ignored with cell_km)
+    """
+
+    def __init__(self, lat, lon, ids=None, cell_km=None, cell_divisor=1):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.ids = np.arange(len(self.lat)) if ids is None else np.asarray(ids)
+        self.size = len(self.lat)
+
+        self.ref_cos = math.cos(math.radians(float(np.mean(self.lat)))) if self.size else 1.0
+        x, y = self._project(self.lat, self.lon)
+
+        if cell_km is None:
+            if self.size > 1:
+                area = max((x.max() - x.min()) * (y.max() - y.min()), 1.0)
+                cell_km = 0.5 * math.sqrt(area / self.size) / cell_divisor
+            else:
+                cell_km = 1.0
+        self.cell_km = float(min(max(cell_km, 0.25), 200.0))
+
+        self.x0 = float(x.min()) if self.size else 0.0
+        self.y0 = float(y.min()) if self.size else 0.0
+        cx, cy = self._cell(x, y)
+        self.nx = int(cx.max()) + 1 if self.size else 1
+        self.ny = int(cy.max()) + 1 if self.size else 1
+
+        # Sort points by cell key (column-major) so the cells of one grid column
+        # within any row range form a single contiguous slice
+        keys = cx.astype(np.int64) * self.ny + cy
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+    def _project(self, lat, lon):
+        lat = np.radians(np.asarray(lat, dtype=float))
+        lon = np.radians(np.asarray(lon, dtype=float))
+        return EARTH_RADIUS_KM * lon * self.ref_cos, EARTH_RADIUS_KM * lat
+
+    def _cell(self, x, y):
+        cx = np.floor((np.asarray(x) - self.x0) / self.cell_km).astype(np.int64)
+        cy = np.floor((np.asarray(y) - self.y0) / self.cell_km).astype(np.int64)
+        return cx, cy
+
+    def _gather(self, cx_min, cx_max, cy_min, cy_max):
+        """Positions of all points in the inclusive cell range (one slice per column)."""
+        cx_min, cy_min = max(cx_min, 0), max(cy_min, 0)
+        cx_max, cy_max = min(cx_max, self.nx - 1), min(cy_max, self.ny - 1)
+        if cx_min > cx_max or cy_min > cy_max:
+            return np.empty(0, dtype=np.int64)
+        columns = np.arange(cx_min, cx_max + 1, dtype=np.int64) * self.ny
+        lo = np.searchsorted(self.sorted_keys, columns + cy_min, side='left')
+        hi = np.searchsorted(self.sorted_keys, columns + cy_max, side='right')
+        slices = [self.order[a:b] for a, b in zip(lo, hi) if b > a]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices) if len(slices) > 1 else slices[0]
+
+    def query_radius(self, lat, lon, radius_km, limit=None):
+        """
+        Points within `radius_km` of (lat, lon), nearest first.
+
+        Returns (ids, distances_km).
+        """
+        if self.size == 0 or radius_km < 0:
+            return self.ids[:0], np.empty(0)
+        qx, qy = self._project(lat, lon)
+        reach = radius_km / _PROJECTION_SLACK
+        cx_min, cy_min = self._cell(qx - reach, qy - reach)
+        cx_max, cy_max = self._cell(qx + reach, qy + reach)
+        candidates = self._gather(int(cx_min), int(cx_max), int(cy_min), int(cy_max))
+
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = distances <= radius_km
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return self.ids[candidates[order]], distances[order]
+
+    def query_knn(self, lat, lon, k, max_radius_km=None):
+        """
+        The `k` nearest points to (lat, lon), optionally within `max_radius_km`.
+
+        Searches a square of cells around the query cell, doubling its size
+        until the k-th distance found is no larger than the distance to the
+        edge of the searched square. Returns (ids, distances_km).
+        """
+        if self.size == 0 or k <= 0:
+            return self.ids[:0], np.empty(0)
+        if max_radius_km is not None:
+            ids, distances = self.query_radius(lat, lon, max_radius_km)
+            return ids[:k], distances[:k]
+
+        qx, qy = self._project(lat, lon)
+        cx, cy = (int(v) for v in self._cell(qx, qy))
+        max_reach = max(abs(cx), abs(cy), abs(self.nx - 1 - cx), abs(self.ny - 1 - cy))
+
+        reach = 1
+        while True:
+            positions = self._gather(cx - reach, cx + reach, cy - reach, cy + reach)
+            covers_all = reach >= max_reach
+            if len(positions) >= k or covers_all:
+                distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+                order = np.argsort(distances, kind='stable')[:k]
+                if covers_all or len(order) == 0:
+                    return self.ids[positions[order]], distances[order]
+                # Planar distance from the query to the edge of the searched square
+                edge = min(
+                    qx - (self.x0 + (cx - reach) * self.cell_km),
+                    (self.x0 + (cx + reach + 1) * self.cell_km) - qx,
+                    qy - (self.y0 + (cy - reach) * self.cell_km),
+                    (self.y0 + (cy + reach + 1) * self.cell_km) - qy,
+                )
+                if distances[order[-1]] <= edge * _PROJECTION_SLACK:
+                    return self.ids[positions[order]], distances[order]
+            reach *= 2
+
+    def _square_pairs(self, cx, cy, reach):
+        """
+        Candidate (query, point position) pairs from the (2 * reach + 1)^2
+        cells around each query cell, expanded one grid column at a time (each
+        column's cells are one contiguous slice).
+        """
+        pairs_i, pairs_j = [], []
+        for dx in range(-reach, reach + 1):
+            x = cx + dx
+            lo = np.searchsorted(self.sorted_keys, x * self.ny + np.maximum(cy - reach, 0), side='left')
+            hi = np.searchsorted(self.sorted_keys, x * self.ny + np.minimum(cy + reach, self.ny - 1), side='right')
+            overlaps = (x >= 0) & (x < self.nx) & (cy + reach >= 0) & (cy - reach <= self.ny - 1)
+            counts = np.where(overlaps, np.maximum(hi - lo, 0), 0)
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            pairs_i.append(np.repeat(np.arange(len(cx)), counts))
+            pairs_j.append(self.order[np.repeat(lo, counts) + np.arange(total) - first])
+        if not pairs_i:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+    def _knn_square(self, lat, lon, cx, cy, reach, k):
+        """
+        k nearest points among the (2 * reach + 1)^2 cells around each query cell.
+
+        Candidates come from _square_pairs and are ranked per query with one
+        sort. Returns (positions, distances_km) shaped (n_queries, k).
+        """
+        n = len(lat)
+        i, j = self._square_pairs(cx, cy, reach)
+
+        positions = np.full((n, k), -1, dtype=np.int64)
+        distances = np.full((n, k), np.inf)
+        if len(i) == 0:
+            return positions, distances
+        d = haversine_km(lat[i], lon[i], self.lat[j], self.lon[j])
+        # Rank by (query, distance) with one float sort; distances are far below `span`
+        span = float(d.max()) + 1.0
+        ranked = np.argsort(i * span + d, kind='stable')
+        i, j, d = i[ranked], j[ranked], d[ranked]
+        rank = np.arange(len(i)) - np.searchsorted(i, i, side='left')
+        top = rank < k
+        positions[i[top], rank[top]] = j[top]
+        distances[i[top], rank[top]] = d[top]
+        return positions, distances
+
+    def query_knn_many(self, lat, lon, k=1, max_reach=16, block_size=4096):
+        """
+        The `k` nearest points to each of many query points.
+
+        Queries are answered in passes over squares of cells around their own
+        cell, the square doubling for the queries whose k-th distance is not
+        yet certified by the distance to the square's edge (as in query_knn).
+        Queries still open past `max_reach` cells (far from every point) fall
+        back to an exact blocked scan of the indexed points. Returns (ids,
+        distances_km) shaped (n_queries, k), nearest first; missing
+        neighbours are -1 / inf.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        positions = np.full((len(lat), k), -1, dtype=np.int64)
+        distances = np.full((len(lat), k), np.inf)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        if self.size == 0 or k <= 0 or not valid.any():
+            return positions, distances
+
+        qx, qy = self._project(lat, lon)
+        cx, cy = self._cell(np.where(valid, qx, self.x0), np.where(valid, qy, self.y0))
+        pending = np.flatnonzero(valid)
+        reach = 1
+        while len(pending) and reach <= max_reach:
+            still_open = []
+            for start in range(0, len(pending), block_size):
+                q = pending[start:start + block_size]
+                p, d = self._knn_square(lat[q], lon[q], cx[q], cy[q], reach, k)
+                positions[q], distances[q] = p, d
+                # Planar distance from each query to the edge of the searched square
+                edge = np.minimum.reduce([
+                    qx[q] - (self.x0 + (cx[q] - reach) * self.cell_km),
+                    (self.x0 + (cx[q] + reach + 1) * self.cell_km) - qx[q],
+                    qy[q] - (self.y0 + (cy[q] - reach) * self.cell_km),
+                    (self.y0 + (cy[q] + reach + 1) * self.cell_km) - qy[q],
+                ])
+                covers_all = (
+                    (cx[q] - reach <= 0) & (cx[q] + reach >= self.nx - 1)
+                    & (cy[q] - reach <= 0) & (cy[q] + reach >= self.ny - 1)
+                )
+                still_open.append(q[~(covers_all | (d[:, k - 1] <= edge * _PROJECTION_SLACK))])
+            pending = np.concatenate(still_open)
+            reach *= 2
+
+        if len(pending):
+            positions[pending], distances[pending] = nearest_targets(
+                lat[pending], lon[pending], self.lat, self.lon, k=k
+            )
+        ids = np.where(positions >= 0, self.ids[np.maximum(positions, 0)], -1)
+        return ids, distances
+
+    def query_radius_many(self, lat, lon, radius_km, block_size=4096):
+        """
+        All (query, point) pairs within `radius_km`, for many query points.
+
+        Each query's candidates are the points in the square of cells
+        spanning its radius (see _square_pairs), measured with haversine a
+        block of queries at a time. Returns (query positions, ids,
+        distances_km); NaN queries have no pairs.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        empty = np.empty(0, dtype=np.int64)
+        if self.size == 0 or radius_km < 0 or len(valid) == 0:
+            return empty, self.ids[:0], np.empty(0)
+
+        qx, qy = self._project(lat[valid], lon[valid])
+        cx, cy = self._cell(qx, qy)
+        reach = int(math.ceil(radius_km / _PROJECTION_SLACK / self.cell_km))
+        pairs_i, pairs_j, pairs_d = [], [], []
+        for start in range(0, len(valid), block_size):
+            q = valid[start:start + block_size]
+            bx, by = cx[start:start + block_size], cy[start:start + block_size]
+            # A square reaching every grid cell from each query already sees all points
+            span = int(max(
+                np.abs(bx).max(), np.abs(bx - self.nx + 1).max(), np.abs(by).max(), np.abs(by - self.ny + 1).max()
+            ))
+            i, j = self._square_pairs(bx, by, min(reach, span))
+            i = q[i]
+            d = haversine_km(lat[i], lon[i], self.lat[j], self.lon[j])
+            keep = d <= radius_km
+            pairs_i.append(i[keep])
+            pairs_j.append(j[keep])
+            pairs_d.append(d[keep])
+        j = np.concatenate(pairs_j)
+        return np.concatenate(pairs_i), self.ids[j], np.concatenate(pairs_d)
+
+
+# Upper bound on points x edges evaluated at once by PolygonIndex
+_PIP_BLOCK = 4_000_000
+
+
+def _points_in_rings(px, py, edges):
+    """
+    Even-odd ray casting of points against all rings of one (multi)polygon.
+
+    edges is an (E, 4) array of ring segments (x1, y1, x2, y2); holes and
+    multiple parts are handled by the even-odd rule. Returns a boolean mask.
+    """
+    x1, y1, x2, y2 = (edges[:, i] for i in range(4))
+    inside = np.zeros(len(px), dtype=bool)
+    block = max(1, _PIP_BLOCK // max(len(edges), 1))
+    for start in range(0, len(px), block):
+        bx = px[start:start + block, None]
+        by = py[start:start + block, None]
+        straddles = (y1 > by) != (y2 > by)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cross_x = x1 + (by - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(straddles & (bx < cross_x), axis=1)
+        inside[start:start + block] = crossings % 2 == 1
+    return inside
+
+
+class PolygonIndex:
+    """
+    Point-in-polygon lookup over Polygon / MultiPolygon GeoJSON features.
+
+    Each feature's bounding box prefilters the points; only those are ray cast
+    against the feature's ring segments, as numpy arrays.
+    """
+
+    def __init__(self, features):
+        self.edges = []
+        bboxes = []
+        self.positions = []  # feature position in the input list
+        for position, feature in enumerate(features):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            segments = []
+            for polygon in polygons:
+                for ring in polygon:
+                    coords = np.asarray(ring, dtype=float)[:, :2]
+                    if len(coords) < 3:
+                        continue
+                    if not np.array_equal(coords[0], coords[-1]):
+                        coords = np.vstack([coords, coords[:1]])
+                    segments.append(np.hstack([coords[:-1], coords[1:]]))
+            if not segments:
+                continue
+            edges = np.vstack(segments)
+            self.edges.append(edges)
+            self.positions.append(position)
+            bboxes.append((
+                min(edges[:, 0].min(), edges[:, 2].min()), min(edges[:, 1].min(), edges[:, 3].min()),
+                max(edges[:, 0].max(), edges[:, 2].max()), max(edges[:, 1].max(), edges[:, 3].max()),
+            ))
+        self.bboxes = np.array(bboxes, dtype=float).reshape(-1, 4)
+
+    def locate(self, lat, lon):
+        """Position of the feature containing each point, or -1 when outside all of them."""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        result = np.full(len(lat), -1, dtype=np.int64)
+        for (min_lon, min_lat, max_lon, max_lat), edges, position in zip(self.bboxes, self.edges, self.positions):
+            candidates = np.flatnonzero(
+                (result < 0) & (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+            )
+            if len(candidates) == 0:
+                continue
+            inside = _points_in_rings(lon[candidates], lat[candidates], edges)
+            result[candidates[inside]] = position
+        return result
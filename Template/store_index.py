@@ -0,0 +1,90 @@
+"""
+Precomputed lookup indexes over the store snapshot for server-side filtering.
+
+StoreIndex keeps, for each filterable attribute (brand_key, category, sector,
+state, district), a posting list of row positions per normalized value. A query
+intersects the posting lists of the requested values and only then applies the
+bounding-box test, so a single-brand request touches only that brand's rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# query parameter -> column of the combined store dataframe
+FILTER_COLUMNS = {
+    'brand_key': 'brand_key',
+    'category': 'category',
+    'sector': 'sector',
+    'state': 'State',
+    'district': 'District',
+}
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def normalize_value(value):
+    """Normalize a filter value / column cell for case-insensitive matching."""
+    return str(value).strip().lower()
+
+
+class StoreIndex:
+    """Posting-list index over the rows of the combined store dataframe."""
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.lon = df['longitude'].to_numpy(dtype=float)
+        self.lat = df['latitude'].to_numpy(dtype=float)
+        self.postings = {}
+        for param, column in FILTER_COLUMNS.items():
+            values = df[column] if column in df.columns else pd.Series('', index=df.index)
+            keys = values.fillna('').map(normalize_value).to_numpy()
+            codes, uniques = pd.factorize(keys)
+            # Group row positions by value code with one stable sort
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.postings[param] = {
+                key: order[bounds[i]:bounds[i + 1]]
+                for i, key in enumerate(uniques)
+            }
+
+    def values(self, param):
+        """Sorted list of the distinct normalized values for a filter parameter."""
+        return sorted(self.postings[param])
+
+    def select(self, filters=None, bbox=None):
+        """
+        Return sorted row positions matching every filter and the bounding box.
+
+        Args:
+            filters: dict of parameter -> list of accepted values (OR within a
+                parameter, AND across parameters)
+            bbox: optional (min_lon, min_lat, max_lon, max_lat)
+        """
+        rows = None
+        for param, values in (filters or {}).items():
+            postings = self.postings[param]
+            lists = [postings.get(normalize_value(v), _EMPTY) for v in values]
+            matched = lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if len(rows) == 0:
+                return _EMPTY
+
+        if rows is None:
+            rows = np.arange(self.size)
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            lon, lat = self.lon[rows], self.lat[rows]
+            rows = rows[(lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)]
+        return rows
+
+
+def parse_bbox(text):
+    """Parse 'min_lon,min_lat,max_lon,max_lat' into a tuple of floats."""
+    parts = [p.strip() for p in str(text).split(',')]
+    if len(parts) != 4:
+        raise ValueError("bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    min_lon, min_lat, max_lon, max_lat = (float(p) for p in parts)
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
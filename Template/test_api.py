@@ -27,3 +27,125 @@ with app.test_client() as client:
     print('Categories count:', len(data2) if isinstance(data2, list) else 'N/A')
     if isinstance(data2, list) and len(data2) > 0:
         print('First category:', data2[0])
+
+    print('\n=== /api/cache-stats ===')
+    client.get('/api/stats')
+    r3 = client.get('/api/cache-stats')
+    data3 = r3.get_json()
+    print('Status:', r3.status_code)
+    print('Store snapshot:', data3.get('store_snapshot'))
+
+    print('\n=== /api/data?brand_key=mrdiy&fields=store_name&limit=5 ===')
+    r4 = client.get('/api/data?brand_key=mrdiy&fields=store_name&limit=5')
+    data4 = r4.get_json()
+    print('Status:', r4.status_code)
+    print('Total:', data4.get('total'), 'Next cursor:', data4.get('next_cursor'))
+    print('Features count:', len(data4.get('features', [])))
+
+    print('\n=== /api/clusters?z=6 ===')
+    r5 = client.get('/api/clusters?z=6')
+    data5 = r5.get_json()
+    print('Status:', r5.status_code)
+    print('Features count:', len(data5.get('features', [])))
+    print('Stores covered:', sum(f['properties'].get('point_count', 1) for f in data5.get('features', [])))
+
+    print('\n=== /tiles/stores/6/50/31.pbf ===')
+    r6 = client.get('/tiles/stores/6/50/31.pbf')
+    print('Status:', r6.status_code, 'Content-Type:', r6.content_type, 'Bytes:', len(r6.data))
+    r6g = client.get('/tiles/stores/6/50/31.pbf', headers={'Accept-Encoding': 'gzip'})
+    print('Gzip Bytes:', len(r6g.data), 'Distinct ETags:', r6g.headers.get('ETag') != r6.headers.get('ETag'))
+
+    print('\n=== /api/districts?zoom=5 ===')
+    r7 = client.get('/api/districts?zoom=5')
+    data7 = r7.get_json()
+    print('Status:', r7.status_code, 'Bytes:', len(r7.data))
+    print('Simplification:', data7.get('simplification'), 'Features count:', len(data7.get('features', [])))
+
+    print('\n=== /api/district-mapping ===')
+    r8 = client.get('/api/district-mapping')
+    data8 = r8.get_json()
+    print('Status:', r8.status_code)
+    print('Matched:', len(data8.get('matched', [])), 'Unmatched:', data8.get('unmatched'))
+
+    print('\n=== /api/dc-assignment?brand_key=speedmart ===')
+    r9 = client.get('/api/dc-assignment?brand_key=speedmart')
+    data9 = r9.get_json()
+    print('Status:', r9.status_code)
+    print('DCs:', len(data9.get('distribution_centers', [])), 'Stores assigned:', len(data9.get('assignments', [])))
+
+    print('\n=== /api/dc ===')
+    r10 = client.get('/api/dc')
+    data10 = r10.get_json()
+    print('Status:', r10.status_code)
+    print('Brands:', {b['brand_key']: b['count'] for b in data10})
+    r10 = client.get('/api/dc/mrdiy')
+    print('/api/dc/mrdiy Status:', r10.status_code, 'Features count:', len(r10.get_json().get('features', [])))
+    r10b = client.get('/api/dc/mrdiy', headers={'If-None-Match': r10.headers.get('ETag')})
+    print('Revalidation Status:', r10b.status_code)
+    r10g = client.get('/api/dc/mrdiy', headers={'Accept-Encoding': 'gzip'})
+    r10c = client.get('/api/dc/mrdiy', headers={'If-None-Match': r10g.headers.get('ETag')})
+    print('Identity request with the gzip ETag:', r10c.status_code)
+
+    print('\n=== /api/cube?group_by=brand_key&group_by=state,district ===')
+    r11 = client.get('/api/cube?group_by=brand_key&group_by=state,district&category=Gold Shops')
+    data11 = r11.get_json()
+    print('Status:', r11.status_code, 'Total:', data11.get('total'))
+    print('Cells per roll-up:', [len(r['cells']) for r in data11.get('rollups', [])])
+
+    print('\n=== /api/concentration ===')
+    r12 = client.get('/api/concentration?top_k=3')
+    data12 = r12.get_json()
+    print('Status:', r12.status_code, 'Units:', data12.get('units'))
+    for row in data12.get('category', {}).get('state', [])[:3]:
+        print(' ', row['category'], 'gini', row['gini'], 'hhi', row['hhi'], 'top3', row['top_k_share'])
+
+    print('\n=== /api/whitespace?brand_key=mrdiy ===')
+    r13 = client.get('/api/whitespace?brand_key=mrdiy&threshold=50')
+    data13 = r13.get_json()
+    print('Status:', r13.status_code, 'Stores:', data13.get('total_stores'))
+    print('Districts with density:', len(data13.get('density', [])), 'Underserved:', len(data13.get('whitespace', [])))
+
+    print('\n=== /api/dc-analytics?brand_key=speedmart,mrdiy ===')
+    r14 = client.get('/api/dc-analytics?brand_key=speedmart,mrdiy&bands=10,25,50,100')
+    data14 = r14.get_json()
+    print('Status:', r14.status_code, 'Bands:', data14.get('band_labels'))
+    for brand_key, network in data14.get('brands', {}).items():
+        print(' ', brand_key, 'DCs', network['dc_count'], 'reach', network['reach_km'], 'histogram', network['histogram'])
+
+    print('\n=== /api/accessibility?beyond_km=10,25 ===')
+    r15 = client.get('/api/accessibility?brand_key=speedmart,mrdiy&beyond_km=10,25&deserts=3')
+    data15 = r15.get_json()
+    print('Status:', r15.status_code, 'Population (k):', data15.get('population_k'), 'Samples:', data15.get('samples'))
+    for brand_key, brand in data15.get('brands', {}).items():
+        print(' ', brand_key, 'mean km', brand['weighted_mean_km'], 'beyond', brand['population_beyond_k'],
+              'deserts', [d['district'] for d in brand['deserts']])
+
+    print('\n=== /api/coverage?brand_key=mrdiy&radii=5,10,25 ===')
+    r16 = client.get('/api/coverage?brand_key=mrdiy&radii=5,10,25')
+    data16 = r16.get_json()
+    print('Status:', r16.status_code)
+    selangor = data16.get('brands', {}).get('mrdiy', {}).get('states', {}).get('SGR', {})
+    r16b = client.get('/api/accessibility?brand_key=mrdiy')
+    states15 = {k: v['key'] for k, v in r16b.get_json()['brands']['mrdiy']['states'].items()}
+    states16 = {k: v['key'] for k, v in data16.get('brands', {}).get('mrdiy', {}).get('states', {}).items()}
+    print('State keys match /api/accessibility:', states15 == states16)
+    print('Selangor covered share:', {r: v['covered_share'] for r, v in selangor.get('radii', {}).items()})
+
+    print('\n=== /api/hexbins?res=6 ===')
+    r17 = client.get('/api/hexbins?res=6')
+    data17 = r17.get_json()
+    print('Status:', r17.status_code, 'Total:', data17.get('total'), 'Cells:', len(data17.get('features', [])))
+
+    print('\n=== /api/competition?category=convenience stores ===')
+    r18 = client.get('/api/competition?category=Convenience Stores&radii=0.5,1,3')
+    data18 = r18.get_json()
+    print('Status:', r18.status_code)
+    for brand_key, brand in data18.get('brands', {}).items():
+        print(' ', brand_key, 'stores', brand['store_count'], 'mean within 1km', brand['radii']['1']['mean'])
+
+    print('\n=== /api/proximity?category=gold shops ===')
+    r19 = client.get('/api/proximity?category=Gold Shops&thresholds=1,3')
+    data19 = r19.get_json()
+    print('Status:', r19.status_code, 'Brands:', data19.get('brands'))
+    for brand_key, row in zip(data19.get('brands', []), data19.get('median_km', [])):
+        print(' ', brand_key, 'median km to nearest', row)
@@ -0,0 +1,210 @@
+"""
+Topology-preserving simplification of polygon layers (e.g. district boundaries).
+
+Rings are split into arcs at junctions - vertices where neighbouring polygons
+stop sharing a border - and each distinct arc is stored once, as in TopoJSON.
+Simplifying arcs (Douglas-Peucker) instead of rings means a border shared by two
+districts is simplified identically on both sides, so no gaps or overlaps open
+up between neighbours. Coordinates are then quantized to a decimal grid
+matched to the tolerance.
+"""
+
+import math
+
+import numpy as np
+
+
+def _point_segment_distance(points, start, end):
+    """Distance from each point to the segment start-end."""
+    segment = end - start
+    length_sq = float(segment @ segment)
+    if length_sq == 0:
+        return np.hypot(*(points - start).T)
+    t = np.clip(((points - start) @ segment) / length_sq, 0.0, 1.0)
+    projection = start + t[:, None] * segment
+    return np.hypot(*(points - projection).T)
+
+
+def _douglas_peucker(points, tolerance):
+    """Boolean mask of the vertices kept by Douglas-Peucker (endpoints always kept)."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _point_segment_distance(points[first + 1:last], points[first], points[last])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            index += first + 1
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+def quantization_decimals(tolerance):
+    """Decimal places for a quantization grid of about a quarter of `tolerance`."""
+    return max(0, int(math.ceil(-math.log10(tolerance / 4))))
+
+
+class TopologySimplifier:
+    """
+    Arc topology over the Polygon / MultiPolygon features of a GeoJSON layer.
+
+    Build once per source version; simplify(tolerance) then produces a
+    simplified copy of the features for any tolerance (in degrees).
+    """
+
+    def __init__(self, features):
+        self.features = features
+        rings = []  # (feature index, polygon index, ring index, Nx2 array without closing point)
+        for fi, feature in enumerate(features):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            for pi, polygon in enumerate(polygons):
+                for ri, ring in enumerate(polygon):
+                    coords = np.asarray(ring, dtype=float)[:, :2]
+                    if len(coords) > 1 and np.array_equal(coords[0], coords[-1]):
+                        coords = coords[:-1]
+                    if len(coords) >= 3:
+                        rings.append((fi, pi, ri, coords))
+
+        junctions = self._find_junctions([r[3] for r in rings])
+
+        self.arcs = []
+        arc_ids = {}
+        self.rings = []  # (fi, pi, ri, [signed arc refs]); ~ref means the arc reversed
+        for fi, pi, ri, coords in rings:
+            refs = []
+            for arc in self._split_ring(coords, junctions):
+                forward = tuple(map(tuple, arc))
+                backward = forward[::-1]
+                if forward in arc_ids:
+                    refs.append(arc_ids[forward])
+                elif backward in arc_ids:
+                    refs.append(~arc_ids[backward])
+                else:
+                    arc_ids[forward] = len(self.arcs)
+                    refs.append(len(self.arcs))
+                    self.arcs.append(arc)
+            self.rings.append((fi, pi, ri, refs))
+
+    @staticmethod
+    def _find_junctions(rings):
+        """Vertices whose neighbours differ between the rings that share them."""
+        neighbours = {}
+        junctions = set()
+        for coords in rings:
+            prev = np.roll(coords, 1, axis=0)
+            following = np.roll(coords, -1, axis=0)
+            for point, a, b in zip(map(tuple, coords), map(tuple, prev), map(tuple, following)):
+                pair = (a, b) if a <= b else (b, a)
+                seen = neighbours.setdefault(point, pair)
+                if seen != pair:
+                    junctions.add(point)
+        return junctions
+
+    @staticmethod
+    def _split_ring(coords, junctions):
+        """Cut a ring into arcs at its junctions; each arc includes both endpoints."""
+        points = list(map(tuple, coords))
+        cuts = [i for i, p in enumerate(points) if p in junctions]
+        if not cuts:
+            # Closed arc: start at the smallest vertex so identical rings match
+            start = min(range(len(points)), key=points.__getitem__)
+            rotated = np.roll(coords, -start, axis=0)
+            return [np.vstack([rotated, rotated[:1]])]
+        rotated = np.roll(coords, -cuts[0], axis=0)
+        closed = np.vstack([rotated, rotated[:1]])
+        offsets = [c - cuts[0] for c in cuts] + [len(points)]
+        return [closed[a:b + 1] for a, b in zip(offsets, offsets[1:])]
+
+    def _simplify_arc(self, arc, tolerance):
+        keep = _douglas_peucker(arc, tolerance)
+        if np.array_equal(arc[0], arc[-1]) and keep.sum() < 4 and len(arc) >= 4:
+            # Keep closed arcs (islands, enclaves) at least triangular
+            far = int(np.argmax(np.hypot(*(arc - arc[0]).T)))
+            keep[far] = True
+            rest = _point_segment_distance(arc, arc[0], arc[far])
+            rest[[0, far, len(arc) - 1]] = -1
+            keep[int(np.argmax(rest))] = True
+        return arc[keep]
+
+    def simplify(self, tolerance):
+        """
+        Return simplified, quantized copies of the features.
+
+        Polygons that collapse below the tolerance are dropped, except that every
+        feature keeps at least its largest polygon.
+        """
+        decimals = quantization_decimals(tolerance)
+        arcs = [np.round(self._simplify_arc(arc, tolerance), decimals) for arc in self.arcs]
+
+        polygons = {}  # (fi, pi) -> list of rings
+        for fi, pi, ri, refs in self.rings:
+            parts = [arcs[r] if r >= 0 else arcs[~r][::-1] for r in refs]
+            ring = np.vstack([parts[0]] + [p[1:] for p in parts[1:]])
+            keep = np.any(ring != np.roll(ring, 1, axis=0), axis=1)
+            ring = ring[keep]
+            if len(ring) < 3 and ri > 0:
+                continue
+            polygons.setdefault((fi, pi), []).append((ri, ring))
+
+        by_feature = {}
+        for (fi, pi), rings in sorted(polygons.items()):
+            rings.sort(key=lambda r: r[0])
+            if rings[0][0] != 0:
+                continue
+            exterior = rings[0][1]
+            extent = np.ptp(self._original_exterior(fi, pi), axis=0).max()
+            by_feature.setdefault(fi, []).append((len(exterior) >= 3 and extent >= tolerance, extent, pi, rings))
+
+        simplified = []
+        for fi, feature in enumerate(self.features):
+            candidates = by_feature.get(fi)
+            if not candidates:
+                simplified.append(feature)
+                continue
+            kept = [c for c in candidates if c[0]]
+            if not kept:
+                largest = max(candidates, key=lambda c: c[1])
+                kept = [(True, largest[1], largest[2], self._original_rings(fi, largest[2], decimals))]
+            coordinates = [
+                [_close(ring).tolist() for _, ring in rings if len(ring) >= 3]
+                for _, _, _, rings in sorted(kept, key=lambda c: c[2])
+            ]
+            simplified.append({
+                **feature,
+                'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates}
+                if len(coordinates) > 1 or feature['geometry']['type'] == 'MultiPolygon'
+                else {'type': 'Polygon', 'coordinates': coordinates[0]},
+            })
+        return simplified
+
+    def _polygon_coordinates(self, fi, pi):
+        geometry = self.features[fi]['geometry']
+        return geometry['coordinates'][pi] if geometry['type'] == 'MultiPolygon' else geometry['coordinates']
+
+    def _original_exterior(self, fi, pi):
+        return np.asarray(self._polygon_coordinates(fi, pi)[0], dtype=float)[:, :2]
+
+    def _original_rings(self, fi, pi, decimals):
+        rings = []
+        for ri, ring in enumerate(self._polygon_coordinates(fi, pi)):
+            coords = np.round(np.asarray(ring, dtype=float)[:, :2], decimals)
+            if np.array_equal(coords[0], coords[-1]):
+                coords = coords[:-1]
+            rings.append((ri, coords))
+        return rings
+
+
+def _close(ring):
+    """Repeat the first vertex at the end, as GeoJSON rings require."""
+    return np.vstack([ring, ring[:1]])
@@ -15,8 +15,11 @@ import pandas as pd
 import os
 import sys
 
+from coordinates import parse_coordinates
+
 # Add parent directory to path to import from app.py if needed
 # For standalone script, we'll replicate the necessary functions
+# (coordinate parsing is shared via coordinates.py)
 
 # Valid Malaysian States (15 total)
 VALID_STATES = {
@@ -50,23 +53,6 @@ TARGET_CATEGORIES = [
 ]
 
 
-def _parse_coordinates(value):
-    """Parse a 'lat, lon' or 'lat, \\nlon' string into (lat, lon) floats."""
-    if pd.isna(value):
-        return pd.NA, pd.NA
-    try:
-        value_str = str(value).replace("\\n", " ").replace("\n", " ").strip()
-        parts = value_str.split(",")
-        if len(parts) >= 2:
-            lat = float(str(parts[0]).strip())
-            lon = float(str(parts[1]).strip())
-            if 0 <= lat <= 10 and 95 <= lon <= 125:
-                return lat, lon
-    except Exception:
-        pass
-    return pd.NA, pd.NA
-
-
 def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
     """
     Generic loader for brand Excel files.
@@ -108,9 +94,7 @@ def _load_brand_file(filename, brand_key, brand_name, has_type_column=False):
         coord_column = "position " if "position " in df.columns else "position"
     
     if coord_column:
-        coords = df[coord_column].apply(_parse_coordinates)
-        df["latitude"] = coords.apply(lambda x: x[0])
-        df["longitude"] = coords.apply(lambda x: x[1])
+        df["latitude"], df["longitude"], _ = parse_coordinates(df[coord_column])
     else:
         df["latitude"] = pd.NA
         df["longitude"] = pd.NA
@@ -0,0 +1,306 @@
+"""
+Mapbox Vector Tile (MVT v2) generation without an external tile server.
+
+Layer sources keep their geometry pre-projected to Web Mercator unit
+coordinates; tile(z, x, y) selects what intersects the tile (plus a small
+buffer), quantizes to the 4096-unit tile grid, clips polygons to the buffered
+tile square and returns features ready for encode_tile(). The protobuf wire
+format is written by hand - the schema only needs varints, length-delimited
+fields and doubles.
+"""
+
+import math
+import struct
+
+import numpy as np
+
+from clustering import mercator
+
+EXTENT = 4096
+BUFFER = 64
+
+_GEOM_POINT = 1
+_GEOM_POLYGON = 3
+
+_CMD_MOVE_TO = 1
+_CMD_LINE_TO = 2
+_CMD_CLOSE_PATH = 7
+
+
+def tile_bounds(z, x, y):
+    """Mercator unit-square bounds (x0, y0, x1, y1) of tile z/x/y, including the buffer."""
+    scale = 2 ** z
+    pad = BUFFER / EXTENT
+    return (x - pad) / scale, (y - pad) / scale, (x + 1 + pad) / scale, (y + 1 + pad) / scale
+
+
+def tile_range(z, bounds):
+    """Inclusive (x_min, x_max, y_min, y_max) tile indices covering mercator bounds at zoom z."""
+    n = 2 ** z
+    x0, y0, x1, y1 = bounds
+    clamp = lambda v: min(max(int(math.floor(v * n)), 0), n - 1)
+    return clamp(x0), clamp(x1), clamp(y0), clamp(y1)
+
+
+class PointLayerSource:
+    """
+    Point features (e.g. stores) for one tile layer.
+
+    Args:
+        lat, lon: Point coordinates
+        ids: Feature ids (non-negative integers)
+        attributes: dict of attribute name -> array of values per point
+    """
+
+    def __init__(self, lat, lon, ids, attributes):
+        self.x, self.y = mercator(lat, lon)
+        valid = ~(np.isnan(self.x) | np.isnan(self.y))
+        self.x, self.y = self.x[valid], self.y[valid]
+        self.ids = np.asarray(ids)[valid]
+        self.attributes = {name: np.asarray(values, dtype=object)[valid] for name, values in attributes.items()}
+
+    @property
+    def bounds(self):
+        if len(self.x) == 0:
+            return None
+        return float(self.x.min()), float(self.y.min()), float(self.x.max()), float(self.y.max())
+
+    def tile(self, z, x, y):
+        """Features of tile z/x/y as (id, properties, geom_type, geometry) tuples."""
+        x0, y0, x1, y1 = tile_bounds(z, x, y)
+        selected = np.flatnonzero((self.x >= x0) & (self.x <= x1) & (self.y >= y0) & (self.y <= y1))
+        scale = 2 ** z * EXTENT
+        px = np.round(self.x[selected] * scale - x * EXTENT).astype(np.int64)
+        py = np.round(self.y[selected] * scale - y * EXTENT).astype(np.int64)
+        return [
+            (
+                int(self.ids[i]),
+                {name: values[i] for name, values in self.attributes.items()},
+                _GEOM_POINT,
+                [_command(_CMD_MOVE_TO, 1), _zigzag(int(px[j])), _zigzag(int(py[j]))],
+            )
+            for j, i in enumerate(selected)
+        ]
+
+
+class PolygonLayerSource:
+    """
+    Polygon / MultiPolygon features (e.g. districts) for one tile layer.
+
+    Args:
+        features: GeoJSON features
+        properties: Property names copied into the tile (missing / None skipped)
+    """
+
+    def __init__(self, features, properties):
+        self.features = []
+        for fid, feature in enumerate(features):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            projected = []
+            for polygon in polygons:
+                rings = []
+                for ring in polygon:
+                    coords = np.asarray(ring, dtype=float)[:, :2]
+                    if len(coords) > 1 and np.array_equal(coords[0], coords[-1]):
+                        coords = coords[:-1]
+                    mx, my = mercator(coords[:, 1], coords[:, 0])
+                    rings.append(np.column_stack([mx, my]))
+                if rings and len(rings[0]) >= 3:
+                    projected.append(rings)
+            if not projected:
+                continue
+            exteriors = np.concatenate([p[0] for p in projected])
+            props = feature.get('properties') or {}
+            self.features.append((
+                fid,
+                {name: props[name] for name in properties if props.get(name) is not None},
+                projected,
+                (*exteriors.min(axis=0), *exteriors.max(axis=0)),
+            ))
+
+    @property
+    def bounds(self):
+        if not self.features:
+            return None
+        boxes = np.array([f[3] for f in self.features])
+        return float(boxes[:, 0].min()), float(boxes[:, 1].min()), float(boxes[:, 2].max()), float(boxes[:, 3].max())
+
+    def tile(self, z, x, y):
+        """Features of tile z/x/y as (id, properties, geom_type, geometry) tuples."""
+        x0, y0, x1, y1 = tile_bounds(z, x, y)
+        scale = 2 ** z * EXTENT
+        origin = np.array([x * EXTENT, y * EXTENT], dtype=float)
+        low, high = -BUFFER, EXTENT + BUFFER
+
+        results = []
+        for fid, props, polygons, (bx0, by0, bx1, by1) in self.features:
+            if bx1 < x0 or bx0 > x1 or by1 < y0 or by0 > y1:
+                continue
+            encoded = []
+            for rings in polygons:
+                kept = []
+                for ring_index, ring in enumerate(rings):
+                    points = _dedupe(np.round(ring * scale - origin))
+                    points = _dedupe(np.round(_clip_ring(points, low, high)))
+                    if len(points) < 3:
+                        if ring_index == 0:
+                            break  # exterior vanished: skip the holes too
+                        continue
+                    area = _signed_area(points)
+                    if area == 0:
+                        if ring_index == 0:
+                            break
+                        continue
+                    # MVT exteriors have positive area in tile coordinates (y down)
+                    if (area > 0) != (ring_index == 0):
+                        points = points[::-1]
+                    kept.append(points.astype(np.int64))
+                encoded.extend(kept)
+            if encoded:
+                results.append((fid, props, _GEOM_POLYGON, _encode_rings(encoded)))
+        return results
+
+
+def _dedupe(points):
+    """Drop consecutive duplicate vertices (including the closing wrap-around)."""
+    if len(points) < 2:
+        return points
+    keep = np.any(points != np.roll(points, 1, axis=0), axis=1)
+    return points[keep]
+
+
+def _clip_ring(points, low, high):
+    """Sutherland-Hodgman clip of a closed ring to the square [low, high]^2."""
+    for axis, bound, keep_below in ((0, low, False), (0, high, True), (1, low, False), (1, high, True)):
+        if len(points) == 0:
+            break
+        points = _clip_edge(points, axis, bound, keep_below)
+    return points
+
+
+def _clip_edge(points, axis, bound, keep_below):
+    values = points[:, axis]
+    inside = values <= bound if keep_below else values >= bound
+    if inside.all():
+        return points
+    prev = np.roll(points, 1, axis=0)
+    crosses = inside != np.roll(inside, 1)
+    delta = values - prev[:, axis]
+    t = np.divide(bound - prev[:, axis], delta, out=np.zeros_like(delta), where=delta != 0)
+    intersections = prev + t[:, None] * (points - prev)
+    # For every edge (prev -> point): the crossing (if any), then the point (if inside)
+    candidates = np.stack([intersections, points], axis=1)
+    mask = np.column_stack([crosses, inside])
+    return candidates[mask]
+
+
+def _signed_area(points):
+    x, y = points[:, 0], points[:, 1]
+    return float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)) / 2
+
+
+def _encode_rings(rings):
+    """Geometry commands for a feature's rings (each exterior followed by its holes)."""
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for ring in rings:
+        deltas = np.diff(np.vstack([cursor, ring]), axis=0)
+        cursor = ring[-1]
+        zigzag = ((deltas << 1) ^ (deltas >> 63)).tolist()
+        commands.append(_command(_CMD_MOVE_TO, 1))
+        commands.extend(zigzag[0])
+        commands.append(_command(_CMD_LINE_TO, len(ring) - 1))
+        for pair in zigzag[1:]:
+            commands.extend(pair)
+        commands.append(_command(_CMD_CLOSE_PATH, 1))
+    return commands
+
+
+def _command(command_id, count):
+    return (command_id & 0x7) | (count << 3)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+# --- protobuf encoding -------------------------------------------------------
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _key(field, wire_type):
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field, payload):
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed(field, values):
+    return _length_delimited(field, b''.join(_varint(v) for v in values))
+
+
+def _encode_value(value):
+    """Encode a tile attribute value message."""
+    if isinstance(value, (bool, np.bool_)):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, (int, np.integer)) and value >= 0:
+        return _key(5, 0) + _varint(int(value))
+    if isinstance(value, (int, np.integer)):
+        return _key(6, 0) + _varint(_zigzag(int(value)))
+    if isinstance(value, (float, np.floating)):
+        return _key(3, 1) + struct.pack('<d', float(value))
+    return _length_delimited(1, str(value).encode('utf-8'))
+
+
+def encode_layer(name, features):
+    """Encode one layer from (id, properties, geom_type, geometry) tuples; b'' if empty."""
+    if not features:
+        return b''
+    keys, values = {}, {}
+    body = bytearray()
+    body += _key(15, 0) + _varint(2)
+    body += _length_delimited(1, name.encode('utf-8'))
+    for fid, props, geom_type, geometry in features:
+        tags = []
+        for k, v in props.items():
+            if v is None or (isinstance(v, float) and math.isnan(v)):
+                continue
+            value_key = (type(v).__name__, v)
+            tags.append(keys.setdefault(k, len(keys)))
+            tags.append(values.setdefault(value_key, len(values)))
+        feature = _key(1, 0) + _varint(fid)
+        if tags:
+            feature += _packed(2, tags)
+        feature += _key(3, 0) + _varint(geom_type)
+        feature += _packed(4, geometry)
+        body += _length_delimited(2, feature)
+    for k in keys:
+        body += _length_delimited(3, k.encode('utf-8'))
+    for _, v in values:
+        body += _length_delimited(4, _encode_value(v))
+    body += _key(5, 0) + _varint(EXTENT)
+    return bytes(body)
+
+
+def encode_tile(layers):
+    """Encode a tile from {layer_name: features}; empty layers are omitted."""
+    out = bytearray()
+    for name, features in layers.items():
+        layer = encode_layer(name, features)
+        if layer:
+            out += _length_delimited(3, layer)
+    return bytes(out)
@@ -0,0 +1,63 @@
+"""
+District store density and white-space opportunities.
+
+whitespace_payload is the /api/whitespace response shared by the Template and
+Visualization apps: given each district's population and store count it
+returns the stores per 100k population of every district with population data
+and the underserved districts ranked by opportunity score, with the same
+criteria as calculateDensity() and identifyWhiteSpace() in analyticsUtils.js.
+"""
+
+import numpy as np
+
+# A district is underserved when its population (thousands) reaches the
+# threshold and it has fewer stores than this
+UNDERSERVED_STORES = 3
+
+
+def whitespace_payload(names, states, population, stores, threshold, filters):
+    """
+    /api/whitespace response for one set of per-district store counts.
+
+    Args:
+        names, states: District name and state per district position
+        population: Population (thousands) per district position; NaN or 0
+            where unknown
+        stores: Store count per district position
+        threshold: Minimum population (thousands) of an underserved district
+        filters: Store filters the counts were taken with (echoed back)
+    """
+    population = np.asarray(population, dtype=float)
+    stores = np.asarray(stores, dtype=np.int64)
+
+    has_population = population > 0
+    density = np.zeros(len(population))
+    density[has_population] = stores[has_population] / population[has_population] * 100
+    opportunity = np.zeros(len(population))
+    # Math.round in the browser rounds halves up
+    opportunity[has_population] = np.floor(population[has_population] / np.maximum(stores[has_population], 1) + 0.5)
+    underserved = has_population & (population >= threshold) & (stores < UNDERSERVED_STORES)
+
+    def row(i):
+        return {
+            "district_id": int(i),
+            "district": names[i],
+            "state": states[i],
+            "population_k": float(population[i]),
+            "stores": int(stores[i]),
+            "stores_per_100k": round(float(density[i]), 4),
+            "opportunity_score": int(opportunity[i]),
+            "underserved": bool(underserved[i]),
+        }
+
+    by_density = np.flatnonzero(has_population)
+    by_density = by_density[np.argsort(-density[by_density], kind='stable')]
+    by_opportunity = np.flatnonzero(underserved)
+    by_opportunity = by_opportunity[np.argsort(-opportunity[by_opportunity], kind='stable')]
+    return {
+        "filters": filters,
+        "threshold": threshold,
+        "total_stores": int(stores.sum()),
+        "density": [row(i) for i in by_density],
+        "whitespace": [row(i) for i in by_opportunity],
+    }
@@ -2,9 +2,14 @@
 Flask server for Mapbox Store & District Visualization System
 """
 
-from flask import Flask, render_template, send_from_directory, jsonify
+from flask import Flask, render_template, send_from_directory, jsonify, request
+import math
 import os
 
+import store_stats  # also puts the shared Template modules on sys.path
+from cube import CUBE_DIMENSIONS, cube_payload, parse_group_by
+from whitespace import whitespace_payload
+
 app = Flask(__name__)
 
 # Get the base directory - works for both local and Vercel
@@ -63,6 +68,93 @@ def get_category_files(category_name):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _multi_arg(name):
+    """Collect a query parameter given repeated and/or comma-separated."""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+def _category_stores(category):
+    return store_stats.category_stores(
+        os.path.join(BASE_DIR, 'Finalized Data'), os.path.join(BASE_DIR, 'District Data'), category
+    )
+
+@app.route('/api/cube')
+def get_cube():
+    """
+    Store-count roll-ups for one category, in the Template app's /api/cube format.
+
+    GET /api/cube?category=<name>&group_by=brand_key&group_by=state,brand_key[&brand_key=&state=&district=&city=]
+
+    Each group_by (repeatable; dimensions comma-separated) is one roll-up over
+    the category's stores matching the filters. 'brands' maps each brand_key
+    to the brand name the page derives from the file name; district is the
+    polygon each store falls in ('Unknown' outside all of them).
+    """
+    try:
+        category = request.args.get('category')
+        if not category:
+            return jsonify({'error': 'category is required'}), 400
+        try:
+            rollups = parse_group_by(request.args.getlist('group_by'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        filters = {dim: sorted(set(_multi_arg(dim))) for dim in CUBE_DIMENSIONS if _multi_arg(dim)}
+        filters['category'] = [category]
+
+        try:
+            stores = _category_stores(category)
+        except LookupError:
+            return jsonify({'error': f'Unknown category: {category}'}), 404
+
+        return jsonify(cube_payload(stores.cube, rollups, filters, stores.brands))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/whitespace')
+def get_whitespace():
+    """
+    District store density and white-space opportunities for one category,
+    in the Template app's /api/whitespace format.
+
+    GET /api/whitespace?category=<name>&threshold=50[&brand_key=...]
+
+    'density' lists every district with a population (stores per 100k, most
+    dense first); 'whitespace' the districts of at least `threshold` thousand
+    people with fewer than three stores, by opportunity score.
+    """
+    try:
+        category = request.args.get('category')
+        if not category:
+            return jsonify({'error': 'category is required'}), 400
+        try:
+            threshold = float(request.args.get('threshold', 50))
+            if not math.isfinite(threshold) or threshold < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({'error': 'threshold must be a non-negative number (thousands of people)'}), 400
+        filters = {'category': [category]}
+        if _multi_arg('brand_key'):
+            filters['brand_key'] = sorted(set(v.lower() for v in _multi_arg('brand_key')))
+
+        try:
+            stores = _category_stores(category)
+        except LookupError:
+            return jsonify({'error': f'Unknown category: {category}'}), 404
+
+        districts = stores.districts
+        return jsonify(whitespace_payload(
+            districts.names,
+            districts.states,
+            districts.population_k,
+            stores.district_counts(filters.get('brand_key')),
+            threshold,
+            filters,
+        ))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     print('='*60)
     print('Mapbox Store & District Visualization System')
@@ -33,6 +33,13 @@ function assignStoresToDCs(stores, dcs) {
         return { assignments: {}, storeDistances: {} };
     }
 
+    // The catchment, reach and distance-band analytics all ask for the same
+    // assignment in a row; reuse it while the store and DC arrays are unchanged
+    const cached = assignStoresToDCs.lastResult;
+    if (cached && cached.stores === stores && cached.dcs === dcs && cached.storeCount === stores.length) {
+        return cached.result;
+    }
+
     const assignments = {}; // DC index -> array of store indices
     const storeDistances = {}; // store index -> { dcIndex, distance }
 
@@ -66,7 +73,9 @@ function assignStoresToDCs(stores, dcs) {
         }
     });
 
-    return { assignments, storeDistances };
+    const result = { assignments, storeDistances };
+    assignStoresToDCs.lastResult = { stores, dcs, storeCount: stores.length, result };
+    return result;
 }
 
 /**
@@ -132,6 +141,86 @@ function assignStoresToDistrictsSpatially(stores, districtGeoJSON, useCache = tr
     return assignments;
 }
 
+/**
+ * Fetch store-count roll-ups for a category from the server-side cube
+ * @param {string} category - Category name
+ * @returns {Promise<Object|null>} Cube response, or null if the endpoint is unavailable
+ */
+async function fetchStoreCube(category) {
+    try {
+        const params = new URLSearchParams();
+        params.set('category', category);
+        ['brand_key', 'state', 'district', 'state,brand_key'].forEach(groupBy => params.append('group_by', groupBy));
+        const response = await fetch(`/api/cube?${params}`);
+        if (!response.ok) return null;
+        const cube = await response.json();
+        cube.category = category;
+        return cube;
+    } catch (err) {
+        console.warn('Store cube unavailable, counting stores client-side:', err);
+        return null;
+    }
+}
+
+/**
+ * Return the loaded cube if it describes exactly these stores (the unfiltered category)
+ * @param {Array} stores - Array of store features
+ * @returns {Object|null} Cube response or null
+ */
+function cubeForStores(stores) {
+    const cube = window.storeCube;
+    if (!cube || !window.storeData || stores !== window.storeData.features) return null;
+    if (cube.category !== window.currentCategory || cube.total !== stores.length) return null;
+    return cube;
+}
+
+/**
+ * Cells of one cube roll-up
+ * @param {Object} cube - Cube response
+ * @param {string} groupBy - Comma-separated dimensions as requested
+ * @returns {Array} Cells with the dimension labels and count
+ */
+function cubeRollup(cube, groupBy) {
+    const rollup = cube.rollups.find(r => r.group_by.join(',') === groupBy);
+    return rollup ? rollup.cells : [];
+}
+
+/**
+ * Fetch district density and white-space analytics for a category from the server
+ * @param {string} category - Category name
+ * @param {number} threshold - Population threshold in thousands
+ * @returns {Promise<Object|null>} Whitespace response, or null if the endpoint is unavailable
+ */
+async function fetchWhitespace(category, threshold = 50) {
+    try {
+        const params = new URLSearchParams({ category, threshold });
+        const response = await fetch(`/api/whitespace?${params}`);
+        if (!response.ok) return null;
+        const whitespace = await response.json();
+        whitespace.category = category;
+        return whitespace;
+    } catch (err) {
+        console.warn('White-space analytics unavailable, computing client-side:', err);
+        return null;
+    }
+}
+
+/**
+ * Return the loaded white-space response if it describes exactly these stores
+ * @param {Array} stores - Array of store features
+ * @param {number} threshold - Population threshold in thousands (null for any)
+ * @returns {Object|null} Whitespace response or null
+ */
+function whitespaceForStores(stores, threshold = null) {
+    const whitespace = window.whitespaceData;
+    if (!whitespace || !window.storeData || stores !== window.storeData.features) return null;
+    if (whitespace.category !== window.currentCategory) return null;
+    // total_stores only counts stores inside a district; the cube vouches for the full set
+    if (!cubeForStores(stores)) return null;
+    if (threshold !== null && whitespace.threshold !== threshold) return null;
+    return whitespace;
+}
+
 /**
  * Calculate brand composition from store features
  * @param {Array} stores - Array of store features
@@ -144,6 +233,14 @@ function getBrandComposition(stores) {
         return composition;
     }
 
+    const cube = cubeForStores(stores);
+    if (cube) {
+        cubeRollup(cube, 'brand_key').forEach(cell => {
+            composition[cube.brands[cell.brand_key]] = cell.count;
+        });
+        return composition;
+    }
+
     stores.forEach(store => {
         const brand = store.properties.brand || 'Unknown';
         composition[brand] = (composition[brand] || 0) + 1;
@@ -165,6 +262,17 @@ function groupByGeography(stores, field) {
         return grouped;
     }
 
+    const cube = cubeForStores(stores);
+    if (cube && (field === 'State' || field === 'District')) {
+        cubeRollup(cube, field.toLowerCase()).forEach(cell => {
+            const value = cell[field.toLowerCase()];
+            // Stores outside every district polygon are not counted per district
+            if (field === 'District' && value === 'Unknown') return;
+            grouped[value] = cell.count;
+        });
+        return grouped;
+    }
+
     // Special handling for District - use spatial containment
     if (field === 'District' && window.districtData) {
         const assignments = assignStoresToDistrictsSpatially(stores, window.districtData);
@@ -197,6 +305,17 @@ function groupByStateAndBrand(stores) {
         return grouped;
     }
 
+    const cube = cubeForStores(stores);
+    if (cube) {
+        cubeRollup(cube, 'state,brand_key').forEach(cell => {
+            if (!grouped[cell.state]) {
+                grouped[cell.state] = {};
+            }
+            grouped[cell.state][cube.brands[cell.brand_key]] = cell.count;
+        });
+        return grouped;
+    }
+
     stores.forEach(store => {
         const state = store.properties.State || 'Unknown';
         const brand = store.properties.brand || 'Unknown';
@@ -221,6 +340,17 @@ function calculateDensity(stores, districtData) {
         return [];
     }
 
+    const whitespace = whitespaceForStores(stores);
+    if (whitespace) {
+        return whitespace.density.map(d => ({
+            district: d.district,
+            state: d.state,
+            stores: d.stores,
+            population: d.population_k,
+            density: d.stores_per_100k
+        }));
+    }
+
     // Use spatial assignment to count stores per district
     const districtAssignments = assignStoresToDistrictsSpatially(stores, districtData);
     const storesByDistrict = {};
@@ -262,6 +392,17 @@ function identifyWhiteSpace(stores, districtData, threshold = 50) {
         return [];
     }
 
+    const whitespace = whitespaceForStores(stores, threshold);
+    if (whitespace) {
+        return whitespace.whitespace.map(d => ({
+            district: d.district,
+            state: d.state,
+            population: d.population_k,
+            currentStores: d.stores,
+            opportunityScore: d.opportunity_score
+        }));
+    }
+
     // Use spatial assignment to count stores per district
     const districtAssignments = assignStoresToDistrictsSpatially(stores, districtData);
     const storesByDistrict = {};
@@ -510,17 +651,16 @@ function calculateConcentration(stateCounts) {
     
     if (n === 0) return { gini: 0, level: 'Low' };
 
-    let sumOfDifferences = 0;
+    // Sorted-cumulative form of sum|xi - xj| / (2 n sum(x)): O(n log n) instead of O(n^2)
+    let weightedSum = 0;
     let sumOfValues = 0;
 
     for (let i = 0; i < n; i++) {
-        for (let j = 0; j < n; j++) {
-            sumOfDifferences += Math.abs(values[i] - values[j]);
-        }
+        weightedSum += (i + 1) * values[i];
         sumOfValues += values[i];
     }
 
-    const gini = sumOfDifferences / (2 * n * sumOfValues);
+    const gini = sumOfValues > 0 ? (2 * weightedSum) / (n * sumOfValues) - (n + 1) / n : 0;
     
     let level = 'Low';
     if (gini > 0.6) level = 'High';
@@ -558,6 +698,8 @@ function countPopulatedDistricts(stores, districtGeoJSON) {
 window.calculateDistance = calculateDistance;
 window.assignStoresToDCs = assignStoresToDCs;
 window.assignStoresToDistrictsSpatially = assignStoresToDistrictsSpatially;
+window.fetchStoreCube = fetchStoreCube;
+window.fetchWhitespace = fetchWhitespace;
 window.getBrandComposition = getBrandComposition;
 window.groupByGeography = groupByGeography;
 window.groupByStateAndBrand = groupByStateAndBrand;
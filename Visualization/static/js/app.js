@@ -26,6 +26,8 @@ window.dcData = null;
 window.selectedBrand = 'All';
 window.selectedState = 'All';
 window.districtAssignmentsCache = null; // Cache for spatial district assignments
+window.storeCube = null; // Server-side store-count roll-ups for the current category
+window.whitespaceData = null; // Server-side district density / white-space analytics
 
 /**
  * Hide unnecessary base map layers (roads, water, parks, etc.)
@@ -104,6 +104,8 @@ async function handleCategoryChange(e) {
     
     // Clear district assignments cache
     window.districtAssignmentsCache = null;
+    window.storeCube = null;
+    window.whitespaceData = null;
 
     // Update DC card visibility based on category
     updateDCVisibility(category);
@@ -147,6 +149,24 @@ async function handleCategoryChange(e) {
         populateOverviewPanel();
     }
 
+    // Swap the panels to server-side counts once the cube arrives
+    fetchStoreCube(category).then(cube => {
+        if (!cube || window.currentCategory !== category) return;
+        window.storeCube = cube;
+        if (document.getElementById('overview').classList.contains('active')) {
+            populateOverviewPanel();
+        } else if (document.getElementById('stores').classList.contains('active')) {
+            populateStoresPanel();
+        }
+    });
+    fetchWhitespace(category, 50).then(whitespace => {
+        if (!whitespace || window.currentCategory !== category) return;
+        window.whitespaceData = whitespace;
+        if (document.getElementById('analytics').classList.contains('active')) {
+            populateAnalyticsPanel();
+        }
+    });
+
     // Fit bounds to data
     if (stores.features.length > 0) {
         const bounds = new mapboxgl.LngLatBounds();
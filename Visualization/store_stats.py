@@ -0,0 +1,163 @@
+"""
+Server-side store counts and district analytics for the visualization page.
+
+The page loads each category's GeoJSON files from Finalized Data. This module
+reads the same files once per category (again only when they change), places
+every store in the district polygon containing it with the Template app's
+spatial.PolygonIndex and builds the Template's store cube over them, so
+/api/cube and /api/whitespace are answered by the same code (cube.cube_payload,
+whitespace.whitespace_payload) and with the same JSON contract as in the
+Template app.
+"""
+
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+# The cube, district lookup and brand keys are shared with the Template app
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Template')
+if TEMPLATE_DIR not in sys.path:
+    sys.path.append(TEMPLATE_DIR)
+
+from brand_names import filename_to_brand_key  # noqa: E402
+from cube import RollupCube  # noqa: E402
+from spatial import PolygonIndex  # noqa: E402
+from store_index import normalize_value  # noqa: E402
+
+_lock = threading.Lock()
+_districts = None  # (version, DistrictLayer)
+_categories = {}  # category -> (version, CategoryStores)
+
+
+def _files_version(paths):
+    """Cheap version of a set of files from their (path, mtime, size)."""
+    version = []
+    for path in paths:
+        st = os.stat(path)
+        version.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(version)
+
+
+def brand_from_filename(filename):
+    """Brand name for a GeoJSON file, as getBrandFromFilename() derives it in config.js."""
+    return filename.replace('.geojson', '').replace('_', ' ')
+
+
+class DistrictLayer:
+    """
+    District polygons with their population.
+
+    Args:
+        features: District GeoJSON features ('name' and 'state' properties)
+        statistics: District Statistics GeoJSON features ('District' and
+            'Population (k)' properties), joined by case-insensitive name the
+            way loadDistrictData() joins them in dataLoader.js
+    """
+
+    def __init__(self, features, statistics):
+        population = {}
+        for feature in statistics:
+            props = feature.get('properties') or {}
+            if props.get('District'):
+                population[str(props['District']).lower()] = props.get('Population (k)')
+        props = [f.get('properties') or {} for f in features]
+        self.names = [p.get('name') for p in props]
+        self.states = [p.get('state') for p in props]
+        self.population_k = np.array([
+            population.get(str(name).lower()) if name else None for name in self.names
+        ], dtype=float)
+        self.index = PolygonIndex(features)
+
+
+class CategoryStores:
+    """
+    The stores of one category as a store cube, plus their district positions.
+
+    Args:
+        category: Category (Finalized Data folder) name
+        files: {GeoJSON file name: FeatureCollection}
+        districts: DistrictLayer used to place each store
+    """
+
+    def __init__(self, category, files, districts):
+        self.districts = districts
+        self.brands = {}  # brand_key -> brand name as the page shows it
+        brand_keys, states, cities, lat, lon = [], [], [], [], []
+        for filename, geojson in files.items():
+            brand_key = filename_to_brand_key(os.path.splitext(filename)[0])
+            self.brands.setdefault(brand_key, brand_from_filename(filename))
+            for feature in geojson.get('features') or []:
+                props = feature.get('properties') or {}
+                coords = (feature.get('geometry') or {}).get('coordinates') or []
+                brand_keys.append(brand_key)
+                states.append(props.get('State'))
+                cities.append(props.get('City'))
+                lon.append(float(coords[0]) if len(coords) >= 2 else np.nan)
+                lat.append(float(coords[1]) if len(coords) >= 2 else np.nan)
+
+        self.brand_keys = np.array([normalize_value(k) for k in brand_keys], dtype=object)
+        self.district_ids = districts.index.locate(lat, lon)
+        self.cube = RollupCube({
+            'category': [category] * len(brand_keys),
+            'brand_key': brand_keys,
+            'state': states,
+            'district': [districts.names[i] if i >= 0 else None for i in self.district_ids],
+            'city': cities,
+        })
+
+    def district_counts(self, brand_keys=None):
+        """Stores per district position, optionally only those of `brand_keys`."""
+        ids = self.district_ids
+        if brand_keys is not None:
+            ids = ids[np.isin(self.brand_keys, [normalize_value(k) for k in brand_keys])]
+        return np.bincount(ids[ids >= 0], minlength=len(self.districts.names))
+
+
+def _district_layer(district_root):
+    """(version, district layer), rebuilt when either district file changes."""
+    global _districts
+    geometry_path = os.path.join(district_root, 'malaysia.district.geojson')
+    statistics_path = os.path.join(district_root, 'District Statistics.geojson')
+    version = _files_version([geometry_path, statistics_path])
+    with _lock:
+        if _districts is not None and _districts[0] == version:
+            return _districts
+
+    with open(geometry_path, 'r', encoding='utf-8') as f:
+        geometry = json.load(f)
+    with open(statistics_path, 'r', encoding='utf-8') as f:
+        statistics = json.load(f)
+    layer = DistrictLayer(geometry.get('features') or [], statistics.get('features') or [])
+    with _lock:
+        _districts = (version, layer)
+    return version, layer
+
+
+def category_stores(data_root, district_root, category):
+    """
+    Store cube for a category, rebuilt when its GeoJSON files or the districts change.
+
+    Raises LookupError when the category has no GEOJSON Data folder.
+    """
+    geojson_dir = os.path.join(data_root, category, 'GEOJSON Data')
+    if os.path.basename(category) != category or not os.path.isdir(geojson_dir):
+        raise LookupError(category)
+    paths = [os.path.join(geojson_dir, name) for name in sorted(os.listdir(geojson_dir)) if name.endswith('.geojson')]
+    district_version, districts = _district_layer(district_root)
+    version = (_files_version(paths), district_version)
+    with _lock:
+        entry = _categories.get(category)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+    files = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            files[os.path.basename(path)] = json.load(f)
+    stores = CategoryStores(category, files, districts)
+    with _lock:
+        _categories[category] = (version, stores)
+    return stores
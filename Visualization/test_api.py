@@ -0,0 +1,69 @@
+from collections import Counter
+from urllib.parse import quote
+
+import store_stats
+from app import app
+
+with app.test_client() as client:
+    r = client.get('/api/categories')
+    categories = r.get_json()
+    print('=== /api/categories ===')
+    print('Status:', r.status_code, 'Categories:', categories)
+
+    for category in categories:
+        # Load the stores the way loadStoreGeoJSON() in dataLoader.js does
+        files = client.get(f'/api/category/{quote(category)}/files').get_json()
+        stores = []
+        for name in sorted(files):
+            geojson = client.get(f'/data/{quote(category)}/GEOJSON Data/{quote(name)}').get_json()
+            brand = name.replace('.geojson', '').replace('_', ' ')
+            # The cube trims the labels, merging e.g. 'Selangor ' into 'Selangor'
+            stores.extend((brand, (f['properties'].get('State') or '').strip() or 'Unknown') for f in geojson['features'])
+
+        print(f'\n=== /api/cube?category={category} ===')
+        r2 = client.get('/api/cube', query_string={'category': category, 'group_by': ['brand_key', 'state,brand_key']})
+        cube = r2.get_json()
+        brands = cube['brands']
+        by_brand = {brands[c['brand_key']]: c['count'] for c in cube['rollups'][0]['cells']}
+        by_state_brand = {(c['state'], brands[c['brand_key']]): c['count'] for c in cube['rollups'][1]['cells']}
+        matches = (
+            cube['total'] == len(stores)
+            and by_brand == dict(Counter(brand for brand, _ in stores))
+            and by_state_brand == dict(Counter((state, brand) for brand, state in stores))
+        )
+        print('Status:', r2.status_code, 'Total:', cube['total'], 'Page stores:', len(stores), 'Matches page data:', matches)
+        assert matches, category
+
+    # District layer as loadDistrictData() joins it
+    districts = client.get('/district-data/malaysia.district.geojson').get_json()['features']
+    statistics = client.get('/district-data/District Statistics.geojson').get_json()['features']
+    population = {f['properties']['District'].lower(): f['properties']['Population (k)'] for f in statistics}
+    layer = store_stats.DistrictLayer(districts, [])
+    names = [f['properties']['name'] for f in districts]
+
+    for category in categories:
+        files = client.get(f'/api/category/{quote(category)}/files').get_json()
+        coordinates = []
+        for name in sorted(files):
+            geojson = client.get(f'/data/{quote(category)}/GEOJSON Data/{quote(name)}').get_json()
+            coordinates.extend(f['geometry']['coordinates'][:2] for f in geojson['features'])
+        lon, lat = zip(*coordinates)
+        per_district = Counter(names[p] for p in layer.index.locate(lat, lon) if p >= 0)
+        # Same criteria as identifyWhiteSpace() in analyticsUtils.js
+        expected = sorted(
+            (f['properties']['name'] for f in districts
+             if (population.get(f['properties']['name'].lower()) or 0) >= 50
+             and per_district[f['properties']['name']] < 3)
+        )
+
+        print(f'\n=== /api/whitespace?category={category}&threshold=50 ===')
+        r3 = client.get('/api/whitespace', query_string={'category': category, 'threshold': 50})
+        data3 = r3.get_json()
+        density = {d['district']: d['stores'] for d in data3['density']}
+        matches = (
+            data3['total_stores'] == sum(per_district.values())
+            and all(density[name] == count for name, count in per_district.items() if name in density)
+            and sorted(d['district'] for d in data3['whitespace']) == expected
+        )
+        print('Status:', r3.status_code, 'White-space districts:', len(data3['whitespace']), 'Matches page data:', matches)
+        assert matches, category